@@ -2,7 +2,7 @@
 app.py
 
 Created on 2021-11-16
-Updated on 2022-02-06
+Updated on 2026-10-17
 
 Copyright © Ryan Kan
 
@@ -10,43 +10,169 @@ Description: Main flask application.
 """
 
 # IMPORTS
+import gzip
 import json
+import math
+import mimetypes
 import os
 import re
 import shutil
+import tempfile
 import threading
-from collections import defaultdict
+import time
+from functools import lru_cache, partial, wraps
+from hashlib import sha1
+from typing import Optional
 
+import numpy as np
 import yaml
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file, send_from_directory, abort
-from pydub import AudioSegment
+from flask import Flask, Request, Response, render_template, request, redirect, url_for, flash, abort
+from flask import send_file, stream_with_context
 from pydub.exceptions import CouldntDecodeError
-
-from src.audio import estimate_bpm, get_audio_length, samples_to_vqt
-from src.hashing import generate_hash_from_file
-from src.io import audio_to_audiosegment, audiosegment_to_mp3, audiosegment_to_wav, wav_to_samples, \
-    SUPPORTED_AUDIO_EXTENSIONS
-from src.misc import MUSIC_KEYS, NOTE_NUMBER_RANGE
-from src.visuals import generate_spectrogram_img
+from werkzeug.utils import safe_join
+
+from src.audio import SpectralCache, get_audio_length, prepare_audio_worker
+from src.hashing import HashingFile, generate_hash_from_file
+from src.io import audio_to_audiosegment, audiosegment_to_mp3, audiosegment_to_samples, probe_audio_file
+from src.io import probe_mp3_bitrate
+from src.io import SUPPORTED_AUDIO_EXTENSIONS
+from src.metrics import MEMORY_BUCKETS, PROMETHEUS_CONTENT_TYPE, TIME_BUCKETS, MetricsRegistry, SQLiteMetricsRegistry
+from src.misc import MUSIC_KEYS, NOTE_NUMBER_RANGE, note_number_to_freq
+from src.pipeline import JOB_FAILED, JOB_FINISHED, JOB_QUEUED, JOB_RUNNING, STAGE_DONE, STAGE_PENDING, STAGE_RUNNING, \
+    JobScheduler, SQLiteJobQueue, run_stage_graph
+from src.storage import ProjectStore, RetentionManager
+from src.visuals import CHUNK_FILE_EXTENSION, CHUNKS_MANIFEST_FILE_NAME, generate_colour_lut, \
+    generate_spectrogram_chunks
 
 # CONSTANTS
 # File constants
 MAX_AUDIO_FILE_SIZE = {"Value": 10 ** 7, "Name": "10 MB"}
 ACCEPTED_FILE_TYPES = [x.upper()[1:] for x in SUPPORTED_AUDIO_EXTENSIONS.keys()] + ["AUTR"]
 CBR_MP3_BITRATE = 192  # In thousands
+ACCEPTED_CBR_MP3_BITRATES = [128, 320]  # In the format [min, max]; uploaded CBR MP3s within this are not re-encoded
+UPLOAD_WAIT_TIMEOUT = 30  # Maximum time to wait for another upload of the same file to finish, in seconds
 
 # Spectrogram settings
-BATCH_SIZE = 32
 PX_PER_SECOND = 120  # Number of pixels of the spectrogram dedicated to each second of audio
 SPECTROGRAM_HEIGHT = 720  # Height of the spectrogram, in pixels
+SPECTROGRAM_CHUNK_FRAMES = 512  # Number of frames in each chunk of the spectrogram data that clients render
+SPECTROGRAM_DATA_DTYPE = np.uint8  # Type that the spectrogram data is quantised to; one level for each colour
+SPECTROGRAM_DATA_FOLDER = "spectrogram_data"  # Name of the folder in the project folder with the spectrogram data
+SPECTROGRAM_COLOUR_LUT = generate_colour_lut().tolist()  # Colours that clients render the spectrogram data with
+VQT_BLOCK_FRAMES = 2048  # Number of VQT frames to compute at a time; bounds the memory used by the transform
+VQT_FILE_NAME = "vqt.npy"  # Name of the file in the project folder that the VQT is written to while a job runs
+VQT_PARAMS = {  # Parameters of the VQT; these are part of the key of the cached VQT results
+    "hop_length": 1024,
+    "f_min": note_number_to_freq(NOTE_NUMBER_RANGE[0]),
+    "n_bins": 600,
+    "bins_per_octave": 60
+}
+PREVIEW_VQT_PARAMS = {  # Parameters of the coarse VQT that is shown while the full VQT is being generated
+    "hop_length": 4096,
+    "f_min": note_number_to_freq(NOTE_NUMBER_RANGE[0]),
+    "n_bins": 120,
+    "bins_per_octave": 12
+}
+SPECTRAL_CACHE_SIZE = 2 * 10 ** 9  # Maximum size of the cache of spectral analysis results, in bytes
+SPECTRAL_CACHE_DTYPE = np.uint16  # Type that cached spectrograms are quantised to; at most 0.001 dB is lost
+COMMON_SAMPLE_RATES = [44100, 48000]  # Sample rates whose VQT filter banks are prepared when a worker starts
+
+# Region settings
+REGION_VQT_PARAMS = {  # Parameters of the high resolution VQT of regions; the result is cropped to the region's notes
+    "hop_length": 256,
+    "f_min": note_number_to_freq(NOTE_NUMBER_RANGE[0]),
+    "n_bins": 1200,
+    "bins_per_octave": 120
+}
+REGION_TIME_STEP = 0.5  # Regions are widened to multiples of this, in seconds, so that similar regions are reused
+MAX_REGION_DURATION = 30  # Maximum duration of a region, in seconds
+MAX_CACHED_REGIONS = 16  # Number of analysed regions kept for each project; the least recently used are deleted
+REGIONS_FOLDER = "regions"  # Name of the folder in the project folder with the analysed regions
+
+# Caching settings
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60  # Time that browsers keep responses whose URLs have their content's hash, in s
+FILE_HASH_CACHE_SIZE = 1024  # Number of files whose hashes are remembered
+COMPRESSED_FILE_CACHE_SIZE = 64  # Number of static files whose gzip-compressed variants are kept in memory
+COMPRESSIBLE_EXTENSIONS = [".css", ".js", ".json", ".svg", ".txt", ".html"]  # Static files that are sent compressed
+
+# Pipeline settings
+MAX_CONCURRENT_JOBS = max((os.cpu_count() or 1) // 3, 1)  # Number of files that are processed at the same time
+MAX_QUEUED_AUDIO_DURATION = 60 * 60  # Maximum total duration of the audio that is queued or processing, in seconds
+ESTIMATED_BYTES_PER_SECOND = 16000  # Used to estimate the duration of an audio file from its size; 128 kbps
+PIPELINE_WORKERS = 4  # Maximum number of stages of `processing_file` that run at the same time
+PIPELINE_STAGE_MESSAGES = {  # Message to show while each stage of `processing_file` is running
+    "decode": "Converting to audio segment data.",
+    "samples": "Splitting audio into smaller samples.",
+    "mp3": "Generating constant bitrate MP3 file.",
+    "vqt": "Generating spectrogram data.",
+    "data": "Saving spectrogram data.",
+    "preview": "Generating spectrogram preview.",
+    "beats": "Tracking beats."
+}
+PIPELINE_STAGE_WEIGHTS = {  # Rough relative duration of each stage, used to weight the progress percentage
+    "decode": 1,
+    "samples": 1,
+    "mp3": 3,
+    "cleanup": 0,
+    "vqt": 10,
+    "data": 1,
+    "beats": 1,
+    "duration": 0,
+    "preview": 1
+}
+PIPELINE_PROGRESS_STAGES = ["vqt", "data"]  # Stages that report how far along they are
+PROGRESS_STREAM_INTERVAL = 0.25  # Time between checks of a job's progress by the progress stream, in seconds
+PROGRESS_STREAM_KEEPALIVE = 15  # Maximum time between messages of the progress stream, in seconds
+JOB_BACKENDS = ["local", "sqlite"]  # "local" runs jobs in this process's pool; "sqlite" shares them between processes
+
+# Retention settings
+MEDIA_FILES_MAX_SIZE = 10 * 10 ** 9  # Maximum total size of the projects' folders, in bytes
+MAX_PROJECT_AGE = 90 * 24 * 60 * 60  # Projects that are not opened for this long are deleted, in seconds
+DERIVED_ARTIFACTS = [  # Deleted first when over the budget, in this order; all are generated again from the CBR MP3
+    REGIONS_FOLDER,
+    SPECTROGRAM_DATA_FOLDER + "*",
+    VQT_FILE_NAME,  # Left behind by jobs that were interrupted
+    "*.png"  # From older versions
+]
+FINISHED_JOB_MAX_AGE = 60 * 60  # Time that the records of finished jobs are kept for, in seconds
+RETENTION_INTERVAL = 10 * 60  # Time between enforcements of the retention policy, in seconds
+
+# Project states
+PROJECT_UPLOADING = "uploading"  # Audio file being saved and checked
+PROJECT_UPLOADED = "uploaded"  # Audio file uploaded, but not yet processed
+PROJECT_PROCESSING = "processing"  # Constant bitrate MP3 file created, but spectrogram not yet generated
+PROJECT_GENERATED = "generated"  # Spectrogram generated; project ready for transcription
 
 # Music settings
 BEATS_PER_BAR_RANGE = [1, 8]  # In the format [min, max]
 BPM_RANGE = [1, 512]  # In the format [min, max]
+SAVED_PROJECT_KEYS = ["beats_offset", "beats_per_bar", "bpm", "music_key"]  # Keys that the transcriber page can save
+
+
+# CLASSES
+class UploadRequest(Request):
+    # Request that writes uploaded files straight into the upload folder, hashing them while they are received, so
+    # that each upload is only read once; files that are not moved into a project's folder are deleted afterwards
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        stream = HashingFile(tempfile.NamedTemporaryFile("w+b", prefix=".upload-", dir=app.config["UPLOAD_FOLDER"],
+                                                         delete=False))
+        self.staged_files = getattr(self, "staged_files", []) + [stream.name]
+        return stream
+
+    def close(self):
+        super().close()
+
+        for file_path in getattr(self, "staged_files", []):
+            try:
+                os.remove(file_path)
+            except OSError:  # Moved into a project's folder
+                pass
+
 
 # FLASK SETUP
 # Define basic things
 app = Flask(__name__)
+app.request_class = UploadRequest
 app.config.from_pyfile("base_config.py")
 
 # Get the instance's `config.py` file
@@ -57,6 +183,10 @@ except OSError:
 
 # Further app configuration
 app.config["UPLOAD_FOLDER"] = "MediaFiles"
+app.config["CACHE_FOLDER"] = "SpectralCache"
+app.config["DATABASE"] = os.path.join(app.config["UPLOAD_FOLDER"], "projects.db")
+app.config["JOB_DATABASE"] = os.path.join(app.config["UPLOAD_FOLDER"], "jobs.db")
+app.config["JOB_BACKEND"] = os.environ.get("AUDITRANSCRIBE_JOB_BACKEND", app.config.get("JOB_BACKEND", JOB_BACKENDS[0]))
 app.config["MAX_CONTENT_LENGTH"] = MAX_AUDIO_FILE_SIZE["Value"]
 
 # Create the upload folder
@@ -65,8 +195,23 @@ try:
 except OSError:
     pass
 
+if app.config["JOB_BACKEND"] not in JOB_BACKENDS:
+    raise ValueError(f"Unknown job backend {app.config['JOB_BACKEND']!r}; must be one of {JOB_BACKENDS}.")
+
 # GLOBAL VARIABLES
-processingThreads = defaultdict(lambda: {"phase": 0, "progress": []})
+if app.config["JOB_BACKEND"] == "sqlite":
+    # Jobs are run by separate worker processes (see `serve.py`), so their metrics are shared through the database too
+    scheduler = SQLiteJobQueue(app.config["JOB_DATABASE"], max_total_cost=MAX_QUEUED_AUDIO_DURATION)
+    metrics = SQLiteMetricsRegistry(app.config["JOB_DATABASE"])
+else:
+    scheduler = JobScheduler(MAX_CONCURRENT_JOBS, max_total_cost=MAX_QUEUED_AUDIO_DURATION,
+                             initializer=partial(prepare_audio_worker, COMMON_SAMPLE_RATES, **VQT_PARAMS))
+    metrics = MetricsRegistry()
+spectralCache = SpectralCache(app.config["CACHE_FOLDER"], SPECTRAL_CACHE_SIZE, spectrogram_dtype=SPECTRAL_CACHE_DTYPE)
+projectStore = ProjectStore(app.config["DATABASE"])
+retentionThread = None  # Started when the first request is handled
+retentionThreadLock = threading.Lock()
+regionLock = threading.Lock()  # Analyses of regions run one at a time, as they run in the web server's threads
 
 
 # HELPER FUNCTIONS
@@ -74,105 +219,747 @@ def allowed_file(filename: str):
     return "." in filename and filename.rsplit(".", 1)[1].upper() in ACCEPTED_FILE_TYPES
 
 
-def processing_file(file: str, uuid: str, thread_data: dict):
-    # Generate the folder path and status file path
-    folder_path = os.path.join(app.config["UPLOAD_FOLDER"], uuid)
+def estimate_job_cost(file_path: str, duration: Optional[float] = None) -> float:
+    # Use the duration of the audio, in seconds, as the cost of processing it
+    if duration is not None:
+        return duration
 
-    # Split the file into its filename and extension
-    filename, extension = os.path.splitext(file)
+    # Estimate the duration from the file's size if it was not found when the file was uploaded
+    return os.path.getsize(file_path) / ESTIMATED_BYTES_PER_SECOND
 
-    # Convert the audio file into an `AudioSegment` object
-    thread_data["phase"] = 1  # Converting to audio segment
-    audiosegment = audio_to_audiosegment(os.path.join(folder_path, file))
 
-    # If the file is not a WAV file then convert it into one
-    thread_data["phase"] = 2  # Generating WAV file
-    if extension[1:].upper() != "WAV":
-        audiosegment_to_wav(audiosegment, os.path.join(folder_path, filename))
-        file_wav = os.path.join(folder_path, filename + ".wav")
-    else:
-        file_wav = os.path.join(folder_path, file)
+def get_spectrogram_settings() -> dict:
+    # Get the settings that affect the spectrogram data; the data is saved again when these change
+    return {"chunk_frames": SPECTROGRAM_CHUNK_FRAMES, "dtype": np.dtype(SPECTROGRAM_DATA_DTYPE).name}
 
-    # Convert the audio file into a CBR MP3
-    thread_data["phase"] = 3  # Generating CBR MP3
-    audiosegment_to_mp3(audiosegment, os.path.join(folder_path, filename + "_cbr"), bitrate=CBR_MP3_BITRATE)
 
-    # Update the status file on the audio file to reference
-    update_status_file(
-        os.path.join(folder_path, "status.yaml"),
-        audio_file_name=filename + "_cbr.mp3"
-    )
+def discard_project(uuid: str):
+    # Delete the project's folder and its status
+    shutil.rmtree(os.path.join(app.config["UPLOAD_FOLDER"], uuid), ignore_errors=True)
+    projectStore.delete(uuid)
 
-    # Now split the WAV file into samples
-    thread_data["phase"] = 4  # Splitting into samples
-    samples, sample_rate = wav_to_samples(file_wav)
 
-    # We can now delete the old file and the WAV file
+def prepare_projects():
+    # Import the status files of projects that were created before the project store was used, and remove projects
+    # whose upload was interrupted by the server stopping; run once before the server starts, not by every worker
+    projectStore.migrate_status_files(app.config["UPLOAD_FOLDER"], get_project_state)
+
+    for interrupted_uuid in projectStore.list_uuids(PROJECT_UPLOADING):
+        discard_project(interrupted_uuid)
+
+
+def get_project_state(status: dict) -> str:
+    # Get the state of a project from its status dictionary
+    if status.get("spectrogram_generated"):
+        return PROJECT_GENERATED
+    elif status.get("audio_file_name") is not None:
+        return PROJECT_PROCESSING
+    return PROJECT_UPLOADED
+
+
+def new_job_data(job_type: str) -> dict:
+    # Create the initial job data of a processing job, which is where the job reports its progress and measurements
+    return {"type": job_type, "stages": {}, "progress": {name: [None] for name in PIPELINE_PROGRESS_STAGES},
+            "preview": False, "metrics": {}, "cache_lookups": {}, "done": False}
+
+
+def run_job_stages(stages: dict, job_data: dict) -> dict:
+    # Run the stages of a job, recording the resources that each stage used and how the job used the spectral cache;
+    # each process only runs one job at a time, so the change in the cache's counters is all from this job
+    initial_hits, initial_misses = spectralCache.hits, spectralCache.misses
+    start_time = time.perf_counter()
+
     try:
-        os.remove(os.path.join(folder_path, file))
-        os.remove(file_wav)
-    except OSError:  # The files may be one and the same
+        return run_stage_graph(stages, max_workers=PIPELINE_WORKERS, stage_status=job_data["stages"],
+                               stage_metrics=job_data["metrics"])
+    finally:
+        job_data["wall_time"] = time.perf_counter() - start_time
+        job_data["cache_lookups"] = {"hit": spectralCache.hits - initial_hits,
+                                     "miss": spectralCache.misses - initial_misses}
+
+
+def remove_vqt_file(folder_path: str):
+    # Delete the file that a job wrote or restored the VQT to, now that it is cached and the job is done with it
+    try:
+        os.remove(os.path.join(folder_path, VQT_FILE_NAME))
+    except OSError:  # Not written
         pass
 
-    # Calculate the duration of the audio
-    duration = get_audio_length(samples, sample_rate)
 
-    # Convert the samples into a spectrogram
-    thread_data["phase"] = 5  # Generating VQT data
-    spectrogram, frequencies, times = samples_to_vqt(sample_rate, samples)
+def record_job_metrics(uuid: str, state: str, job_data: dict):
+    # Add the measurements of a finished or failed job to the metrics
+    job_type = job_data["type"]
+    outcome = "finished" if state == JOB_FINISHED else "failed"
+
+    metrics.increment("auditranscribe_jobs_total", job=job_type, outcome=outcome)
+    if "wall_time" in job_data:
+        metrics.observe("auditranscribe_job_wall_time_seconds", job_data["wall_time"], job=job_type, outcome=outcome)
+
+    for stage, measurements in job_data["metrics"].items():
+        metrics.observe("auditranscribe_stage_wall_time_seconds", measurements["wall_time"], job=job_type,
+                        stage=stage)
+        metrics.observe("auditranscribe_stage_cpu_time_seconds", measurements["cpu_time"], job=job_type, stage=stage)
+        metrics.observe("auditranscribe_stage_peak_rss_increase_bytes", measurements["peak_rss_increase"],
+                        job=job_type, stage=stage)
+
+    for result, count in job_data["cache_lookups"].items():
+        metrics.increment("auditranscribe_spectral_cache_lookups_total", count, result=result)
+
+
+def is_project_in_use(uuid: str) -> bool:
+    # Check if a project's files are being written, so that they must not be deleted
+    return scheduler.get_job_state(uuid) in (JOB_QUEUED, JOB_RUNNING) or \
+        projectStore.get_state(uuid) == PROJECT_UPLOADING
+
+
+def on_project_evicted(uuid: str, artifact: Optional[str]):
+    # Update the status of a project after the retention policy deleted it or one of its artifacts
+    if artifact is None:
+        projectStore.delete(uuid)
+        scheduler.forget(uuid)
+    elif artifact == SPECTROGRAM_DATA_FOLDER:
+        # The spectrogram data is saved again the next time the project is opened; the record of the job that saved it
+        # is removed, as the transcriber only submits a new job when there is none
+        projectStore.update(uuid, PROJECT_PROCESSING, spectrogram_data=None, spectrogram_preview=False,
+                            spectrogram_generated=False)
+        scheduler.forget(uuid)
+
+
+def enforce_retention_policy():
+    # Keep the projects' folders within their budget, and forget the jobs that finished long ago, for as long as the
+    # server runs
+    while True:
+        try:
+            report = retentionManager.enforce()
+            report["expired_jobs"] = scheduler.expire(FINISHED_JOB_MAX_AGE)
+        except Exception as e:  # Try again next time
+            app.logger.error(f"Could not enforce the retention policy: {e!r}")
+        else:
+            metrics.set("auditranscribe_media_files_bytes", report["size"])
+            metrics.increment("auditranscribe_retention_reclaimed_bytes_total", report["reclaimed_bytes"])
+            for kind in ["expired_projects", "evicted_artifacts", "evicted_projects", "expired_jobs"]:
+                metrics.increment("auditranscribe_retention_deletions_total", report[kind], kind=kind)
+
+            if report["reclaimed_bytes"] > 0:
+                app.logger.info(f"Retention policy reclaimed {report['reclaimed_bytes']} bytes: {report}")
+
+        time.sleep(RETENTION_INTERVAL)
+
+
+def get_cache_hit_ratio() -> float:
+    # Get the fraction of the spectral cache lookups of all jobs so far that were hits
+    hits = metrics.get_value("auditranscribe_spectral_cache_lookups_total", result="hit") or 0
+    misses = metrics.get_value("auditranscribe_spectral_cache_lookups_total", result="miss") or 0
+    return hits / (hits + misses) if hits + misses > 0 else 0.
+
+
+def get_job_progress(uuid: str) -> dict:
+    # Get the state of the job associated with that UUID
+    job_state = scheduler.get_job_state(uuid)
+
+    if job_state is None:
+        if projectStore.get_state(uuid) == PROJECT_GENERATED:  # Job already finished and forgotten
+            return {"Message": "Spectrogram generated. Redirecting in a short while...", "Progress": 100}
+        return {"Message": "Starting to process spectrogram.", "Progress": 0}  # Job not submitted yet
+    elif job_state == JOB_QUEUED:  # Waiting for other jobs
+        return {
+            "Message": f"Waiting for other files to finish processing. Position in queue: "
+                       f"{scheduler.get_queue_position(uuid)}.",
+            "Progress": 0
+        }
+    elif job_state == JOB_FAILED:
+        return {"Message": "Processing failed. Please reload the page to try again."}
+
+    # Get the stages' statuses and their progress
+    job_data = scheduler.get_job_data(uuid)
+    stages = dict(job_data["stages"])
+    progress = job_data["progress"]
+
+    # Check if everything is done
+    if job_data["done"]:
+        return {"Message": "Updated status file. Redirecting in a short while...", "Progress": 100}
+
+    # Show the messages of all the stages that are running
+    messages = [PIPELINE_STAGE_MESSAGES[name] for name, status in stages.items()
+                if status == STAGE_RUNNING and name in PIPELINE_STAGE_MESSAGES]
+
+    if len(messages) == 0:
+        # Only stages without messages are running, or none are; show the next stage's message, if there is one
+        started = [name for name, status in stages.items() if status != STAGE_PENDING]
+        remaining = [name for name, status in stages.items() if status != STAGE_DONE]
+        next_messages = [PIPELINE_STAGE_MESSAGES[name] for name in remaining
+                         if stages[name] == STAGE_PENDING and name in PIPELINE_STAGE_MESSAGES]
+
+        if len(started) == 0:  # The job has just started
+            message = "Starting to process spectrogram."
+        elif len(remaining) <= 1 or len(next_messages) == 0:  # Only the last stage or the status update is left
+            message = "Performing final touches."
+        else:
+            message = next_messages[0]
+    else:
+        message = " ".join(messages)
+
+    # Add up the weights of the finished stages, where stages that report their progress count as partly finished
+    total_weight = sum(PIPELINE_STAGE_WEIGHTS.get(name, 1) for name in stages)
+    done_weight = 0
+
+    for name, status in stages.items():
+        if status == STAGE_DONE:
+            done_weight += PIPELINE_STAGE_WEIGHTS.get(name, 1)
+        elif status == STAGE_RUNNING and name in progress and progress[name][0] is not None:
+            num_done, num_total = progress[name][0]
+            done_weight += PIPELINE_STAGE_WEIGHTS.get(name, 1) * num_done / num_total
+
+    # Calculate the progress percentage; it only reaches 100 once the status is updated
+    if total_weight == 0:
+        progress_percentage = 0
+    else:
+        progress_percentage = min(round(done_weight / total_weight * 100, 1), 99.9)  # In the interval [0, 99.9]
+
+    return {"Message": message, "Progress": progress_percentage, "Preview": job_data["preview"]}
+
+
+def save_spectrogram_data(data_folder: str, spectrogram: np.ndarray, frequencies: np.ndarray, times: np.ndarray,
+                          progress: Optional[list], chunk_frames: int = SPECTROGRAM_CHUNK_FRAMES):
+    # Split the spectrogram into chunks of quantised data for the clients to render, saving them in a new folder so
+    # that the old data can be shown until the new data is done
+    shutil.rmtree(data_folder + ".new", ignore_errors=True)
+    generate_spectrogram_chunks(spectrogram, frequencies, times, data_folder + ".new", chunk_frames=chunk_frames,
+                                dtype=SPECTROGRAM_DATA_DTYPE, progress=progress)
+
+    # Swap the new data in for any old data
+    shutil.rmtree(data_folder + ".old", ignore_errors=True)
+    if os.path.isdir(data_folder):
+        os.rename(data_folder, data_folder + ".old")
+    os.rename(data_folder + ".new", data_folder)
+    shutil.rmtree(data_folder + ".old", ignore_errors=True)
+
+
+def get_beats_values(uuid: str, beats: tuple) -> dict:
+    # Get the values to save in the project's status from the tracked beats; the estimated BPM is only used if the
+    # project has no BPM yet, as one may have been saved on the transcriber page while the preview was shown
+    bpm, curve_times, curve_bpms, beat_times = beats
+    values = {
+        "tempo_curve": [[round(float(time_), 3), round(float(curve_bpm), 2)]
+                        for time_, curve_bpm in zip(curve_times, curve_bpms)],
+        "beat_times": [round(float(time_), 3) for time_ in beat_times]
+    }
+
+    if "bpm" not in projectStore.get(uuid):
+        values["bpm"] = int(round(bpm))
+
+    return values
+
+
+def analyse_region(uuid: str, status: dict, start: float, end: float, min_note: int, max_note: int) -> str:
+    # Analyse a region of a project's audio at a higher resolution than the whole spectrogram, returning the name of the
+    # region's folder; regions that were analysed before are reused
+    from src.audio import samples_to_vqt  # Imported here, as librosa is only needed by the web server for this
+    from src.io import wav_to_samples
+
+    region_name = f"{round(start * 1000)}-{round(end * 1000)}-{min_note}-{max_note}"
+    regions_folder = os.path.join(app.config["UPLOAD_FOLDER"], uuid, REGIONS_FOLDER)
+    region_folder = os.path.join(regions_folder, region_name)
+
+    with regionLock:
+        if os.path.isdir(region_folder):
+            os.utime(region_folder)  # Mark the region as recently used
+            return region_name
+
+        # Load only the region's audio, with enough on either side for the filters of the region's lowest note
+        min_freq = note_number_to_freq(min_note - 0.5)
+        max_freq = note_number_to_freq(max_note + 0.5)
+        padding = 1 / (2 ** (1 / REGION_VQT_PARAMS["bins_per_octave"]) - 1) / min_freq / 2
+
+        load_start = max(start - padding, 0.)
+        load_end = min(end + padding, status["duration"])
+        samples, sample_rate = wav_to_samples(os.path.join(app.config["UPLOAD_FOLDER"], uuid,
+                                                           status["audio_file_name"]),
+                                              offset=load_start, duration=load_end - load_start)
+
+        # Compute the VQT of the whole frequency range, so that one set of filters serves every region, and crop it to
+        # the region's notes and times
+        spectrogram, frequencies, times = samples_to_vqt(sample_rate, samples, **REGION_VQT_PARAMS)
+        times += load_start
+
+        bins = np.flatnonzero((frequencies >= min_freq) & (frequencies <= max_freq))
+        frames = np.flatnonzero((times >= start) & (times <= end))
+        spectrogram = spectrogram[bins[0]:bins[-1] + 1, frames[0]:frames[-1] + 1]
+
+        # Save the region as a single chunk, then delete the least recently used regions
+        save_spectrogram_data(region_folder, spectrogram, frequencies[bins], times[frames], None,
+                              chunk_frames=len(frames))
+
+        region_names = sorted(os.listdir(regions_folder), reverse=True,
+                              key=lambda name: os.path.getmtime(os.path.join(regions_folder, name)))
+        for name in region_names[MAX_CACHED_REGIONS:]:
+            shutil.rmtree(os.path.join(regions_folder, name), ignore_errors=True)
+
+    return region_name
+
+
+@lru_cache(maxsize=FILE_HASH_CACHE_SIZE)
+def hash_file_version(file_path: str, mtime_ns: int, size: int) -> str:
+    # Hash the contents of a file; the modification time and the size are only part of the cache key, so that the hash
+    # is computed again when the file changes
+    return generate_hash_from_file(file_path)
+
 
-    # Convert the spectrogram data into a spectrogram image
-    thread_data["phase"] = 6  # Generating spectrogram image
-    image = generate_spectrogram_img(spectrogram, frequencies, times, duration, progress=thread_data["progress"],
-                                     batch_size=BATCH_SIZE, px_per_second=PX_PER_SECOND, img_height=SPECTROGRAM_HEIGHT)
+def get_file_hash(file_path: Optional[str]) -> Optional[str]:
+    # Get the hash of the contents of a file, if it exists
+    if file_path is None or not os.path.isfile(file_path):
+        return None
 
-    # Save the image
-    thread_data["phase"] = 7  # Saving spectrogram image
-    image.save(os.path.join(folder_path, f"{filename}.png"))
+    stat = os.stat(file_path)
+    return hash_file_version(file_path, stat.st_mtime_ns, stat.st_size)
+
+
+@lru_cache(maxsize=COMPRESSED_FILE_CACHE_SIZE)
+def compress_file_version(file_path: str, mtime_ns: int, size: int) -> bytes:
+    # Compress a file once, so that it is sent compressed without compressing it for every request
+    with open(file_path, "rb") as f:
+        return gzip.compress(f.read(), compresslevel=9, mtime=0)
+
+
+def set_cache_headers(response: Response, immutable: bool) -> Response:
+    # Responses to URLs with the hash of their content never change, so browsers can keep them without asking again;
+    # the others have to be checked with their ETags every time
+    if immutable:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    else:
+        response.cache_control.no_cache = True
+        response.cache_control.max_age = None
+
+    return response
+
+
+def send_cacheable_file(folder_path: str, path: str, compress: bool = False) -> Response:
+    # Send a file with the hash of its contents as its ETag, supporting range requests; if required, text files are
+    # sent compressed to clients that accept gzip
+    file_path = safe_join(os.path.abspath(folder_path), path)
+    file_hash = get_file_hash(file_path)
+
+    if file_hash is None:
+        return abort(404)
+
+    immutable = request.args.get("v") == file_hash
+    compress = compress and os.path.splitext(file_path)[1] in COMPRESSIBLE_EXTENSIONS
+
+    if compress and "gzip" in request.accept_encodings:
+        stat = os.stat(file_path)
+        response = Response(compress_file_version(file_path, stat.st_mtime_ns, stat.st_size),
+                            mimetype=mimetypes.guess_type(file_path)[0] or "application/octet-stream",
+                            headers={"Content-Encoding": "gzip"})
+        response.set_etag(f"{file_hash}-gzip")  # Each encoding needs its own ETag
+        response.vary.add("Accept-Encoding")
+        return set_cache_headers(response, immutable).make_conditional(request, accept_ranges=True)
+
+    # Let Flask answer the conditional and range requests of the file as it is stored
+    response = send_file(file_path, etag=file_hash)
+    if compress:
+        response.vary.add("Accept-Encoding")
+
+    return set_cache_headers(response, immutable)
+
+
+def send_chunks_manifest(data_folder: str) -> Response:
+    # Send the manifest of some spectrogram data's chunks, along with the colours to render the data with
+    try:
+        with open(os.path.join(data_folder, CHUNKS_MANIFEST_FILE_NAME), "r") as f:
+            manifest = json.load(f)
+    except OSError:  # No such data, or the data is being replaced
+        return abort(404)
+
+    # Clients check that the manifest has not changed before using the copy that they have
+    manifest["colour_lut"] = SPECTROGRAM_COLOUR_LUT
+    response = Response(json.dumps(manifest), mimetype="application/json")
+    response.add_etag()
+    return set_cache_headers(response, False).make_conditional(request)
+
+
+def holding_project_lock(view):
+    # Run a page's view while holding the lock of the project that it is given the UUID of, so that the retention policy
+    # does not delete the project's files in between the view checking them and submitting a job that uses them
+    @wraps(view)
+    def wrapper(uuid: str, *args, **kwargs):
+        with projectStore.lock(uuid) as locked:
+            if not locked:
+                flash("The server is busy processing other files. Please try again later.", category="msg")
+                return redirect(url_for("main_page"))
+
+            return view(uuid, *args, **kwargs)
+
+    return wrapper
+
+
+def get_spectrogram_data_folder(uuid: str) -> Optional[str]:
+    # Get the project's status, checking if the project has spectrogram data
+    status = projectStore.get(uuid)
+
+    if status is None or not status.get("spectrogram_data"):
+        return None
+
+    # Check that the data folder is inside the project's folder
+    folder_path = safe_join(app.config["UPLOAD_FOLDER"], uuid)
+    return None if folder_path is None else safe_join(folder_path, status["spectrogram_data"])
+
+
+def send_chunk(data_folder: str, chunk_no: int) -> Response:
+    # Read the compressed chunk
+    try:
+        with open(os.path.join(data_folder, f"{chunk_no}{CHUNK_FILE_EXTENSION}"), "rb") as f:
+            chunk = f.read()
+    except OSError:  # No such chunk, or the data is being replaced
+        return abort(404)
+
+    # Send the chunk as it is stored to clients that accept gzip, and decompress it for the others; each encoding
+    # needs its own ETag
+    chunk_hash = sha1(chunk).hexdigest()
+
+    if "gzip" in request.accept_encodings:
+        response = Response(chunk, mimetype="application/octet-stream", headers={"Content-Encoding": "gzip"})
+        response.set_etag(chunk_hash)
+    else:
+        response = Response(gzip.decompress(chunk), mimetype="application/octet-stream")
+        response.set_etag(f"{chunk_hash}-identity")
+
+    # The URLs of the chunks have their hashes from the manifest, so a chunk at such a URL never changes
+    response.vary.add("Accept-Encoding")
+    return set_cache_headers(response, request.args.get("v") == chunk_hash).make_conditional(request)
+
+
+def processing_file(file: str, uuid: str, job_data: dict):
+    # Import the functions that use librosa here, so that processes which never run jobs do not import it
+    from src.audio import samples_to_vqt, track_beats
+
+    # Generate the folder paths
+    folder_path = os.path.join(app.config["UPLOAD_FOLDER"], uuid)
+    data_folder = os.path.join(folder_path, SPECTROGRAM_DATA_FOLDER)
+
+    # Split the file into its filename and extension
+    filename, extension = os.path.splitext(file)
+
+    # Use uploads that are already CBR MP3s with a suitable bitrate as they are, instead of encoding them again
+    uploaded_bitrate = probe_mp3_bitrate(os.path.join(folder_path, file)) if extension.lower() == ".mp3" else None
+    use_upload = uploaded_bitrate is not None and \
+        ACCEPTED_CBR_MP3_BITRATES[0] <= uploaded_bitrate <= ACCEPTED_CBR_MP3_BITRATES[1]
+
+    # The preview must not replace the full resolution data if it happens to be saved first
+    data_lock = threading.Lock()
+    data_saved = [False]
+
+    # Define the stages of the processing
+    def decode():
+        # Convert the audio file into an `AudioSegment` object
+        return audio_to_audiosegment(os.path.join(folder_path, file))
+
+    def samples(decode):
+        # Get the samples directly from the audio segment
+        return audiosegment_to_samples(decode)
+
+    def mp3(decode=None):
+        if use_upload:
+            # Link the uploaded file as the CBR MP3, copying it if links are not supported; it does not need the audio
+            # segment, so this runs while the file is still being decoded
+            try:
+                os.link(os.path.join(folder_path, file), os.path.join(folder_path, filename + "_cbr.mp3"))
+            except OSError:
+                shutil.copyfile(os.path.join(folder_path, file), os.path.join(folder_path, filename + "_cbr.mp3"))
+        else:
+            # Convert the audio file into a CBR MP3
+            audiosegment_to_mp3(decode, os.path.join(folder_path, filename + "_cbr"), bitrate=CBR_MP3_BITRATE)
 
-    # Estimate the BPM of the sample
-    thread_data["phase"] = 8  # Final touches
-    bpm = int(estimate_bpm(samples, sample_rate)[0])  # Todo: support dynamic BPM
+        # Update the project's status on the audio file to reference
+        projectStore.update(uuid, PROJECT_PROCESSING, audio_file_name=filename + "_cbr.mp3")
 
-    # Update status file
-    update_status_file(
-        os.path.join(folder_path, "status.yaml"),
-        spectrogram=f"{filename}.png",
-        bpm=bpm,
-        duration=duration,
+    def cleanup(decode, mp3):
+        # We can now delete the original file, as it is no longer being read
+        os.remove(os.path.join(folder_path, file))
+
+    def vqt(samples):
+        # Convert the samples into a spectrogram, unless it was already cached; it is written to a file instead of
+        # being held in memory, as is a cached spectrogram when it is restored
+        vqt_path = os.path.join(folder_path, VQT_FILE_NAME)
+        function = partial(samples_to_vqt, block_frames=VQT_BLOCK_FRAMES, out_path=vqt_path,
+                           progress=job_data["progress"]["vqt"])
+        return spectralCache.get_or_compute(uuid, "vqt", function, samples[1], samples[0], out_path=vqt_path,
+                                            **VQT_PARAMS)
+
+    def data(vqt):
+        # Save the spectrogram data for the clients to render, replacing the preview's data
+        with data_lock:
+            save_spectrogram_data(data_folder, *vqt, job_data["progress"]["data"])
+            data_saved[0] = True
+
+    def preview(samples, mp3, duration):
+        # Generate a coarse spectrogram quickly, so that the project can be opened before the full one is done; the
+        # duration is passed on as this is the last stage that needs it
+        try:
+            preview_vqt = samples_to_vqt(samples[1], samples[0], **PREVIEW_VQT_PARAMS)
+        except (AssertionError, ValueError) as e:  # The preview is optional, so a failure must not stop the job
+            app.logger.warning(f"Could not generate the spectrogram preview of {uuid}: {e!r}")
+            return duration
+
+        # Publish the preview, unless the full resolution data is already there
+        with data_lock:
+            if data_saved[0]:
+                return duration
+
+            save_spectrogram_data(data_folder, *preview_vqt, None)
+            projectStore.update(uuid, None, spectrogram_data=SPECTROGRAM_DATA_FOLDER, duration=duration,
+                                spectrogram_preview=True)
+            job_data["preview"] = True
+
+        return duration
+
+    def beats(vqt):
+        # Track the changing tempo and the beats using the spectrogram data, instead of transforming the samples again
+        return track_beats(vqt[0], vqt[2])
+
+    def duration(samples):
+        # Calculate the duration of the audio, saving it straight away so that the project can be rerendered if a later
+        # stage fails
+        audio_duration = get_audio_length(*samples)
+        projectStore.update(uuid, None, duration=audio_duration)
+        return audio_duration
+
+    # Run the stages, with independent stages running at the same time
+    try:
+        results = run_job_stages({
+            "decode": (decode, []),
+            "samples": (samples, ["decode"]),
+            "mp3": (mp3, [] if use_upload else ["decode"]),
+            "cleanup": (cleanup, ["decode", "mp3"]),
+            "vqt": (vqt, ["samples"]),
+            "data": (data, ["vqt"]),
+            "beats": (beats, ["vqt"]),
+            "duration": (duration, ["samples"]),
+            "preview": (preview, ["samples", "mp3", "duration"])
+        }, job_data)
+    finally:
+        remove_vqt_file(folder_path)
+
+    # Update the project's status
+    projectStore.update(
+        uuid,
+        PROJECT_GENERATED,
+        spectrogram_data=SPECTROGRAM_DATA_FOLDER,
+        spectrogram_settings=get_spectrogram_settings(),
+        duration=results["preview"],
+        **get_beats_values(uuid, results["beats"]),
+        spectrogram_preview=False,
         spectrogram_generated=True
     )
-    thread_data["phase"] = 9  # Everything done
+    job_data["done"] = True
 
 
-def update_status_file(status_file: str, **status_updates):
-    # Load current status from file
-    with open(status_file, "r") as f:
-        status = yaml.load(f, yaml.Loader)
+def rerendering_file(uuid: str, job_data: dict):
+    # Import the functions that use librosa here, so that processes which never run jobs do not import it
+    from src.audio import samples_to_vqt, track_beats
 
-    # Update status
-    for key, value in status_updates.items():
-        status[key] = value
-
-    # Dump updated status back to file
-    with open(status_file, "w") as f:
-        yaml.dump(status, f)
+    # Generate the folder paths and get the project's status
+    folder_path = os.path.join(app.config["UPLOAD_FOLDER"], uuid)
+    data_folder = os.path.join(folder_path, SPECTROGRAM_DATA_FOLDER)
+    status = projectStore.get(uuid)
+
+    # Save the spectrogram data again from the cached VQT, or from the CBR MP3 file if the VQT is no longer cached
+    def vqt():
+        vqt_path = os.path.join(folder_path, VQT_FILE_NAME)
+
+        cached_vqt = spectralCache.load(uuid, "vqt", out_path=vqt_path, **VQT_PARAMS)
+        if cached_vqt is not None:
+            return cached_vqt
+
+        samples, sample_rate = audiosegment_to_samples(
+            audio_to_audiosegment(os.path.join(folder_path, status["audio_file_name"]))
+        )
+        return samples_to_vqt(sample_rate, samples, block_frames=VQT_BLOCK_FRAMES, out_path=vqt_path,
+                              progress=job_data["progress"]["vqt"], **VQT_PARAMS)
+
+    def data(vqt):
+        save_spectrogram_data(data_folder, *vqt, job_data["progress"]["data"])
+
+    def beats(vqt):
+        # Track the beats of projects from older versions, which only have an estimated BPM
+        return track_beats(vqt[0], vqt[2])
+
+    def duration():
+        # Calculate the duration of projects whose processing failed before it was saved
+        return get_audio_length(*audiosegment_to_samples(
+            audio_to_audiosegment(os.path.join(folder_path, status["audio_file_name"]))
+        ))
+
+    stages = {"vqt": (vqt, []), "data": (data, ["vqt"])}
+    if status.get("beat_times") is None:
+        stages["beats"] = (beats, ["vqt"])
+    if status.get("duration") is None:
+        stages["duration"] = (duration, [])
 
+    try:
+        results = run_job_stages(stages, job_data)
+    finally:
+        remove_vqt_file(folder_path)
+
+    # Remove the spectrogram image of older versions, which clients no longer use
+    if status.get("spectrogram"):
+        try:
+            os.remove(os.path.join(folder_path, status["spectrogram"]))
+        except OSError:
+            pass
+
+    # Update the project's status
+    projectStore.update(
+        uuid,
+        PROJECT_GENERATED,
+        spectrogram_data=SPECTROGRAM_DATA_FOLDER,
+        spectrogram=None,
+        spectrogram_settings=get_spectrogram_settings(),
+        **(get_beats_values(uuid, results["beats"]) if "beats" in results else {}),
+        **({"duration": results["duration"]} if "duration" in results else {}),
+        spectrogram_preview=False,
+        spectrogram_generated=True
+    )
+    job_data["done"] = True
+
+
+# RETENTION SETUP
+retentionManager = RetentionManager(app.config["UPLOAD_FOLDER"], MEDIA_FILES_MAX_SIZE, max_age=MAX_PROJECT_AGE,
+                                    derived_artifacts=DERIVED_ARTIFACTS, is_in_use=is_project_in_use,
+                                    on_evict=on_project_evicted, get_last_used=projectStore.get_last_used,
+                                    claim=lambda uuid: projectStore.lock(uuid, timeout=0))
+
+
+@app.before_request
+def start_retention_thread():
+    # Start enforcing the retention policy once the server handles its first request, so that scripts which only import
+    # the app (like `batch.py`) never delete anything; with a shared job backend, there are several web processes, so
+    # `serve.py` enforces it in a process of its own instead
+    global retentionThread
+
+    if app.config["JOB_BACKEND"] != "local":
+        return
+
+    with retentionThreadLock:
+        if retentionThread is None:
+            retentionThread = threading.Thread(target=enforce_retention_policy, daemon=True)
+            retentionThread.start()
+
+
+# METRICS SETUP
+# Measurements of the jobs, which are added when each job is done
+metrics.add_counter("auditranscribe_jobs_total", "Number of jobs that finished or failed.")
+metrics.add_histogram("auditranscribe_job_wall_time_seconds", "Wall time of each job's stages.", TIME_BUCKETS)
+metrics.add_histogram("auditranscribe_stage_wall_time_seconds", "Wall time of each stage of a job.", TIME_BUCKETS)
+metrics.add_histogram("auditranscribe_stage_cpu_time_seconds", "CPU time of each stage of a job.", TIME_BUCKETS)
+metrics.add_histogram("auditranscribe_stage_peak_rss_increase_bytes",
+                      "Increase of the peak memory usage of the worker process during each stage of a job.",
+                      MEMORY_BUCKETS)
+metrics.add_counter("auditranscribe_spectral_cache_lookups_total", "Number of lookups in the spectral cache by jobs.")
+scheduler.on_job_done = record_job_metrics
+
+# Current state of the scheduler and the cache, which is read whenever the metrics are requested
+metrics.add_gauge("auditranscribe_queued_jobs", "Number of jobs waiting for a free worker process.",
+                  lambda: scheduler.queue_length)
+metrics.add_gauge("auditranscribe_running_jobs", "Number of jobs that are running.", lambda: scheduler.num_running)
+metrics.add_gauge("auditranscribe_active_audio_seconds", "Total duration of the audio of queued and running jobs.",
+                  lambda: scheduler.total_cost)
+metrics.add_gauge("auditranscribe_spectral_cache_hit_ratio", "Fraction of the spectral cache lookups that were hits.",
+                  get_cache_hit_ratio)
+
+# Deletions by the retention policy, and the size of the projects' folders when it was last enforced
+metrics.add_counter("auditranscribe_retention_reclaimed_bytes_total", "Bytes reclaimed by the retention policy.")
+metrics.add_counter("auditranscribe_retention_deletions_total", "Number of things deleted by the retention policy.")
+metrics.add_gauge("auditranscribe_media_files_bytes", "Total size of the projects' folders.")
 
 # FOLDER PATHS
 @app.route("/media/<uuid>/<path:path>")
 def send_media(uuid, path):
     # Generate the UUID's folder's path
-    folder_path = os.path.join(app.config["UPLOAD_FOLDER"], uuid)
+    folder_path = safe_join(app.config["UPLOAD_FOLDER"], uuid)
 
     # Check if the UUID is valid
-    if not os.path.isdir(folder_path):
+    if folder_path is None or not os.path.isdir(folder_path):
         return abort(404)  # Not found
 
-    return send_from_directory(os.path.join("..", folder_path), path)  # Go out of the "app" directory into the root
+    return send_cacheable_file(folder_path, path)
+
+
+@app.endpoint("static")
+def send_static(filename):
+    # Send the static files compressed, with the hashes of their contents as their ETags
+    return send_cacheable_file(app.static_folder, filename, compress=True)
+
+
+@app.url_defaults
+def add_file_hash(endpoint, values):
+    # Add the hash of the file to the URLs of static and media files, so that browsers can keep them until they change
+    if "v" in values:
+        return
+
+    if endpoint == "static":
+        file_hash = get_file_hash(safe_join(app.static_folder, values.get("filename", "")))
+    elif endpoint == "send_media":
+        file_hash = get_file_hash(
+            safe_join(app.config["UPLOAD_FOLDER"], values.get("uuid", ""), values.get("path", ""))
+        )
+    else:
+        return
+
+    if file_hash is not None:
+        values["v"] = file_hash
 
 
 # API PAGES
+@app.route("/api/analyse-region/<uuid>", methods=["POST"])
+def analyse_region_api(uuid):
+    # Get the project's status, checking if its audio is ready to be analysed
+    status = projectStore.get(uuid)
+
+    if status is None:
+        return json.dumps({"outcome": "error", "msg": "UUID doesn't exist."})
+    if status.get("audio_file_name") is None or status.get("duration") is None:
+        return json.dumps({"outcome": "error", "msg": "The project's audio has not been processed yet."})
+
+    # Get the region; its times are widened to multiples of the time step so that similar regions are reused
+    region = request.get_json(silent=True) or {}
+
+    try:
+        start = max(math.floor(float(region["start"]) / REGION_TIME_STEP) * REGION_TIME_STEP, 0.)
+        end = min(math.ceil(float(region["end"]) / REGION_TIME_STEP) * REGION_TIME_STEP, status["duration"])
+        min_note = max(int(region["min_note"]), NOTE_NUMBER_RANGE[0])
+        max_note = min(int(region["max_note"]), NOTE_NUMBER_RANGE[1])
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return json.dumps({"outcome": "error", "msg": "The region is invalid."})
+
+    # Check the region
+    if not (start < end and min_note <= max_note):
+        return json.dumps({"outcome": "error", "msg": "The region is empty."})
+    if end - start > MAX_REGION_DURATION:
+        return json.dumps({"outcome": "error", "msg": f"Regions cannot be longer than {MAX_REGION_DURATION} seconds."})
+
+    # Analyse the region, holding the project's lock so that the retention policy does not delete the project meanwhile
+    with projectStore.lock(uuid) as locked:
+        if not locked or projectStore.get_state(uuid) is None:
+            return json.dumps({"outcome": "error", "msg": "The region could not be analysed."})
+
+        projectStore.touch(uuid)
+
+        try:
+            region_name = analyse_region(uuid, status, start, end, min_note, max_note)
+        except (AssertionError, IndexError, ValueError, OSError) as e:
+            app.logger.warning(f"Could not analyse a region of {uuid}: {e!r}")
+            return json.dumps({"outcome": "error", "msg": "The region could not be analysed."})
+
+    return json.dumps({
+        "outcome": "ok",
+        "region": region_name,
+        "url": url_for("region_data_manifest", uuid=uuid, region=region_name)
+    })
+
+
 @app.route("/api/delete-project/<uuid>", methods=["POST"])
 def delete_project(uuid):
     # Generate the UUID's folder's path
@@ -182,8 +969,9 @@ def delete_project(uuid):
     if not os.path.isdir(folder_path):
         return abort(404)
 
-    # Delete the entire project folder
+    # Delete the entire project folder and the project's status
     shutil.rmtree(folder_path)
+    projectStore.delete(uuid)
 
     # Redirect to main page
     flash(f"Project with UUID {uuid} was deleted.", category="msg")
@@ -195,78 +983,119 @@ def delete_project(uuid):
 
 @app.route("/api/download-quicklink/<uuid>", methods=["POST"])
 def download_quicklink(uuid):
-    # Generate the UUID's folder's path
-    folder_path = os.path.join(app.config["UPLOAD_FOLDER"], uuid)
+    # Get the project's status
+    status = projectStore.get(uuid)
 
-    # Check if a folder with that UUID exists
-    if not os.path.isdir(folder_path):
+    # Check if a project with that UUID exists
+    if status is None:
         return abort(404)
 
-    # Send the status file
-    return send_file(os.path.join("..", folder_path, "status.yaml"))
+    # Send the status as a YAML quicklink file
+    return Response(yaml.dump(status), mimetype="text/plain")
+
+
+@app.route("/api/project-status/<uuid>")
+def project_status(uuid):
+    # Get the project's status, checking if a project with that UUID exists
+    status = projectStore.get(uuid)
+
+    if status is None:
+        return abort(404)
+
+    # Send the status; used by the transcriber page to get the values that are only known once processing is done
+    return Response(json.dumps(status), mimetype="application/json")
+
+
+@app.route("/api/progress-stream/<uuid>")
+def progress_stream(uuid):
+    # Push the job's progress to the client as server-sent events whenever it changes
+    def generate_events():
+        last_progress = None
+        last_sent_time = time.monotonic()
+
+        while True:
+            progress = get_job_progress(uuid)
+
+            if progress != last_progress:
+                yield f"data: {json.dumps(progress)}\n\n"
+                last_progress = progress
+                last_sent_time = time.monotonic()
+            elif time.monotonic() - last_sent_time >= PROGRESS_STREAM_KEEPALIVE:
+                yield ": keepalive\n\n"  # Comment line, to stop proxies from closing an idle connection
+                last_sent_time = time.monotonic()
+
+            # Stop once the job is done or has failed
+            if progress.get("Progress") in (None, 100):
+                return
+
+            time.sleep(PROGRESS_STREAM_INTERVAL)
+
+    return Response(stream_with_context(generate_events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 @app.route("/api/query-process/<uuid>", methods=["POST"])
 def query_process(uuid):
-    # Get the thread data associated with that UUID
-    thread_data = processingThreads[uuid]
-
-    # Get the phase and progress data
-    phase = thread_data["phase"]
-    progress = thread_data["progress"]
-
-    # Handle each phase correctly
-    if phase == 0:  # Uploaded audio file
-        return_data = {"Message": "Starting to process spectrogram."}
-    elif phase == 1:  # Converting to audio segment
-        return_data = {"Message": "Converting to audio segment data."}
-    elif phase == 2:  # Generating WAV file
-        return_data = {"Message": "Generating WAV file."}
-    elif phase == 3:  # Generating CBR MP3
-        return_data = {"Message": "Generating constant bitrate MP3 file."}
-    elif phase == 4:  # Splitting into samples
-        return_data = {"Message": "Splitting audio into smaller samples."}
-    elif phase == 5:  # Generating VQT data
-        return_data = {"Message": "Generating spectrogram data."}
-    elif phase == 6:  # Generating spectrogram image
-        # Get the latest value in the progress
-        if progress[0] is None:  # Nothing processed yet
-            batch_no = 0
-            num_batches = 100  # Assume 100 batches
-        else:
-            batch_no, num_batches = progress[0]
+    # Get the job's progress; used by clients that cannot use the progress stream
+    return json.dumps(get_job_progress(uuid))
+
 
-        # Calculate the progress percentage
-        progress_percentage = int(batch_no / num_batches * 100)  # As a number in the interval [0, 100]
+@app.route("/api/region-data/<uuid>/<region>")
+def region_data_manifest(uuid, region):
+    # Check if the region's name is valid, so that it cannot refer to other folders
+    if not re.fullmatch(r"[0-9-]+", region):
+        return abort(404)
+
+    return send_chunks_manifest(os.path.join(app.config["UPLOAD_FOLDER"], uuid, REGIONS_FOLDER, region))
 
-        # Generate the return data
-        return_data = {"Message": "Generating spectrogram image.", "Progress": progress_percentage}
-    elif phase == 7:  # Saving spectrogram image
-        return_data = {"Message": "Saving spectrogram image."}
-    elif phase == 8:  # Final touches
-        return_data = {"Message": "Performing final touches."}
-    else:  # Phase 9; updated status file
-        return_data = {"Message": "Updated status file. Redirecting in a short while...", "Progress": 100}
 
-    return json.dumps(return_data)
+@app.route("/api/region-data/<uuid>/<region>/<int:chunk_no>")
+def region_data_chunk(uuid, region, chunk_no):
+    # Check if the region's name is valid, so that it cannot refer to other folders
+    if not re.fullmatch(r"[0-9-]+", region):
+        return abort(404)
+
+    return send_chunk(os.path.join(app.config["UPLOAD_FOLDER"], uuid, REGIONS_FOLDER, region), chunk_no)
 
 
 @app.route("/api/save-project/<uuid>", methods=["POST"])
 def save_project(uuid):
-    # Generate the UUID's folder's path
-    folder_path = os.path.join(app.config["UPLOAD_FOLDER"], uuid)
+    # Check that only the settings that the transcriber page saves are given, so that the rest of the status is kept
+    values = request.get_json(silent=True)
 
-    # Check if a folder with that UUID exists
-    if not os.path.isdir(folder_path):
-        return json.dumps({"outcome": "error", "msg": "UUID doesn't exist."})
+    if not isinstance(values, dict) or not set(values).issubset(SAVED_PROJECT_KEYS):
+        return json.dumps({"outcome": "error", "msg": "Invalid project settings."})
 
-    # Update the status file
-    update_status_file(os.path.join(folder_path, "status.yaml"), **request.json)
+    # Update the project's status, checking if a project with that UUID exists
+    if not projectStore.update(uuid, None, **values):
+        return json.dumps({"outcome": "error", "msg": "UUID doesn't exist."})
 
     # Send the status file
     return json.dumps({"outcome": "ok", "msg": "Project saved successfully."})
 
 
+@app.route("/api/spectrogram-data/<uuid>")
+def spectrogram_data_manifest(uuid):
+    # Get the project's spectrogram data folder, checking if the project has spectrogram data
+    data_folder = get_spectrogram_data_folder(uuid)
+
+    if data_folder is None:
+        return abort(404)
+
+    return send_chunks_manifest(data_folder)
+
+
+@app.route("/api/spectrogram-data/<uuid>/<int:chunk_no>")
+def spectrogram_data_chunk(uuid, chunk_no):
+    # Get the project's spectrogram data folder, checking if the project has spectrogram data
+    data_folder = get_spectrogram_data_folder(uuid)
+
+    if data_folder is None:
+        return abort(404)
+
+    return send_chunk(data_folder, chunk_no)
+
+
 @app.route("/api/upload-file", methods=["POST"])
 def upload_file():
     # Check if the request has the file
@@ -302,20 +1131,20 @@ def upload_file():
             "url": url_for("transcriber", uuid=existing_uuid)
         })
 
-    # If not existing project, save the file
-    initial_file_path = os.path.join(app.config["UPLOAD_FOLDER"], file.filename)
-    file.save(initial_file_path)
+    # Get the file's UUID from the hash of its contents, which was computed while the file was received
+    uuid = file.stream.hexdigest()
 
-    # Generate the file's UUID based on its contents
-    uuid = generate_hash_from_file(initial_file_path)
+    # Claim the UUID; this fails if a project with the same contents exists or is being uploaded at the same time
+    if not projectStore.create(uuid, PROJECT_UPLOADING, uuid=uuid, original_file_name=file.filename,
+                               audio_file_name=None, spectrogram_generated=False):
+        # Wait for any other upload of the same file to finish
+        wait_until = time.monotonic() + UPLOAD_WAIT_TIMEOUT
+        while projectStore.get_state(uuid) == PROJECT_UPLOADING and time.monotonic() < wait_until:
+            time.sleep(0.1)
 
-    # Check if a UUID like that already exists
-    try:
-        folder_path = os.path.join(app.config["UPLOAD_FOLDER"], uuid)
-        os.mkdir(folder_path)
-    except OSError:  # Folder exists => UUID exists => There already exists an existing file
-        # Delete the file on the MAIN directory
-        os.remove(initial_file_path)
+        # The other upload may have failed, in which case its project was deleted
+        if projectStore.get_state(uuid) is None:
+            return json.dumps({"outcome": "error", "msg": "Upload failed. Please try again."})
 
         # Provide the link to the existing page
         return json.dumps({
@@ -324,38 +1153,38 @@ def upload_file():
             "url": url_for("transcriber", uuid=uuid)
         })
 
-    # If it is not an existing file, move the file into the created directory
-    final_file_path = os.path.join(folder_path, file.filename)
-    shutil.move(initial_file_path, final_file_path)
-
-    # Get the file's extension
+    # Get the project folder's path and the file's extension
+    folder_path = os.path.join(app.config["UPLOAD_FOLDER"], uuid)
     _, extension = os.path.splitext(file.filename)
 
-    # Check if the file is readable
     try:
-        AudioSegment.from_file(os.path.join(folder_path, file.filename), SUPPORTED_AUDIO_EXTENSIONS[extension])
-    except (IndexError, CouldntDecodeError):
-        # Delete the file and folder from the server
-        os.remove(os.path.join(folder_path, file.filename))
-        os.rmdir(folder_path)
+        # Move the received file into the project's folder
+        os.makedirs(folder_path, exist_ok=True)  # May be left over from an upload that was interrupted
+        file.stream.close()
+        os.replace(file.stream.name, os.path.join(folder_path, file.filename))
+
+        # Check if the file is readable by decoding only its start, and get its properties from its headers
+        duration, sample_rate, num_channels = probe_audio_file(os.path.join(folder_path, file.filename))
+    except (AssertionError, CouldntDecodeError):
+        # Delete the file, folder and project from the server
+        discard_project(uuid)
 
         # Return the error message
         return json.dumps({
             "outcome": "error",
             "msg": f"File supposedly of type {extension[1:]} but couldn't decode."
         })
-
-    # Create a blank status dictionary
-    status_blank = {
-        "uuid": uuid,
-        "original_file_name": file.filename,
-        "audio_file_name": None,
-        "spectrogram_generated": False
-    }
-
-    # Create a status file
-    with open(os.path.join(folder_path, "status.yaml"), "w") as f:
-        yaml.dump(status_blank, f)
+    except Exception:
+        # Do not leave the UUID claimed if anything else went wrong
+        discard_project(uuid)
+        raise
+
+    # The project is now ready to be processed
+    projectStore.update(uuid, PROJECT_UPLOADED, audio_properties={
+        "duration": duration,
+        "sample_rate": sample_rate,
+        "channels": num_channels
+    })
 
     # Provide the link to another page for the analysis of that audio file
     return json.dumps({
@@ -365,6 +1194,12 @@ def upload_file():
     })
 
 
+@app.route("/metrics")
+def serve_metrics():
+    # Send the metrics in the Prometheus text format
+    return Response(metrics.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
 # WEBSITE PAGES
 @app.route("/")
 def main_page():
@@ -378,58 +1213,92 @@ def licenses():
 
 
 @app.route("/transcriber/<uuid>")
+@holding_project_lock
 def transcriber(uuid):
     # Generate the UUID's folder's path
     folder_path = os.path.join(app.config["UPLOAD_FOLDER"], uuid)
 
-    # Check if a folder with that UUID exists
-    if not os.path.isdir(folder_path):
+    # Get the project's status, checking if a project with that UUID exists
+    status = projectStore.get(uuid) if os.path.isdir(folder_path) else None
+
+    if status is None:
         flash(f"The UUID {uuid} does not exist.", category="msg")
         return redirect(url_for("main_page"))
 
-    # Read the status file
-    with open(os.path.join(folder_path, "status.yaml"), "r") as f:
-        status = yaml.load(f, yaml.Loader)
+    # Mark the project as recently used, so that the retention policy deletes it last
+    projectStore.touch(uuid)
+
+    # Check if the audio file is still being uploaded
+    if projectStore.get_state(uuid) == PROJECT_UPLOADING:
+        flash("The audio file is still being uploaded. Please try again in a moment.", category="msg")
+        return redirect(url_for("main_page"))
 
     # Check whether the CBR MP3 file was created yet
     audio_file_name = status["audio_file_name"]
 
     if audio_file_name is None:  # CBR MP3 not yet created
-        # Create a location to store the spectrogram generation progress
-        processingThreads[uuid]["progress"].append(None)  # One-element list for data sharing
+        # Submit the processing job; nothing happens if the job is already queued or running
+        cost = estimate_job_cost(os.path.join(folder_path, status["original_file_name"]),
+                                 status.get("audio_properties", {}).get("duration"))
+
+        accepted = scheduler.submit(uuid, processing_file, status["original_file_name"], uuid, cost=cost,
+                                    job_data=new_job_data("processing"))
 
-        # Start a multiprocessing thread and save it to the master dictionary
-        thread = threading.Thread(target=processing_file,
-                                  args=(status["original_file_name"], uuid, processingThreads[uuid]))
-        thread.start()
-        processingThreads[uuid]["thread"] = thread
+        if not accepted:
+            flash("The server is busy processing other files. Please try again later.", category="msg")
+            return redirect(url_for("main_page"))
 
         # Render the template
         return render_template("transcriber.html", spectrogram_generated=False, uuid=uuid,
                                file_name=status["original_file_name"], file_name_proper=status["original_file_name"])
     else:
-        # Check whether the spectrogram has been generated or not
+        # Check whether the spectrogram has been generated or not, and whether there is a preview to show until it is
         spectrogram_generated = status["spectrogram_generated"]
+        spectrogram_preview = not spectrogram_generated and status.get("spectrogram_preview", False)
+
+        # Save the spectrogram data again if the spectrogram settings changed (including projects from older versions,
+        # which only have spectrogram images), or if an earlier job was interrupted or failed after the CBR MP3 file was
+        # created; the rerendering also finds any values that the earlier job did not save, like the duration
+        if (spectrogram_generated and status.get("spectrogram_settings") != get_spectrogram_settings()) or \
+                (not spectrogram_generated and scheduler.get_job_state(uuid) not in (JOB_QUEUED, JOB_RUNNING)):
+            # Mark the project as processing before the job is submitted, so that a job that finishes quickly is not
+            # overwritten by this
+            state = projectStore.get_state(uuid)
+            projectStore.update(uuid, PROJECT_PROCESSING, spectrogram_generated=False)
+
+            cost = estimate_job_cost(os.path.join(folder_path, audio_file_name), status.get("duration"))
+            accepted = scheduler.submit(uuid, rerendering_file, uuid, cost=cost, job_data=new_job_data("rerendering"))
+
+            if not accepted:
+                # Put the project back the way it was; the job is submitted again when the project is next opened
+                projectStore.update(uuid, state, spectrogram_generated=spectrogram_generated)
+
+                flash("The server is busy processing other files. Please try again later.", category="msg")
+                return redirect(url_for("main_page"))
+
+            spectrogram_generated = False
 
-        if not spectrogram_generated:
+        if not spectrogram_generated and not spectrogram_preview:
             # Render the template
             return render_template("transcriber.html", spectrogram_generated=False, uuid=uuid,
                                    file_name=status["audio_file_name"],
                                    file_name_proper=re.sub(r"_cbr(?!.*_cbr)+", "", status["audio_file_name"]))
         else:
-            # Try and delete the process thread
-            if processingThreads[uuid]:
-                del processingThreads[uuid]
+            # Remove the finished job's record
+            scheduler.forget(uuid)
 
             # Render the template with the variables
-            return render_template("transcriber.html", spectrogram_generated=True, uuid=uuid,
+            return render_template("transcriber.html", spectrogram_generated=True,
+                                   spectrogram_preview=spectrogram_preview, uuid=uuid,
                                    file_name=status["audio_file_name"],
                                    file_name_proper=re.sub(r"_cbr(?!.*_cbr)+", "", status["audio_file_name"]),
                                    status=json.dumps(status), beats_per_bar_range=BEATS_PER_BAR_RANGE,
                                    bpm_range=BPM_RANGE, music_keys=MUSIC_KEYS, note_number_range=NOTE_NUMBER_RANGE,
-                                   px_per_second=PX_PER_SECOND)
+                                   px_per_second=PX_PER_SECOND, spectrogram_height=SPECTROGRAM_HEIGHT,
+                                   audio_url=url_for("send_media", uuid=uuid, path=status["audio_file_name"]))
 
 
 # TESTING CODE
 if __name__ == "__main__":
+    prepare_projects()
     app.run(threaded=True)
@@ -1,10 +1,51 @@
 // CONSTANTS
-const CHECK_STATUS_INTERVAL = 1;  // In seconds
+const CHECK_STATUS_INTERVAL = 1;  // In seconds; only used if the progress stream is not available
 
 // GET ELEMENTS
 let spectrogramProgressBar = $("#spectrogram-progress-bar");
 let spectrogramProgressDetail = $("#spectrogram-progress-detail");
 
+// HELPER FUNCTIONS
+// Shows the progress data sent by the server; returns true once the processing is complete
+function showProgress(data) {
+    // Separate the data into the message and progress
+    let message = data["Message"];
+    let progress = data["Progress"];
+
+    // Update message span
+    spectrogramProgressDetail.text(message);
+
+    // Carefully update progress bar
+    if (progress !== undefined) {
+        spectrogramProgressBar.progressbar("option", "value", progress);
+
+        // Check if progress is 100%, or if a preview of the spectrogram can already be shown
+        if (progress === 100 || data["Preview"]) {
+            // Reload the page
+            location.reload();
+            return true;
+        }
+    }
+
+    return false;
+}
+
+// Checks the progress every `CHECK_STATUS_INTERVAL` seconds
+function pollProgress() {
+    let spectrogramProgressInterval = setInterval(() => {
+        // Query the progress page
+        $.ajax({
+            url: `/api/query-process/${UUID}`,
+            method: "POST"
+        }).done((data) => {
+            // Parse and show the data, stopping the interval once the processing is complete
+            if (showProgress(JSON.parse(data))) {
+                clearInterval(spectrogramProgressInterval);
+            }
+        });
+    }, CHECK_STATUS_INTERVAL * 1000);  // Convert seconds to milliseconds
+}
+
 // MAIN FUNCTIONS
 // Called when the document has been loaded
 $(document).ready(() => {
@@ -13,36 +54,32 @@ $(document).ready(() => {
         value: 0  // Will be updated later
     });
 
-    // Start an interval checking the progress every `CHECK_STATUS_INTERVAL` seconds
-    let spectrogramProgressInterval = setInterval(() => {
-        // Query the progress page
-        $.ajax({
-            url: `/api/query-process/${UUID}`,
-            method: "POST"
-        }).done((data) => {
-            // Parse the data
-            data = JSON.parse(data);
+    // Fall back to polling if the browser does not support server-sent events
+    if (typeof EventSource === "undefined") {
+        pollProgress();
+        return;
+    }
 
-            // Separate the data into the phase number, message, and progress
-            let message = data["Message"];
-            let progress = data["Progress"];
+    // Listen to the progress that the server pushes
+    let progressStream = new EventSource(`/api/progress-stream/${UUID}`);
+    let finished = false;
 
-            // Update message span
-            spectrogramProgressDetail.text(message);
+    progressStream.onmessage = (event) => {
+        // Parse and show the data, closing the stream once the processing is complete or has failed
+        let data = JSON.parse(event.data);
 
-            // Carefully update progress bar
-            if (progress !== undefined) {
-                spectrogramProgressBar.progressbar("option", "value", progress);
+        if (showProgress(data) || data["Progress"] === undefined) {
+            finished = true;
+            progressStream.close();
+        }
+    };
 
-                // Check if progress is 100%
-                if (progress === 100) {
-                    // Stop the interval
-                    clearInterval(spectrogramProgressInterval);
+    progressStream.onerror = () => {
+        // Fall back to polling if the stream could not be opened or was dropped before the processing finished
+        progressStream.close();
 
-                    // Reload the page
-                    location.reload();
-                }
-            }
-        });
-    }, CHECK_STATUS_INTERVAL * 1000);  // Convert seconds to milliseconds
+        if (!finished) {
+            pollProgress();
+        }
+    };
 });
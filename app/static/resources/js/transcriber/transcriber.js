@@ -20,6 +20,9 @@ const PIANO_VOLUME = 0.2;  // As a number in the interval [0, 1]
 
 const PLAYHEAD_REFRESH_RATE = 50;  // Number of times refreshing occurs per second
 
+const CHUNKS_PRELOAD_MARGIN = 500;  // Distance beyond the visible area to load spectrogram chunks for, in screen pixels
+const CHECK_FULL_SPECTROGRAM_INTERVAL = 2;  // In seconds; only used if the progress stream is not available
+
 // GET ELEMENTS
 // Input fields
 let beatsOffsetInput = $("#beats-offset-input");
@@ -27,6 +30,8 @@ let beatsPerBarInput = $("#beats-per-bar-input");
 let bpmInput = $("#bpm-input");
 let musicKeyInput = $("#music-key-input");
 let scrollToPlaybackHeadCheckbox = $("#scroll-to-playback-head-checkbox");
+let spectrogramBrightnessInput = $("#spectrogram-brightness-input");
+let spectrogramContrastInput = $("#spectrogram-contrast-input");
 
 // Rows
 let topRow = $("#top-row");
@@ -35,12 +40,14 @@ let topRow = $("#top-row");
 let notesArea = $("#notes-area");
 let numbersArea = $("#numbers-area");
 let spectrogramArea = $("#spectrogram-area");
+let spectrogramChunksArea = $("#spectrogram-chunks");
 let transcriptionArea = $("#transcription-area");
 
 // Buttons
 let deleteProjectBtn = $("#delete-project-btn");
 let downloadQuicklinkBtn = $("#download-quicklink-btn");
 let saveProjectBtn = $("#save-project-btn");
+let sharpenAreaBtn = $("#sharpen-area-btn");
 
 // Canvases
 let beatsCanvas = $("#beats-canvas");
@@ -62,7 +69,8 @@ let outcomeText = $("#outcome-text");
 // Settings
 let beatsOffset = getKeyIfPresent("beats_offset", STATUS, 0);  // In seconds
 let beatsPerBar = getKeyIfPresent("beats_per_bar", STATUS, 4);
-let bpm = getKeyIfPresent("bpm", STATUS, 120);
+let bpm = getKeyIfPresent("bpm", STATUS, 120);  // Estimated once the full quality spectrogram is generated
+let bpmChanged = false;  // Whether the BPM was changed on this page
 let musicKey = getKeyIfPresent("music_key", STATUS, "C");
 
 // Contexts for canvases
@@ -74,7 +82,16 @@ let spectrogramCtx = spectrogramCanvas[0].getContext("2d");
 
 // Transcription area stuff
 let audio = new Audio();
-let spectrogram = new Image();
+let spectrogramWidth = 0;  // Width of the full resolution spectrogram, in pixels
+let spectrogramHeight = 0;  // Height of the full resolution spectrogram, in pixels
+
+// Spectrogram data
+let chunksManifest = null;  // Manifest of the chunks of the spectrogram data
+let loadedChunks = {};  // Chunks that are currently on the page, keyed by their number
+let chunksVersion = 0;  // Changed whenever the chunks are replaced, so that the browser does not show old chunks
+let rowBins = null;  // Frequency bin of the spectrogram data that is shown in each row of pixels
+let levelColours = null;  // RGBA colour of each level of the spectrogram data, with the contrast and brightness applied
+let regions = {};  // Sharpened regions of the spectrogram that are on the page, keyed by their names
 
 // Piano
 let pianoSynth = Synth.createInstrument("piano");
@@ -126,7 +143,7 @@ function freqToHeight(freq) {
 
     // Scale accordingly and return. Since (0, 0) is the upper left we have to adjust to make (0, 0) to be the lower
     // left corner instead
-    return (1 - (loggedFrequency - loggedMinimum) / (loggedMaximum - loggedMinimum)) * spectrogram.height;
+    return (1 - (loggedFrequency - loggedMinimum) / (loggedMaximum - loggedMinimum)) * spectrogramHeight;
 }
 
 // Converts a given height on the canvas to a frequency
@@ -136,7 +153,7 @@ function heightToFreq(height) {
     let maximumFreq = noteNumberToFreq(NOTE_NUMBER_RANGE[1]);
 
     // Compute the ratio of the given height and the spectrogram's height
-    let heightRatio = height / spectrogram.height;
+    let heightRatio = height / spectrogramHeight;
 
     // Return the estimated frequency
     return Math.pow(minimumFreq, heightRatio) * Math.pow(maximumFreq, 1 - heightRatio);
@@ -144,7 +161,7 @@ function heightToFreq(height) {
 
 // Gets the height difference between two adjacent notes
 function getHeightDifference() {
-    return spectrogram.height / (NOTE_NUMBER_RANGE[1] - NOTE_NUMBER_RANGE[0]);
+    return spectrogramHeight / (NOTE_NUMBER_RANGE[1] - NOTE_NUMBER_RANGE[0]);
 }
 
 // Gets the key in a JSON object if it is present
@@ -265,6 +282,509 @@ function drawBarsNumbersLabels() {
     }
 }
 
+// Finds the frequency bin shown in each row of pixels of a canvas, where each bin covers the frequencies between the
+// midpoints of its frequency and its neighbours' frequencies; the canvas starts at the height `top` of the spectrogram
+function getRowBins(frequencies, top, numRows, rowHeight) {
+    let bins = new Int32Array(numRows);
+
+    for (let row = 0; row < numRows; row++) {
+        let freq = heightToFreq(top + (row + 0.5) * rowHeight);  // Frequency at the centre of the row
+
+        // Binary search for the first bin whose upper boundary is at least that frequency
+        let low = 0;
+        let high = frequencies.length - 1;
+
+        while (low < high) {
+            let middle = Math.floor((low + high) / 2);
+
+            if ((frequencies[middle] + frequencies[middle + 1]) / 2 < freq) {
+                low = middle + 1;
+            } else {
+                high = middle;
+            }
+        }
+
+        bins[row] = low;
+    }
+
+    return bins;
+}
+
+// Uses the manifest of the spectrogram data's chunks, working out how to map the data onto the spectrogram
+function useChunksManifest(manifest) {
+    chunksManifest = manifest;
+
+    // Find the bin shown in each row of pixels; the top row is the highest frequency
+    rowBins = getRowBins(chunksManifest["frequencies"], 0, spectrogramHeight, 1);
+
+    // Work out the colours of the levels
+    updateLevelColours();
+}
+
+// Works out the colour of each level of the spectrogram data, given the contrast and brightness
+function updateLevelColours() {
+    let colourLUT = chunksManifest["colour_lut"];
+    let maxLevel = chunksManifest["dtype"] === "uint16" ? 65535 : 255;
+
+    // The contrast raises the level shown with the lowest colour, and the brightness lowers the level shown with the
+    // highest colour
+    let lowest = parseInt(spectrogramContrastInput.val()) / 100 * maxLevel;
+    let highest = Math.max((1 - parseInt(spectrogramBrightnessInput.val()) / 100) * maxLevel, lowest + 1);
+
+    levelColours = new Uint8ClampedArray((maxLevel + 1) * 4);
+
+    for (let level = 0; level <= maxLevel; level++) {
+        let position = Math.min(Math.max((level - lowest) / (highest - lowest), 0), 1);
+        let colour = colourLUT[Math.round(position * (colourLUT.length - 1))];
+
+        levelColours.set([colour[0], colour[1], colour[2], 255], level * 4);
+    }
+}
+
+// Colours a loaded chunk of the spectrogram data onto its canvas, showing the bin `bins[row]` in each row
+function drawChunk(chunk, bins) {
+    let canvas = chunk["canvas"][0];
+    let image = canvas.getContext("2d").createImageData(canvas.width, canvas.height);
+    let pixels = image.data;
+    let levels = chunk["levels"];
+
+    for (let row = 0; row < canvas.height; row++) {
+        let levelsStart = bins[row] * canvas.width;  // Rows of the data go from the lowest to highest frequency
+        let pixelsStart = row * canvas.width * 4;
+
+        for (let column = 0; column < canvas.width; column++) {
+            let colourStart = levels[levelsStart + column] * 4;
+            let pixelStart = pixelsStart + column * 4;
+
+            pixels[pixelStart] = levelColours[colourStart];
+            pixels[pixelStart + 1] = levelColours[colourStart + 1];
+            pixels[pixelStart + 2] = levelColours[colourStart + 2];
+            pixels[pixelStart + 3] = levelColours[colourStart + 3];
+        }
+    }
+
+    canvas.getContext("2d").putImageData(image, 0, 0);
+}
+
+// Gets the version to request a chunk of spectrogram data with; chunks requested with their hash are cached by the
+// browser until they change
+function getChunkVersion(manifest, chunkNo) {
+    if ("chunk_hashes" in manifest) {
+        return manifest["chunk_hashes"][chunkNo];
+    }
+    return chunksVersion;  // Data from older versions has no hashes
+}
+
+// Adds a chunk of the spectrogram data to the page, drawing it once its data is downloaded
+function loadChunk(chunkNo) {
+    // Get the frames in the chunk; the last chunk may have fewer frames
+    let chunkFrames = chunksManifest["chunk_frames"];
+    let numFrames = Math.min(chunkFrames, chunksManifest["num_frames"] - chunkNo * chunkFrames);
+    let timeStep = chunksManifest["time_step"];
+
+    // Create the chunk's canvas, with one pixel for every frame and row, stretched so that each frame is centred on its
+    // time
+    let canvas = $("<canvas>", {class: "spectrogram-chunk"});
+    canvas[0].width = numFrames;
+    canvas[0].height = spectrogramHeight;
+    canvas.css({
+        left: (chunksManifest["time_offset"] + (chunkNo * chunkFrames - 0.5) * timeStep) * PX_PER_SECOND,
+        top: 0,
+        width: numFrames * timeStep * PX_PER_SECOND,
+        height: spectrogramHeight
+    });
+
+    let chunk = {canvas: canvas, levels: null};
+    spectrogramChunksArea.append(canvas);
+    loadedChunks[chunkNo] = chunk;
+
+    // Get the chunk's data from the server
+    let request = new XMLHttpRequest();
+    request.open("GET", `/api/spectrogram-data/${UUID}/${chunkNo}?v=${getChunkVersion(chunksManifest, chunkNo)}`, true);
+    request.responseType = "arraybuffer";
+    request.onload = function () {
+        // Ignore the data if the chunk was removed while it was downloading
+        if (this.status !== 200 || loadedChunks[chunkNo] !== chunk) {
+            return;
+        }
+
+        if (chunksManifest["dtype"] === "uint16") {
+            chunk["levels"] = new Uint16Array(this.response);
+        } else {
+            chunk["levels"] = new Uint8Array(this.response);
+        }
+
+        drawChunk(chunk, rowBins);
+    };
+    request.send();
+}
+
+// Loads the spectrogram chunks near the visible area and removes the chunks that are far away from it
+function updateVisibleChunks() {
+    // Get the times that need chunks, in seconds
+    let area = transcriptionArea[0];
+
+    let left = Math.max(area.scrollLeft - CHUNKS_PRELOAD_MARGIN, 0) / SPECTROGRAM_ZOOM_SCALE_X / PX_PER_SECOND;
+    let right = (area.scrollLeft + area.clientWidth + CHUNKS_PRELOAD_MARGIN) / SPECTROGRAM_ZOOM_SCALE_X / PX_PER_SECOND;
+
+    // Get the range of chunks needed
+    let chunkDuration = chunksManifest["chunk_frames"] * chunksManifest["time_step"];
+    let firstChunk = Math.max(Math.floor((left - chunksManifest["time_offset"]) / chunkDuration), 0);
+    let lastChunk = Math.min(
+        Math.floor((right - chunksManifest["time_offset"]) / chunkDuration), chunksManifest["num_chunks"] - 1
+    );
+
+    // Add the chunks that are not yet on the page
+    for (let chunkNo = firstChunk; chunkNo <= lastChunk; chunkNo++) {
+        if (!(chunkNo in loadedChunks)) {
+            loadChunk(chunkNo);
+        }
+    }
+
+    // Remove the chunks that are no longer needed, so that memory use does not grow with the length of the track
+    for (let chunkNo of Object.keys(loadedChunks)) {
+        if (chunkNo < firstChunk || chunkNo > lastChunk) {
+            loadedChunks[chunkNo]["canvas"].remove();
+            delete loadedChunks[chunkNo];
+        }
+    }
+}
+
+// Redraws the loaded spectrogram chunks and sharpened regions, after the contrast or brightness changes
+function redrawChunks() {
+    updateLevelColours();
+
+    for (let chunk of Object.values(loadedChunks)) {
+        if (chunk["levels"] !== null) {
+            drawChunk(chunk, rowBins);
+        }
+    }
+
+    for (let region of Object.values(regions)) {
+        if (region["levels"] !== null) {
+            drawChunk(region, region["rowBins"]);
+        }
+    }
+}
+
+// Adds a sharpened region of the spectrogram to the page, on top of the spectrogram's chunks
+function addRegion(regionName, manifest) {
+    // Get the heights of the edges of the region's highest and lowest bins
+    let frequencies = manifest["frequencies"];
+    let binRatio = Math.sqrt(frequencies[1] / frequencies[0]);  // Ratio between a bin's frequency and its edges'
+
+    let top = freqToHeight(frequencies[frequencies.length - 1] * binRatio);
+    let bottom = freqToHeight(frequencies[0] / binRatio);
+
+    // Create the region's canvas, with one pixel for every frame and every row of screen pixels, as the region has
+    // more bins than the spectrogram has rows
+    let numRows = Math.max(Math.round((bottom - top) * SPECTROGRAM_ZOOM_SCALE_Y), 1);
+    let timeStep = manifest["time_step"];
+
+    let canvas = $("<canvas>", {class: "spectrogram-region"});
+    canvas[0].width = manifest["num_frames"];
+    canvas[0].height = numRows;
+    canvas.css({
+        left: (manifest["time_offset"] - 0.5 * timeStep) * PX_PER_SECOND,
+        top: top,
+        width: manifest["num_frames"] * timeStep * PX_PER_SECOND,
+        height: bottom - top
+    });
+
+    // Replace the region if it is already on the page
+    if (regionName in regions) {
+        regions[regionName]["canvas"].remove();
+    }
+
+    let bins = getRowBins(frequencies, top, numRows, (bottom - top) / numRows);
+    let region = {canvas: canvas, levels: null, rowBins: bins};
+    spectrogramChunksArea.append(canvas);
+    regions[regionName] = region;
+
+    // Get the region's data from the server; it is saved as a single chunk
+    let request = new XMLHttpRequest();
+    request.open("GET", `/api/region-data/${UUID}/${regionName}/0?v=${getChunkVersion(manifest, 0)}`, true);
+    request.responseType = "arraybuffer";
+    request.onload = function () {
+        // Ignore the data if the region was replaced while it was downloading
+        if (this.status !== 200 || regions[regionName] !== region) {
+            return;
+        }
+
+        if (manifest["dtype"] === "uint16") {
+            region["levels"] = new Uint16Array(this.response);
+        } else {
+            region["levels"] = new Uint8Array(this.response);
+        }
+
+        drawChunk(region, region["rowBins"]);
+
+        outcomeText.text("");
+        outcomeText.removeClass("success-text");
+    };
+    request.send();
+}
+
+// Asks the server to analyse the visible area of the spectrogram at a higher resolution, then shows the result
+function sharpenVisibleArea() {
+    // Wait until the spectrogram is shown
+    if (chunksManifest === null) {
+        return;
+    }
+
+    // Get the visible times, in seconds, leaving out the notes area on the left
+    let area = transcriptionArea[0];
+    let visibleWidth = area.clientWidth - notesArea[0].clientWidth;
+    let start = area.scrollLeft / SPECTROGRAM_ZOOM_SCALE_X / PX_PER_SECOND;
+    let end = (area.scrollLeft + visibleWidth) / SPECTROGRAM_ZOOM_SCALE_X / PX_PER_SECOND;
+
+    // Get the visible notes, leaving out the numbers area at the bottom
+    let top = area.scrollTop / SPECTROGRAM_ZOOM_SCALE_Y;
+    let bottom = Math.min(
+        (area.scrollTop + area.clientHeight - numbersArea[0].clientHeight) / SPECTROGRAM_ZOOM_SCALE_Y, spectrogramHeight
+    );
+
+    let data = {
+        start: start,
+        end: Math.min(end, DURATION),
+        min_note: Math.max(Math.ceil(freqToNoteNumber(heightToFreq(bottom))), NOTE_NUMBER_RANGE[0]),
+        max_note: Math.min(Math.floor(freqToNoteNumber(heightToFreq(top))), NOTE_NUMBER_RANGE[1])
+    };
+
+    // Send the request to the server
+    outcomeText.text("Sharpening the visible area of the spectrogram...");
+    outcomeText.removeClass("error-text");
+    outcomeText.addClass("success-text");
+
+    $.ajax({
+        url: `/api/analyse-region/${UUID}`,
+        method: "POST",
+        data: JSON.stringify(data),
+        contentType: "application/json; charset=utf-8"
+    }).done((data) => {
+        // Parse the JSON data
+        data = JSON.parse(data);
+
+        // Check the outcome
+        if (data["outcome"] === "error") {
+            // Display the error
+            outcomeText.text(data["msg"]);
+            outcomeText.removeClass("success-text");
+            outcomeText.addClass("error-text");
+            return;
+        }
+
+        // Get the manifest of the region's data, then show the region
+        $.getJSON(data["url"], (manifest) => {
+            addRegion(data["region"], manifest);
+        });
+    });
+}
+
+// Replaces the chunks of the spectrogram preview with the chunks of the full quality spectrogram
+function replacePreviewChunks() {
+    chunksVersion = Date.now();
+
+    $.getJSON(`/api/spectrogram-data/${UUID}?v=${chunksVersion}`, (manifest) => {
+        useChunksManifest(manifest);
+
+        // Remove all the preview's chunks, then load the new chunks that are visible
+        for (let chunkNo of Object.keys(loadedChunks)) {
+            loadedChunks[chunkNo]["canvas"].remove();
+            delete loadedChunks[chunkNo];
+        }
+
+        updateVisibleChunks();
+        outcomeText.text("");
+    });
+}
+
+// Uses the BPM that was estimated along with the full quality spectrogram, unless the BPM was changed on this page
+function useEstimatedBPM() {
+    $.getJSON(`/api/project-status/${UUID}`, (status) => {
+        if (bpmChanged || !("bpm" in status)) {
+            return;
+        }
+
+        bpm = status["bpm"];
+        bpmInput.val(bpm);
+
+        drawBarsNumbersLabels();
+        drawBeatsLines();
+    });
+}
+
+// Waits for the full quality spectrogram to be generated, then shows it in place of the preview
+function waitForFullSpectrogram() {
+    // Handles the progress data sent by the server; returns true once there is nothing more to wait for
+    let handleProgress = (data) => {
+        if (data["Progress"] === 100) {
+            replacePreviewChunks();
+            useEstimatedBPM();
+            return true;
+        } else if (data["Progress"] === undefined) {  // Processing failed
+            outcomeText.text(data["Message"]);
+            outcomeText.addClass("error-text");
+            return true;
+        }
+        return false;
+    };
+
+    // Falls back to checking the progress every `CHECK_FULL_SPECTROGRAM_INTERVAL` seconds
+    let pollProgress = () => {
+        let interval = setInterval(() => {
+            $.ajax({
+                url: `/api/query-process/${UUID}`,
+                method: "POST"
+            }).done((data) => {
+                if (handleProgress(JSON.parse(data))) {
+                    clearInterval(interval);
+                }
+            });
+        }, CHECK_FULL_SPECTROGRAM_INTERVAL * 1000);  // Convert seconds to milliseconds
+    };
+
+    if (typeof EventSource === "undefined") {
+        pollProgress();
+        return;
+    }
+
+    // Listen to the progress that the server pushes
+    let progressStream = new EventSource(`/api/progress-stream/${UUID}`);
+    let finished = false;
+
+    progressStream.onmessage = (event) => {
+        if (handleProgress(JSON.parse(event.data))) {
+            finished = true;
+            progressStream.close();
+        }
+    };
+
+    progressStream.onerror = () => {
+        progressStream.close();
+
+        if (!finished) {
+            pollProgress();
+        }
+    };
+}
+
+// Sets up the transcription area for a spectrogram of the given full resolution size
+function setupTranscriptionArea(width, height, drawSpectrogram) {
+    // Save the spectrogram's size
+    spectrogramWidth = width;
+    spectrogramHeight = height;
+
+    // Compute the final size of the spectrogram
+    let finalSpectrogramWidth = spectrogramWidth * SPECTROGRAM_ZOOM_SCALE_X;
+    let finalSpectrogramHeight = spectrogramHeight * SPECTROGRAM_ZOOM_SCALE_Y;
+
+    // Resize the canvases to the correct dimensions
+    beatsCanvas[0].width = spectrogramWidth;
+    beatsCanvas[0].height = spectrogramHeight;
+
+    notesCanvas[0].width = notesArea[0].clientWidth;
+    notesCanvas[0].height = finalSpectrogramHeight;
+
+    spectrogramCanvas[0].width = spectrogramWidth;
+    spectrogramCanvas[0].height = spectrogramHeight;
+
+    numbersCanvas[0].width = finalSpectrogramWidth;
+    numbersCanvas[0].height = numbersArea[0].clientHeight;
+
+    playheadCanvas[0].width = PLAYHEAD_LINE_WIDTH / 2;
+    playheadCanvas[0].height = finalSpectrogramHeight + numbersArea[0].clientHeight;
+
+    // Resize the chunks' area
+    spectrogramChunksArea.css("width", spectrogramWidth);
+    spectrogramChunksArea.css("height", spectrogramHeight);
+
+    // Set the spectrogram area's scale
+    spectrogramArea.css("transform", `scale(${SPECTROGRAM_ZOOM_SCALE_X}, ${SPECTROGRAM_ZOOM_SCALE_Y})`);
+    spectrogramArea.css("transform-origin", "left top");  // Make the origin the top left corner
+
+    // Update the top row's dimensions
+    topRow.css("width", finalSpectrogramWidth);
+    topRow.css("height", finalSpectrogramHeight);
+
+    // Update the spectrogram area's dimensions
+    spectrogramArea.css("height", spectrogramHeight);
+
+    // Draw the spectrogram itself
+    drawSpectrogram();
+
+    // Add lines for every note
+    for (let i = NOTE_NUMBER_RANGE[0]; i <= NOTE_NUMBER_RANGE[1]; i++) {
+        // Start a new path
+        spectrogramCtx.beginPath();
+
+        // Set the line format
+        if (i % 12 !== 0) {  // Not a C note
+            spectrogramCtx.setLineDash([5, 3]);  // Solid for 5, blank for 3
+        } else {
+            spectrogramCtx.setLineDash([1, 0]);  // Solid for 1, blank for 0
+        }
+
+        // Calculate the height to move the pointer to
+        let heightToMoveTo = freqToHeight(noteNumberToFreq(i));
+
+        // Move the pointer to the correct spot
+        spectrogramCtx.moveTo(
+            0,
+            heightToMoveTo + getHeightDifference() / 2   // Make the gap represent the note, not the line
+        );
+
+        // Draw the line
+        spectrogramCtx.lineTo(spectrogramCanvas[0].width, heightToMoveTo + getHeightDifference() / 2);
+        spectrogramCtx.strokeStyle = NOTES_LINES_COLOUR;
+        spectrogramCtx.lineWidth = NOTES_LINES_WIDTH;
+        spectrogramCtx.stroke();
+    }
+
+    // Set the notes' labels
+    drawNotesLabels();
+
+    // Add numbers for every bar
+    drawBarsNumbersLabels();
+
+    // Add lines for every beat
+    drawBeatsLines();
+
+    // Draw the playhead line
+    playheadCtx.beginPath();
+    playheadCtx.moveTo(0, 0);
+    playheadCtx.lineTo(0, playheadCanvas[0].height);
+    playheadCtx.strokeStyle = PLAYHEAD_LINE_COLOUR;
+    playheadCtx.lineWidth = PLAYHEAD_LINE_WIDTH;
+    playheadCtx.stroke();
+
+    // Move the playhead line to the first bar
+    playheadCanvas.css({left: notesCanvas[0].clientWidth});
+
+    // Create an interval which updates the position of the playhead
+    setInterval(() => {
+        if (!audio.paused) {
+            // Calculate the position to place the playhead
+            let pos = audio.currentTime * PX_PER_SECOND * SPECTROGRAM_ZOOM_SCALE_X + notesCanvas[0].clientWidth;
+
+            // Update position of playhead
+            playheadCanvas.css({left: pos});
+
+            // Scroll to that position
+            if (scrollToPlaybackHeadCheckbox[0].checked) {
+                transcriptionArea[0].scroll({
+                    top: transcriptionArea[0].scrollTop,
+                    left: pos - notesCanvas[0].clientWidth - (transcriptionArea[0].clientWidth / 2),
+                    behavior: "auto"
+                });
+            }
+        }
+    }, 1000 / PLAYHEAD_REFRESH_RATE);
+
+    // Enable input fields
+    $(".user-input").attr("disabled", false);
+}
+
 function fillInInputFields() {
     beatsOffsetInput.val(beatsOffset);
     beatsPerBarInput.val(beatsPerBar);
@@ -356,6 +876,9 @@ downloadQuicklinkBtn.click(() => {
     });
 });
 
+// Called when the "Sharpen Visible Area" button is clicked
+sharpenAreaBtn.click(sharpenVisibleArea);
+
 // Called when the "Save Project" button is clicked
 saveProjectBtn.click(() => {
     // Get the form data
@@ -510,6 +1033,7 @@ bpmInput.change(() => {
     if (checkValidity(bpmInput)) {
         // Update the existing BPM value
         bpm = parseInt(bpmInput.val());
+        bpmChanged = true;
 
         // Draw the new bars numbers labels
         drawBarsNumbersLabels();
@@ -531,6 +1055,10 @@ musicKeyInput.change(() => {
     }
 });
 
+// Called when the spectrogram contrast or brightness input is moved
+spectrogramContrastInput.on("input", redrawChunks);
+spectrogramBrightnessInput.on("input", redrawChunks);
+
 // KEYBOARD INPUT FUNCTIONS
 // Called when a key is pressed on the keyboard whilst on the main area
 $(document).keydown((evt) => {
@@ -566,127 +1094,26 @@ $(document).ready(() => {
     // Set piano synthesiser's volume
     Synth.setVolume(PIANO_VOLUME);
 
-    // Get the full audio file from the server
-    let request = new XMLHttpRequest();
-    request.open("GET", `/media/${UUID}/${STATUS["audio_file_name"]}`, true);
-    request.responseType = "blob";  // Need to do this in order for `url.createObjectURL` to work
-    request.onload = function () {
-        let url = window.URL || window.webkitURL;
-        audio.src = url.createObjectURL(this.response);
-    };
-    request.send();
-
-    // Set the onload function of the spectrogram
-    spectrogram.onload = () => {
-        // Compute the final size of the spectrogram
-        let spectrogramWidth = spectrogram.width;
-        let spectrogramHeight = spectrogram.height;
-
-        let finalSpectrogramWidth = spectrogramWidth * SPECTROGRAM_ZOOM_SCALE_X;
-        let finalSpectrogramHeight = spectrogramHeight * SPECTROGRAM_ZOOM_SCALE_Y;
-
-        // Resize the canvases to the correct dimensions
-        beatsCanvas[0].width = spectrogramWidth;
-        beatsCanvas[0].height = spectrogramHeight;
-
-        notesCanvas[0].width = notesArea[0].clientWidth;
-        notesCanvas[0].height = finalSpectrogramHeight;
-
-        spectrogramCanvas[0].width = spectrogramWidth;
-        spectrogramCanvas[0].height = spectrogramHeight;
-
-        numbersCanvas[0].width = finalSpectrogramWidth;
-        numbersCanvas[0].height = numbersArea[0].clientHeight;
-
-        playheadCanvas[0].width = PLAYHEAD_LINE_WIDTH / 2;
-        playheadCanvas[0].height = finalSpectrogramHeight + numbersArea[0].clientHeight;
-
-        // Set the spectrogram area's scale
-        spectrogramArea.css("transform", `scale(${SPECTROGRAM_ZOOM_SCALE_X}, ${SPECTROGRAM_ZOOM_SCALE_Y})`);
-        spectrogramArea.css("transform-origin", "left top");  // Make the origin the top left corner
-
-        // Update the top row's dimensions
-        topRow.css("width", finalSpectrogramWidth);
-        topRow.css("height", finalSpectrogramHeight);
-
-        // Update the spectrogram area's dimensions
-        spectrogramArea.css("height", spectrogramHeight);
-
-        // Draw image to the canvas
-        spectrogramCtx.drawImage(spectrogram, 0, 0);
-
-        // Add lines for every note
-        for (let i = NOTE_NUMBER_RANGE[0]; i <= NOTE_NUMBER_RANGE[1]; i++) {
-            // Start a new path
-            spectrogramCtx.beginPath();
-
-            // Set the line format
-            if (i % 12 !== 0) {  // Not a C note
-                spectrogramCtx.setLineDash([5, 3]);  // Solid for 5, blank for 3
-            } else {
-                spectrogramCtx.setLineDash([1, 0]);  // Solid for 1, blank for 0
-            }
-
-            // Calculate the height to move the pointer to
-            let heightToMoveTo = freqToHeight(noteNumberToFreq(i));
-
-            // Move the pointer to the correct spot
-            spectrogramCtx.moveTo(
-                0,
-                heightToMoveTo + getHeightDifference() / 2   // Make the gap represent the note, not the line
-            );
-
-            // Draw the line
-            spectrogramCtx.lineTo(spectrogramCanvas[0].width, heightToMoveTo + getHeightDifference() / 2);
-            spectrogramCtx.strokeStyle = NOTES_LINES_COLOUR;
-            spectrogramCtx.lineWidth = NOTES_LINES_WIDTH;
-            spectrogramCtx.stroke();
+    // Stream the audio file from the server; the browser requests the parts that it needs, so playback can start
+    // before the whole file is downloaded
+    audio.preload = "auto";
+    audio.src = AUDIO_URL;
+
+    // Get the manifest of the spectrogram data's chunks
+    $.getJSON(`/api/spectrogram-data/${UUID}`, (manifest) => {
+        // Set up the transcription area, loading only the chunks that are visible
+        setupTranscriptionArea(Math.round(DURATION * PX_PER_SECOND), SPECTROGRAM_HEIGHT, () => {
+            useChunksManifest(manifest);
+            updateVisibleChunks();
+        });
+
+        // Load new chunks whenever the transcription area is scrolled
+        transcriptionArea.scroll(updateVisibleChunks);
+
+        // If this is only a preview, show the full quality spectrogram once it is generated
+        if (SPECTROGRAM_PREVIEW) {
+            outcomeText.text("Showing a preview of the spectrogram. The full quality spectrogram is on its way.");
+            waitForFullSpectrogram();
         }
-
-        // Set the notes' labels
-        drawNotesLabels();
-
-        // Add numbers for every bar
-        drawBarsNumbersLabels();
-
-        // Add lines for every beat
-        drawBeatsLines();
-
-        // Draw the playhead line
-        playheadCtx.beginPath();
-        playheadCtx.moveTo(0, 0);
-        playheadCtx.lineTo(0, playheadCanvas[0].height);
-        playheadCtx.strokeStyle = PLAYHEAD_LINE_COLOUR;
-        playheadCtx.lineWidth = PLAYHEAD_LINE_WIDTH;
-        playheadCtx.stroke();
-
-        // Move the playhead line to the first bar
-        playheadCanvas.css({left: notesCanvas[0].clientWidth});
-
-        // Create an interval which updates the position of the playhead
-        setInterval(() => {
-            if (!audio.paused) {
-                // Calculate the position to place the playhead
-                let pos = audio.currentTime * PX_PER_SECOND * SPECTROGRAM_ZOOM_SCALE_X + notesCanvas[0].clientWidth;
-
-                // Update position of playhead
-                playheadCanvas.css({left: pos});
-
-                // Scroll to that position
-                if (scrollToPlaybackHeadCheckbox[0].checked) {
-                    transcriptionArea[0].scroll({
-                        top: transcriptionArea[0].scrollTop,
-                        left: pos - notesCanvas[0].clientWidth - (transcriptionArea[0].clientWidth / 2),
-                        behavior: "auto"
-                    });
-                }
-            }
-        }, 1000 / PLAYHEAD_REFRESH_RATE);
-
-        // Enable input fields
-        $(".user-input").attr("disabled", false);
-    }
-
-    // Load the spectrogram from the image source
-    spectrogram.src = `/media/${UUID}/${STATUS["spectrogram"]}`;
+    });
 });
@@ -0,0 +1,180 @@
+"""
+batch.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Processes many audio files into projects without the web interface.
+
+Examples:
+    python batch.py "Music Library"
+    python batch.py "Music Library/**/*.mp3" --workers 4
+"""
+
+# IMPORTS
+import argparse
+import glob
+import os
+import shutil
+import sys
+import threading
+from functools import partial
+
+from pydub.exceptions import CouldntDecodeError
+
+from app.app import COMMON_SAMPLE_RATES, MAX_CONCURRENT_JOBS, PROJECT_GENERATED, PROJECT_UPLOADED, \
+    PROJECT_UPLOADING, VQT_PARAMS, app, discard_project, new_job_data, prepare_projects, processing_file, projectStore
+from src.audio import prepare_audio_worker
+from src.hashing import generate_hash_from_file
+from src.io import SUPPORTED_AUDIO_EXTENSIONS, probe_audio_file
+from src.pipeline import JOB_FINISHED, JobScheduler
+
+
+# FUNCTIONS
+def find_audio_files(paths: list, recursive: bool) -> list:
+    # Expand directories and glob patterns into the audio files that they contain
+    file_paths = set()
+
+    for path in paths:
+        if os.path.isdir(path):
+            pattern = os.path.join(glob.escape(path), "**", "*") if recursive else os.path.join(glob.escape(path), "*")
+            candidates = glob.glob(pattern, recursive=recursive)
+        else:
+            candidates = glob.glob(path, recursive=True)
+
+        for candidate in candidates:
+            if os.path.isfile(candidate) and os.path.splitext(candidate)[1].lower() in SUPPORTED_AUDIO_EXTENSIONS:
+                file_paths.add(os.path.abspath(candidate))
+
+    return sorted(file_paths)
+
+
+def add_project(file_path: str, uuid: str) -> bool:
+    # Copy an audio file into a new project, the same way that an uploaded file is saved
+    file_name = os.path.basename(file_path)
+    folder_path = os.path.join(app.config["UPLOAD_FOLDER"], uuid)
+
+    if not projectStore.create(uuid, PROJECT_UPLOADING, uuid=uuid, original_file_name=file_name,
+                               audio_file_name=None, spectrogram_generated=False):
+        return False
+
+    try:
+        os.makedirs(folder_path, exist_ok=True)
+        shutil.copyfile(file_path, os.path.join(folder_path, file_name))
+        duration, sample_rate, num_channels = probe_audio_file(os.path.join(folder_path, file_name))
+    except (AssertionError, CouldntDecodeError):
+        discard_project(uuid)
+        return False
+    except BaseException:
+        discard_project(uuid)
+        raise
+
+    projectStore.update(uuid, PROJECT_UPLOADED, audio_properties={
+        "duration": duration,
+        "sample_rate": sample_rate,
+        "channels": num_channels
+    })
+    return True
+
+
+def run_batch(file_paths: list, num_workers: int) -> int:
+    # Process every file that does not have a generated project yet, returning the number of files that failed
+    num_jobs = 0
+    outcomes = {"finished": 0, "failed": 0}
+    outcomes_lock = threading.Condition()
+
+    def on_job_done(uuid: str, state: str, job_data: dict):
+        with outcomes_lock:
+            outcome = "finished" if state == JOB_FINISHED else "failed"
+            outcomes[outcome] += 1
+
+            error = "" if state == JOB_FINISHED else f" ({scheduler.get_job_error(uuid)})"
+            print(f"[{outcomes['finished'] + outcomes['failed']}/{num_jobs}] {names[uuid]}: {outcome}{error}")
+
+            outcomes_lock.notify()
+
+    scheduler = JobScheduler(num_workers, initializer=partial(prepare_audio_worker, COMMON_SAMPLE_RATES,
+                                                              **VQT_PARAMS), on_job_done=on_job_done)
+    names = {}  # Maps each submitted project's UUID to the name of its file
+    num_skipped = num_unreadable = num_rejected = 0
+
+    # Add each file as a project and submit it, so that the first files are processed while the rest are hashed
+    for file_path in file_paths:
+        uuid = generate_hash_from_file(file_path)
+        state = projectStore.get_state(uuid)
+
+        # Skip files that were already processed, including duplicates of other files in this batch
+        if state == PROJECT_GENERATED or uuid in names:
+            num_skipped += 1
+            continue
+
+        # Resume projects whose processing was interrupted; if the original file was already replaced by the MP3 file,
+        # start them again from the original file
+        if state is not None and state != PROJECT_UPLOADED:
+            discard_project(uuid)
+            state = None
+
+        if state is None and not add_project(file_path, uuid):
+            print(f"Skipping {file_path}, as it could not be read.")
+            num_unreadable += 1
+            continue
+
+        # Submit the project for processing; it is counted first, as the job may finish before `submit` returns
+        with outcomes_lock:
+            names[uuid] = os.path.basename(file_path)
+            num_jobs += 1
+
+        accepted = scheduler.submit(uuid, processing_file, projectStore.get(uuid)["original_file_name"], uuid,
+                                    job_data=new_job_data("processing"))
+
+        if not accepted:  # Not waited for, as it never runs; the project is kept, so running the batch again resumes it
+            with outcomes_lock:
+                del names[uuid]
+                num_jobs -= 1
+
+            print(f"Could not process {file_path}, as the scheduler is at its cost budget.")
+            num_rejected += 1
+
+    print(f"Processing {num_jobs} file(s) on {num_workers} worker process(es); skipped {num_skipped} file(s) that "
+          f"were already processed or are duplicates.")
+
+    # Wait for all the jobs to finish
+    with outcomes_lock:
+        outcomes_lock.wait_for(lambda: outcomes["finished"] + outcomes["failed"] == num_jobs)
+
+    print(f"Done: {outcomes['finished']} processed, {outcomes['failed'] + num_rejected} failed, {num_unreadable} "
+          f"unreadable, {num_skipped} skipped.")
+    return outcomes["failed"] + num_rejected + num_unreadable
+
+
+# MAIN CODE
+if __name__ == "__main__":
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description="Processes audio files into AudiTranscribe projects, skipping files "
+                                                 "that were already processed. If the processing is interrupted, "
+                                                 "running the same command again resumes it.")
+    parser.add_argument("paths", nargs="+", help="directories or glob patterns of the audio files to process")
+    parser.add_argument("-r", "--recursive", action="store_true", help="also process files in subdirectories")
+    parser.add_argument("-w", "--workers", type=int, default=MAX_CONCURRENT_JOBS,
+                        help="number of files to process at the same time; each file uses several cores "
+                             f"(default: {MAX_CONCURRENT_JOBS})")
+    args = parser.parse_args()
+
+    # Find the files and process them
+    audio_files = find_audio_files(args.paths, args.recursive)
+
+    if not audio_files:
+        print("No supported audio files were found.")
+        sys.exit(1)
+
+    prepare_projects()
+
+    try:
+        num_failed = run_batch(audio_files, max(args.workers, 1))
+    except KeyboardInterrupt:
+        print("Interrupted. Run the same command again to resume.")
+        sys.exit(130)
+
+    sys.exit(1 if num_failed > 0 else 0)
@@ -0,0 +1,3 @@
+from .compare_benchmarks import REGRESSION_THRESHOLD, compare_benchmarks
+from .generate_test_audio import SIGNAL_TYPES, generate_test_audio, write_test_wav
+from .profile_call import profile_call
@@ -0,0 +1,235 @@
+"""
+benchmark_imports.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Measures how long the app and the `src` packages take to import in a new process, i.e. how long a worker
+             process takes to start, and which modules that time goes to.
+
+Run this from the root of the repository, for example
+    python -m benchmarks.benchmark_imports --output imports_before.json
+    python -m benchmarks.benchmark_imports --output imports_after.json --compare imports_before.json
+"""
+
+# IMPORTS
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+from benchmarks.compare_benchmarks import REGRESSION_THRESHOLD
+from benchmarks.run_benchmarks import ROOT_FOLDER, _get_commit
+
+# CONSTANTS
+MODULES = ["app.app", "src.audio", "src.io", "src.visuals", "src.pipeline", "src.storage", "src.metrics",
+           "src.hashing", "src.misc"]
+JOB_BACKENDS = ["local", "sqlite"]  # See `app.app`; "sqlite" is what the web workers of `serve.py` use
+REPEATS = 5
+NUM_SLOWEST = 10  # Number of the slowest modules and packages to report for each imported module
+
+
+# HELPER FUNCTIONS
+def _time_import(module: str, job_backend: str, work_folder: str) -> dict:
+    """
+    Imports a module in a new Python process and measures how long that took.
+
+    Args:
+        module:
+            Name of the module to import.
+
+        job_backend:
+            Job backend that the app uses, which decides what the app creates when it is imported.
+
+        work_folder:
+            Folder to run the process in, as the app creates its files in the working directory.
+
+    Returns:
+        dict:
+            Dictionary containing the `wall_time` of the import and the `self_times` of every module it imported (the
+            time taken by each module's own code, excluding the modules it imported), in seconds.
+
+    Raises:
+        RuntimeError:
+            If the module could not be imported.
+    """
+
+    env = dict(os.environ, AUDITRANSCRIBE_JOB_BACKEND=job_backend)
+    env["PYTHONPATH"] = os.pathsep.join([ROOT_FOLDER] + ([env["PYTHONPATH"]] if env.get("PYTHONPATH") else []))
+
+    # Python's `-X importtime` option writes the time of every import to stderr
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    process = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=work_folder, env=env,
+                             capture_output=True, text=True)
+
+    if process.returncode != 0:
+        raise RuntimeError(f"Could not import {module}: {process.stderr.strip().splitlines()[-1]}")
+
+    # Each line is "import time: <self time> | <cumulative time> | <indentation><module>", with times in microseconds
+    self_times = {}
+
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_time, _, name = line[len("import time:"):].split("|")
+        self_times[name.strip()] = int(self_time) / 1e6
+
+    return {"wall_time": float(process.stdout.strip().splitlines()[-1]), "self_times": self_times}
+
+
+def _get_slowest(times: Dict[str, float], num_slowest: int) -> List[list]:
+    """
+    Gets the names with the longest times, slowest first.
+
+    Args:
+        times:
+            Dictionary mapping each name to its time.
+
+        num_slowest:
+            Number of names to get.
+
+    Returns:
+        List[list]:
+            List of pairs containing a name and its time.
+    """
+
+    return [[name, time] for name, time in sorted(times.items(), key=lambda item: -item[1])[:num_slowest]]
+
+
+# FUNCTIONS
+def benchmark_imports(modules: List[str], job_backend: str = JOB_BACKENDS[0], repeats: int = REPEATS,
+                      num_slowest: int = NUM_SLOWEST, output_path: Optional[str] = None) -> dict:
+    """
+    Measures how long each module takes to import in a new Python process.
+
+    Each module is imported in a separate process, so the modules that it shares with other modules are counted for
+    each of them. The first import of each module is not timed, so that writing the bytecode caches is not measured.
+
+    Args:
+        modules:
+            Names of the modules to import.
+
+        job_backend:
+            Job backend that the app uses. One of `JOB_BACKENDS`.
+
+        repeats:
+            Number of timed imports of each module.
+
+        num_slowest:
+            Number of the slowest modules and packages to report for each imported module.
+
+        output_path:
+            Path to write the results to as JSON.
+
+    Returns:
+        dict:
+            Dictionary containing the `metadata` of the run and the list of `results`. Each result contains the
+            `module`, the median `wall_time` of its import, the `slowest_modules` and `slowest_packages` (by top-level
+            package) that it imported with their median self times, and the `error` that the import raised (or
+            `None`). All times are in seconds.
+    """
+
+    benchmarks = {
+        "metadata": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _get_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "job_backend": job_backend,
+            "repeats": repeats
+        },
+        "results": []
+    }
+
+    work_folder = tempfile.mkdtemp(prefix="benchmarks-")
+
+    try:
+        for module in modules:
+            print(f"Benchmarking the import of {module}")
+            result = {"module": module, "error": None}
+
+            try:
+                _time_import(module, job_backend, work_folder)  # Writes any missing bytecode caches
+                measurements = [_time_import(module, job_backend, work_folder) for _ in range(repeats)]
+            except RuntimeError as e:
+                result["error"] = str(e)
+                benchmarks["results"].append(result)
+                continue
+
+            # Take the median time of every imported module, and add them up by top-level package
+            module_times = {name: statistics.median(measurement["self_times"].get(name, 0.)
+                                                    for measurement in measurements)
+                            for name in measurements[0]["self_times"]}
+
+            package_times = {}
+            for name, time in module_times.items():
+                package_times[name.split(".")[0]] = package_times.get(name.split(".")[0], 0.) + time
+
+            result.update({
+                "wall_time": statistics.median(measurement["wall_time"] for measurement in measurements),
+                "slowest_modules": _get_slowest(module_times, num_slowest),
+                "slowest_packages": _get_slowest(package_times, num_slowest)
+            })
+            benchmarks["results"].append(result)
+    finally:
+        shutil.rmtree(work_folder, ignore_errors=True)
+
+    if output_path is not None:
+        with open(output_path, "w") as f:
+            json.dump(benchmarks, f, indent=2)
+
+    return benchmarks
+
+
+# MAIN CODE
+if __name__ == "__main__":
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description="Measures how long the app and the src packages take to import in a "
+                                                 "new process.")
+    parser.add_argument("--modules", nargs="+", default=MODULES, help="modules to import")
+    parser.add_argument("--job-backend", default=JOB_BACKENDS[0], choices=JOB_BACKENDS,
+                        help="job backend that the app uses")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="number of timed imports of each module")
+    parser.add_argument("--output", default="import_benchmark_results.json", help="path to write the results to")
+    parser.add_argument("--compare", help="path to earlier results to compare the new results against")
+    args = parser.parse_args()
+
+    # Run the benchmarks
+    benchmarks_ = benchmark_imports(args.modules, job_backend=args.job_backend, repeats=max(args.repeats, 1),
+                                    output_path=args.output)
+
+    # Show the results
+    for result_ in benchmarks_["results"]:
+        if result_["error"] is not None:
+            print(f"{result_['module']:<16} failed: {result_['error']}")
+            continue
+
+        print(f"{result_['module']:<16} {result_['wall_time']:7.3f} s")
+        for package_, time_ in result_["slowest_packages"]:
+            print(f"    {package_:<24} {time_:7.3f} s")
+
+    # Compare them with the earlier results, if given
+    if args.compare is not None:
+        with open(args.compare, "r") as f:
+            old_results_ = {result_["module"]: result_ for result_ in json.load(f)["results"]
+                            if result_["error"] is None}
+
+        print(f"\nChanges from {args.compare} (regressions are over {REGRESSION_THRESHOLD}x):")
+        for result_ in benchmarks_["results"]:
+            old_result_ = old_results_.get(result_["module"])
+            if old_result_ is None or result_["error"] is not None:
+                continue
+
+            ratio_ = result_["wall_time"] / old_result_["wall_time"] if old_result_["wall_time"] > 0 else 1.
+            print(f"{result_['module']:<16} {old_result_['wall_time']:7.3f} s -> {result_['wall_time']:7.3f} s  "
+                  f"time {ratio_:.2f}x" + ("  REGRESSION" if ratio_ > REGRESSION_THRESHOLD else ""))
@@ -0,0 +1,68 @@
+"""
+compare_benchmarks.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Compares two sets of benchmark results, e.g. from two different commits.
+"""
+
+# IMPORTS
+from typing import List
+
+# CONSTANTS
+REGRESSION_THRESHOLD = 1.1  # A benchmark that is this many times slower or larger than before is a regression
+
+
+# FUNCTIONS
+def compare_benchmarks(old_results: dict, new_results: dict, threshold: float = REGRESSION_THRESHOLD) -> List[dict]:
+    """
+    Compares the wall times and peak memory of the benchmarks that appear in both sets of results.
+
+    Args:
+        old_results:
+            Results of `run_benchmarks` to compare against.
+
+        new_results:
+            Newer results of `run_benchmarks`.
+
+        threshold:
+            Ratio of the new value to the old value above which a benchmark is marked as a regression.
+
+    Returns:
+        List[dict]:
+            One dictionary for each benchmark that succeeded in both sets of results, containing the benchmark's
+            `function`, `signal`, `duration` and `sample_rate`, the `wall_time_ratio` and `peak_memory_ratio` of the new
+            value to the old value, and whether the benchmark is a `regression`.
+    """
+
+    # Index the old results by the benchmark that they are from
+    def get_key(result):
+        return result["function"], result["signal"], result["duration"], result["sample_rate"]
+
+    old_benchmarks = {get_key(result): result for result in old_results["results"] if result["error"] is None}
+
+    # Compare the new results to the old ones
+    comparisons = []
+
+    for new in new_results["results"]:
+        old = old_benchmarks.get(get_key(new))
+        if old is None or new["error"] is not None:
+            continue
+
+        wall_time_ratio = new["wall_time"] / old["wall_time"] if old["wall_time"] > 0 else 1.
+        peak_memory_ratio = new["peak_memory"] / old["peak_memory"] if old["peak_memory"] > 0 else 1.
+
+        comparisons.append({
+            "function": new["function"],
+            "signal": new["signal"],
+            "duration": new["duration"],
+            "sample_rate": new["sample_rate"],
+            "wall_time_ratio": wall_time_ratio,
+            "peak_memory_ratio": peak_memory_ratio,
+            "regression": wall_time_ratio > threshold or peak_memory_ratio > threshold
+        })
+
+    return comparisons
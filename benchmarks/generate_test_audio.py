@@ -0,0 +1,102 @@
+"""
+generate_test_audio.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Generates synthetic audio to benchmark the audio processing code with.
+"""
+
+# IMPORTS
+import wave
+
+import numpy as np
+
+# CONSTANTS
+SIGNAL_TYPES = ["sine", "chirp", "noise"]
+SINE_FREQUENCY = 440  # In Hz
+CHIRP_FREQUENCY_RANGE = [27.5, 4186]  # Frequencies that the chirp sweeps between, in Hz; this is the range of a piano
+AMPLITUDE = 0.5
+RANDOM_SEED = 42
+
+
+# FUNCTIONS
+def generate_test_audio(signal_type: str, duration: float, sample_rate: int) -> np.ndarray:
+    """
+    Generates mono synthetic audio.
+
+    Args:
+        signal_type:
+            Type of signal to generate. One of `"sine"` (a pure tone), `"chirp"` (a tone sweeping exponentially
+            through the range of a piano) and `"noise"` (white noise).
+
+        duration:
+            Duration of the audio, in seconds.
+
+        sample_rate:
+            Sample rate of the audio.
+
+    Returns:
+        np.ndarray:
+            Audio samples, as 32-bit floats in the interval [-1, 1].
+
+    Raises:
+        AssertionError:
+            If the signal type is not one of the types in `SIGNAL_TYPES`.
+    """
+
+    assert signal_type in SIGNAL_TYPES, f"Signal type must be one of {SIGNAL_TYPES}, not '{signal_type}'."
+
+    num_samples = round(duration * sample_rate)
+
+    if signal_type == "noise":
+        # Seed the generator so that every run benchmarks the same audio
+        rng = np.random.default_rng(RANDOM_SEED)
+        return rng.uniform(-AMPLITUDE, AMPLITUDE, num_samples).astype(np.float32)
+
+    times = np.arange(num_samples, dtype=np.float64) / sample_rate
+
+    if signal_type == "sine":
+        phases = 2 * np.pi * SINE_FREQUENCY * times
+    else:
+        # Keep the top of the sweep below the Nyquist frequency
+        f_start = CHIRP_FREQUENCY_RANGE[0]
+        f_end = min(CHIRP_FREQUENCY_RANGE[1], sample_rate / 2 * 0.9)
+
+        growth_rate = np.log(f_end / f_start) / duration
+        phases = 2 * np.pi * f_start * np.expm1(growth_rate * times) / growth_rate
+
+    return (AMPLITUDE * np.sin(phases)).astype(np.float32)
+
+
+def write_test_wav(samples: np.ndarray, sample_rate: int, file_path: str):
+    """
+    Writes mono audio samples to a 16-bit PCM WAV file.
+
+    Args:
+        samples:
+            Audio samples in the interval [-1, 1].
+
+        sample_rate:
+            Sample rate of the audio.
+
+        file_path:
+            Path to write the WAV file to.
+    """
+
+    pcm = np.clip(np.rint(samples * 32767), -32768, 32767).astype("<i2")
+
+    with wave.open(file_path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes(pcm.tobytes())
+
+
+# TESTING CODE
+if __name__ == "__main__":
+    for signal_type_ in SIGNAL_TYPES:
+        samples_ = generate_test_audio(signal_type_, 10, 44100)
+        print(signal_type_, samples_.shape, samples_.dtype, samples_.min(), samples_.max())
@@ -0,0 +1,97 @@
+"""
+profile_call.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Measures the time and memory that a function call takes.
+"""
+
+# IMPORTS
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+from src.metrics import get_peak_rss
+
+
+# FUNCTIONS
+def profile_call(function: Callable, repeats: int = 3) -> Tuple[Any, dict]:
+    """
+    Calls a function several times, measuring how long each call takes, and then once more while tracing its memory
+    allocations.
+
+    The timed calls are made without tracing memory, as tracing slows down code that makes many small allocations.
+
+    Args:
+        function:
+            Function to call. It must take no arguments; use `functools.partial` to bind any arguments.
+
+        repeats:
+            Number of timed calls.
+
+    Returns:
+        Tuple[Any, dict]:
+            Double containing the result of the last call and the measurements, in that order. The measurements are
+            - `wall_times` and `cpu_times`, the wall time and CPU time of each timed call, in seconds;
+            - `wall_time` and `cpu_time`, the medians of those times, in seconds;
+            - `peak_memory`, the peak memory allocated during the traced call, in bytes; and
+            - `peak_rss_increase`, how much the peak resident set size of the process increased over all the calls, in
+              bytes. This is 0 if an earlier call already reached a higher peak.
+
+    Raises:
+        AssertionError:
+            If the number of repeats is not positive.
+    """
+
+    assert repeats > 0, f"Number of repeats must be positive, not {repeats}."
+
+    result = None
+    wall_times = []
+    cpu_times = []
+    initial_peak_rss = get_peak_rss()
+
+    # Time the calls
+    for _ in range(repeats):
+        result = None  # Release the previous result before the next call
+        gc.collect()
+
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        result = function()
+
+        cpu_times.append(time.process_time() - cpu_start)
+        wall_times.append(time.perf_counter() - wall_start)
+
+    # Trace the memory allocations of one more call
+    result = None
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        result = function()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return result, {
+        "wall_times": wall_times,
+        "cpu_times": cpu_times,
+        "wall_time": statistics.median(wall_times),
+        "cpu_time": statistics.median(cpu_times),
+        "peak_memory": peak_memory,
+        "peak_rss_increase": get_peak_rss() - initial_peak_rss
+    }
+
+
+# TESTING CODE
+if __name__ == "__main__":
+    import numpy as np
+
+    result_, measurements_ = profile_call(lambda: np.ones(10 ** 7).sum())
+    print(result_, measurements_)
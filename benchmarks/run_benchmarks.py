@@ -0,0 +1,357 @@
+"""
+run_benchmarks.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Benchmarks the audio processing code on synthetic audio, and writes the results as JSON.
+
+Run this from the root of the repository, for example
+    python -m benchmarks.run_benchmarks --durations 10 60 --sample-rates 44100 --output before.json
+    python -m benchmarks.run_benchmarks --durations 10 60 --sample-rates 44100 --output after.json --compare before.json
+"""
+
+# IMPORTS
+import argparse
+import datetime
+import importlib
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+from functools import partial
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from benchmarks.compare_benchmarks import REGRESSION_THRESHOLD, compare_benchmarks
+from benchmarks.generate_test_audio import SIGNAL_TYPES, generate_test_audio, write_test_wav
+from benchmarks.profile_call import profile_call
+from src.audio import estimate_bpm, samples_to_cqt, samples_to_vqt, track_beats
+from src.hashing import generate_hash_from_file, generate_random_hash
+from src.io import audio_to_audiosegment, audiosegment_to_mp3, audiosegment_to_samples, audiosegment_to_wav, \
+    probe_audio_file, wav_to_samples
+from src.visuals import generate_spectrogram_chunks
+
+# CONSTANTS
+DURATIONS = [10, 60, 300, 1200]  # In seconds
+SAMPLE_RATES = [22050, 44100, 96000]
+FUNCTIONS = [
+    "generate_hash_from_file",
+    "probe_audio_file",
+    "wav_to_samples",
+    "audio_to_audiosegment",
+    "audiosegment_to_samples",
+    "audiosegment_to_wav",
+    "audiosegment_to_mp3",
+    "samples_to_vqt",
+    "samples_to_cqt",
+    "estimate_bpm",
+    "track_beats",
+    "generate_spectrogram_chunks",
+    "processing_file"
+]
+REPEATS = 3
+ROOT_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+# HELPER FUNCTIONS
+def _get_commit() -> Optional[str]:
+    """
+    Gets the commit that the repository is on.
+
+    Returns:
+        Optional[str]:
+            Hash of the commit, or `None` if it could not be found.
+    """
+
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT_FOLDER, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _load_app(work_folder: str):
+    """
+    Imports the web app, with its media files, spectral cache and project database inside the work folder.
+
+    Args:
+        work_folder:
+            Folder to keep the app's files in.
+
+    Returns:
+        module:
+            The `app.app` module.
+    """
+
+    # The app keeps its files relative to the working directory, so move into the work folder before importing it
+    if ROOT_FOLDER not in sys.path:
+        sys.path.insert(0, ROOT_FOLDER)
+
+    os.chdir(work_folder)
+    return importlib.import_module("app.app")
+
+
+def _get_benchmark_call(function_name: str, case: dict) -> Callable:
+    """
+    Gets the call that benchmarks a function on one test audio file.
+
+    The inputs that a function needs, like the spectrogram for `generate_spectrogram_chunks`, are generated the first
+    time they are needed and kept in `case`, so they are not part of any benchmark.
+
+    Args:
+        function_name:
+            Name of the function to benchmark. One of `FUNCTIONS`.
+
+        case:
+            Dictionary describing the test audio file, containing its `samples`, `sample_rate`, `duration`,
+            `wav_path` and the `work_folder` to write any output to.
+
+    Returns:
+        Callable:
+            Function with no arguments that makes the call to benchmark.
+    """
+
+    # Generate the inputs, if needed
+    if function_name in ["audiosegment_to_samples", "audiosegment_to_wav", "audiosegment_to_mp3"] and \
+            "audiosegment" not in case:
+        case["audiosegment"] = audio_to_audiosegment(case["wav_path"])
+
+    if function_name in ["track_beats", "generate_spectrogram_chunks"] and "vqt" not in case:
+        case["vqt"] = samples_to_vqt(case["sample_rate"], case["samples"], progress=[None])
+
+    # Get the call
+    if function_name == "generate_hash_from_file":
+        return partial(generate_hash_from_file, case["wav_path"])
+
+    elif function_name == "probe_audio_file":
+        return partial(probe_audio_file, case["wav_path"])
+
+    elif function_name == "wav_to_samples":
+        return partial(wav_to_samples, case["wav_path"])
+
+    elif function_name == "audio_to_audiosegment":
+        return partial(audio_to_audiosegment, case["wav_path"])
+
+    elif function_name == "audiosegment_to_samples":
+        return partial(audiosegment_to_samples, case["audiosegment"])
+
+    elif function_name == "audiosegment_to_wav":
+        return partial(audiosegment_to_wav, case["audiosegment"], os.path.join(case["work_folder"], "output.wav"))
+
+    elif function_name == "audiosegment_to_mp3":
+        return partial(audiosegment_to_mp3, case["audiosegment"], os.path.join(case["work_folder"], "output.mp3"))
+
+    elif function_name == "samples_to_vqt":
+        return partial(samples_to_vqt, case["sample_rate"], case["samples"], progress=[None])
+
+    elif function_name == "samples_to_cqt":
+        return partial(samples_to_cqt, case["sample_rate"], case["samples"])
+
+    elif function_name == "estimate_bpm":
+        return partial(estimate_bpm, case["samples"], case["sample_rate"])
+
+    elif function_name == "track_beats":
+        return partial(track_beats, case["vqt"][0], case["vqt"][2])
+
+    elif function_name == "generate_spectrogram_chunks":
+        return partial(generate_spectrogram_chunks, *case["vqt"], os.path.join(case["work_folder"], "chunks"),
+                       progress=[None])
+
+    elif function_name == "processing_file":
+        app_module = _load_app(case["work_folder"])
+        return partial(_process_file, app_module, case["wav_path"])
+
+    raise ValueError(f"There is no benchmark for '{function_name}'.")
+
+
+def _process_file(app_module, wav_path: str):
+    """
+    Processes an audio file the way the web app does after it is uploaded, as a new project.
+
+    Args:
+        app_module:
+            The `app.app` module.
+
+        wav_path:
+            Path to the WAV file.
+    """
+
+    # Add the file as a new project; a random UUID is used so that the spectral cache is not used
+    uuid = generate_random_hash()
+    file_name = os.path.basename(wav_path)
+    folder_path = os.path.join(app_module.app.config["UPLOAD_FOLDER"], uuid)
+
+    os.makedirs(folder_path)
+    shutil.copy(wav_path, os.path.join(folder_path, file_name))
+    app_module.projectStore.create(uuid, app_module.PROJECT_UPLOADED, uuid=uuid, original_file_name=file_name,
+                                   audio_file_name=None, spectrogram_generated=False)
+
+    # Process it, then delete it
+    try:
+        app_module.processing_file(file_name, uuid, app_module.new_job_data("processing"))
+    finally:
+        app_module.discard_project(uuid)
+
+
+# FUNCTIONS
+def run_benchmarks(signal_types: List[str], durations: List[float], sample_rates: List[int], functions: List[str],
+                   repeats: int = REPEATS, output_path: Optional[str] = None) -> dict:
+    """
+    Benchmarks functions on synthetic audio of every combination of signal type, duration and sample rate.
+
+    A function that fails on some audio, e.g. as its filters go above the Nyquist frequency, has the error recorded
+    in its result instead of its measurements.
+
+    Args:
+        signal_types:
+            Types of synthetic audio to use. See `generate_test_audio`.
+
+        durations:
+            Durations of the audio, in seconds.
+
+        sample_rates:
+            Sample rates of the audio.
+
+        functions:
+            Names of the functions to benchmark. See `FUNCTIONS`.
+
+        repeats:
+            Number of timed calls of each function on each audio file.
+
+        output_path:
+            Path to write the results to as JSON. The file is rewritten after each audio file is done, so that the
+            results so far are kept if the benchmarks are stopped.
+
+    Returns:
+        dict:
+            Dictionary containing the `metadata` of the run (like the commit and library versions) and the list of
+            `results`. Each result contains the benchmark's `function`, `signal`, `duration` and `sample_rate`, the
+            measurements from `profile_call`, and the `error` that the function raised (or `None`).
+
+    Raises:
+        AssertionError:
+            If a function does not have a benchmark.
+    """
+
+    for function_name in functions:
+        assert function_name in FUNCTIONS, f"There is no benchmark for '{function_name}'."
+
+    import librosa  # Imported here to only record its version
+
+    benchmarks = {
+        "metadata": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "commit": _get_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "numpy": np.__version__,
+            "librosa": librosa.__version__,
+            "repeats": repeats
+        },
+        "results": []
+    }
+
+    original_cwd = os.getcwd()
+    work_folder = tempfile.mkdtemp(prefix="benchmarks-")
+
+    try:
+        for sample_rate in sample_rates:
+            for duration in durations:
+                for signal_type in signal_types:
+                    # Generate the test audio
+                    case = {
+                        "samples": generate_test_audio(signal_type, duration, sample_rate),
+                        "sample_rate": sample_rate,
+                        "duration": duration,
+                        "wav_path": os.path.join(work_folder, f"{signal_type}_{duration}s_{sample_rate}Hz.wav"),
+                        "work_folder": work_folder
+                    }
+                    write_test_wav(case["samples"], sample_rate, case["wav_path"])
+
+                    # Benchmark every function on it
+                    for function_name in functions:
+                        print(f"Benchmarking {function_name} on {duration} s of {signal_type} at {sample_rate} Hz")
+                        result = {
+                            "function": function_name,
+                            "signal": signal_type,
+                            "duration": duration,
+                            "sample_rate": sample_rate,
+                            "error": None
+                        }
+
+                        try:
+                            call = _get_benchmark_call(function_name, case)
+                            _, measurements = profile_call(call, repeats=repeats)
+                            result.update(measurements)
+                        except Exception as e:
+                            result["error"] = repr(e)
+
+                        benchmarks["results"].append(result)
+
+                    os.remove(case["wav_path"])
+
+                    # Save the results so far
+                    if output_path is not None:
+                        with open(output_path, "w") as f:
+                            json.dump(benchmarks, f, indent=2)
+    finally:
+        os.chdir(original_cwd)
+        shutil.rmtree(work_folder, ignore_errors=True)
+
+    return benchmarks
+
+
+# MAIN CODE
+if __name__ == "__main__":
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description="Benchmarks the audio processing code on synthetic audio.")
+    parser.add_argument("--signals", nargs="+", default=SIGNAL_TYPES, choices=SIGNAL_TYPES,
+                        help="types of synthetic audio to use")
+    parser.add_argument("--durations", nargs="+", type=float, default=DURATIONS,
+                        help="durations of the audio, in seconds")
+    parser.add_argument("--sample-rates", nargs="+", type=int, default=SAMPLE_RATES,
+                        help="sample rates of the audio")
+    parser.add_argument("--functions", nargs="+", default=FUNCTIONS, choices=FUNCTIONS,
+                        help="functions to benchmark")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="number of timed calls of each benchmark")
+    parser.add_argument("--output", default="benchmark_results.json", help="path to write the results to")
+    parser.add_argument("--compare", help="path to earlier results to compare the new results against")
+    args = parser.parse_args()
+
+    # The output paths are relative to where the benchmarks were started, not the work folder
+    output_path_ = os.path.abspath(args.output)
+    compare_path_ = os.path.abspath(args.compare) if args.compare is not None else None
+
+    # Run the benchmarks
+    benchmarks_ = run_benchmarks(args.signals, args.durations, args.sample_rates, args.functions,
+                                 repeats=args.repeats, output_path=output_path_)
+
+    # Show the results
+    for result_ in benchmarks_["results"]:
+        description_ = f"{result_['function']:<26} {result_['signal']:<6} {result_['duration']:>7g} s " \
+                       f"{result_['sample_rate']:>6} Hz"
+
+        if result_["error"] is None:
+            print(f"{description_}  {result_['wall_time']:9.3f} s  {result_['peak_memory'] / 2 ** 20:9.1f} MiB")
+        else:
+            print(f"{description_}  failed: {result_['error']}")
+
+    # Compare them with the earlier results, if given
+    if compare_path_ is not None:
+        with open(compare_path_, "r") as f:
+            old_benchmarks_ = json.load(f)
+
+        print(f"\nChanges from {compare_path_} (regressions are over {REGRESSION_THRESHOLD}x):")
+        for comparison_ in compare_benchmarks(old_benchmarks_, benchmarks_):
+            print(f"{comparison_['function']:<26} {comparison_['signal']:<6} {comparison_['duration']:>7g} s "
+                  f"{comparison_['sample_rate']:>6} Hz  time {comparison_['wall_time_ratio']:.2f}x  "
+                  f"memory {comparison_['peak_memory_ratio']:.2f}x" +
+                  ("  REGRESSION" if comparison_["regression"] else ""))
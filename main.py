@@ -2,7 +2,7 @@
 main.py
 
 Created on 2021-11-16
-Updated on 2022-02-06
+Updated on 2026-10-17
 
 Copyright © Ryan Kan
 
@@ -12,11 +12,12 @@ Description: Main python program.
 # IMPORTS
 import webbrowser
 
-from app import app
+from app.app import app, prepare_projects
 
 # MAIN CODE
 # Open a new browser window with the url
 webbrowser.open("http://127.0.0.1:5000/", new=1)  # Fixme: possible URL not found due to race condition with below code
 
-# Run the main app
+# Prepare the projects and run the main app
+prepare_projects()
 app.run(threaded=True)
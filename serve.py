@@ -0,0 +1,149 @@
+"""
+serve.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Runs the application in production, with several web worker processes and separate pipeline worker
+             processes that share the jobs through an SQLite database.
+
+Examples:
+    python serve.py --host 0.0.0.0 --port 8000
+    python serve.py --web-workers 8 --pipeline-workers 2
+    python serve.py --web-workers 0 --pipeline-workers 4 --no-retention  # Only process files, e.g. on another machine
+"""
+
+# IMPORTS
+import argparse
+import multiprocessing
+import multiprocessing.synchronize
+import os
+import signal
+import sys
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # Only needed to serve the app
+    BaseApplication = None
+
+# Share the jobs between the processes; must be set before the app is imported
+os.environ["AUDITRANSCRIBE_JOB_BACKEND"] = "sqlite"
+
+from app.app import COMMON_SAMPLE_RATES, MAX_CONCURRENT_JOBS, VQT_PARAMS, app, enforce_retention_policy, \
+    prepare_projects, scheduler
+from src.audio import prepare_audio_worker
+from src.pipeline import run_job_worker
+
+# CONSTANTS
+DEFAULT_WEB_WORKERS = 2 * (os.cpu_count() or 1) + 1  # Gunicorn's recommended number of workers
+DEFAULT_THREADS = 8  # Threads of each web worker; each open progress stream uses one
+WORKER_STOP_TIMEOUT = 10  # Time that the pipeline workers get to finish their jobs when stopping, in seconds
+
+
+# FUNCTIONS
+def run_pipeline_worker(stop_event: multiprocessing.synchronize.Event):
+    # Run the queued jobs until the server stops
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Stopped through the stop event instead
+    prepare_audio_worker(COMMON_SAMPLE_RATES, **VQT_PARAMS)
+    run_job_worker(scheduler, stop_event)
+
+
+def run_retention_process():
+    # Enforce the retention policy in a single process, however many web workers there are
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Stopped by the main process instead
+    enforce_retention_policy()
+
+
+def run_web_server(host: str, port: int, num_workers: int, num_threads: int):
+    # Serve the app with Gunicorn, which forks the web workers from this process; they are in their own process group
+    # so that interrupting the server from the terminal only signals the main process, which then stops them once
+    os.setpgrp()
+
+    class Application(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", num_workers)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("threads", num_threads)
+
+        def load(self):
+            return app
+
+    Application().run()
+
+
+def raise_keyboard_interrupt(signal_number, frame):
+    # Stop the server in the same way when it is terminated as when it is interrupted from the terminal
+    raise KeyboardInterrupt
+
+
+# MAIN CODE
+if __name__ == "__main__":
+    # Parse the arguments
+    parser = argparse.ArgumentParser(description="Runs AudiTranscribe with several web worker processes and separate "
+                                                 "pipeline worker processes. Processes on several machines can share "
+                                                 "the jobs if the MediaFiles folder is on a shared file system.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on (default: 8000)")
+    parser.add_argument("--web-workers", type=int, default=DEFAULT_WEB_WORKERS,
+                        help=f"number of web worker processes; 0 to not serve the app (default: {DEFAULT_WEB_WORKERS})")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS,
+                        help=f"number of threads of each web worker process (default: {DEFAULT_THREADS})")
+    parser.add_argument("--pipeline-workers", type=int, default=MAX_CONCURRENT_JOBS,
+                        help="number of files to process at the same time; each file uses several cores; 0 to leave "
+                             f"the processing to other machines (default: {MAX_CONCURRENT_JOBS})")
+    parser.add_argument("--no-retention", action="store_true",
+                        help="do not enforce the retention policy; use on all but one machine that share the files")
+    args = parser.parse_args()
+
+    if args.web_workers > 0 and BaseApplication is None:
+        print("Gunicorn is needed to run the web workers; install it with `pip install gunicorn`.")
+        sys.exit(1)
+
+    # Prepare the projects before any worker starts
+    prepare_projects()
+
+    # Run the pipeline workers, the retention policy and the web server in their own processes, so that Gunicorn's
+    # web workers do not inherit the others
+    stopEvent = multiprocessing.Event()
+    pipelineWorkers = [multiprocessing.Process(target=run_pipeline_worker, args=(stopEvent,), daemon=True)
+                       for _ in range(max(args.pipeline_workers, 0))]
+    otherProcesses = []
+
+    if not args.no_retention:
+        otherProcesses.append(multiprocessing.Process(target=run_retention_process, daemon=True))
+
+    if args.web_workers > 0:
+        otherProcesses.append(multiprocessing.Process(target=run_web_server, args=(
+            args.host, args.port, args.web_workers, max(args.threads, 1)
+        )))
+
+    for process in pipelineWorkers + otherProcesses:
+        process.start()
+
+    print(f"Started {len(pipelineWorkers)} pipeline worker process(es).")
+
+    # Run until the web server stops, or until all the processes stop if there is no web server
+    signal.signal(signal.SIGTERM, raise_keyboard_interrupt)
+
+    try:
+        for process in otherProcesses[-1:] if args.web_workers > 0 else pipelineWorkers + otherProcesses:
+            process.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        # Stop the web server and the retention policy, then let the pipeline workers finish their jobs unless that
+        # takes too long
+        stopEvent.set()
+
+        for process in otherProcesses[::-1]:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+        for process in pipelineWorkers:
+            process.join(WORKER_STOP_TIMEOUT)
+            if process.is_alive():
+                process.terminate()
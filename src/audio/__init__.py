@@ -1,3 +1,16 @@
-from .bpm_estimator import estimate_bpm
-from .get_audio_length import get_audio_length
-from .spectral import samples_to_cqt, samples_to_vqt
+from src.misc import export_lazily
+
+# Most of these modules import librosa, so they are only imported once their names are used
+export_lazily(__name__, {
+    "estimate_bpm": ".bpm_estimator",
+    "get_audio_length": ".get_audio_length",
+    "prepare_audio_worker": ".prepare_audio_worker",
+    "SpectralCache": ".spectral",
+    "SpectralEngine": ".spectral",
+    "dequantise_spectrogram": ".spectral",
+    "quantise_spectrogram": ".spectral",
+    "samples_to_cqt": ".spectral",
+    "samples_to_vqt": ".spectral",
+    "samples_to_vqt_blocks": ".spectral",
+    "track_beats": ".track_beats"
+})
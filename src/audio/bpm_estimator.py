@@ -2,7 +2,7 @@
 bpm_estimator.py
 
 Created on 2021-11-15
-Updated on 2022-02-02
+Updated on 2026-10-17
 
 Copyright © Ryan Kan
 
@@ -10,9 +10,8 @@ Description: Code that assists in estimating the BPM of a audio piece.
 """
 
 # IMPORTS
+import librosa
 import numpy as np
-from librosa.onset import onset_strength
-from librosa.beat import tempo
 
 
 # FUNCTIONS
@@ -34,10 +33,10 @@ def estimate_bpm(samples: np.ndarray, sample_rate: int) -> np.ndarray:
     """
 
     # Calculate the onset envelope
-    onset_env = onset_strength(samples, sr=sample_rate)
+    onset_env = librosa.onset.onset_strength(y=samples, sr=sample_rate)
 
     # Calculate the possible tempos
-    bpm = tempo(onset_envelope=onset_env, sr=sample_rate)
+    bpm = librosa.feature.tempo(onset_envelope=onset_env, sr=sample_rate)
 
     # Return the BPM array
     return bpm
@@ -0,0 +1,55 @@
+"""
+prepare_audio_worker.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Prepares a worker process for processing audio before its first job.
+"""
+
+# IMPORTS
+import importlib
+from typing import List, Optional
+
+# CONSTANTS
+SLOW_MODULES = ["librosa.beat", "librosa.onset", "librosa.feature"]  # Take seconds to import, so are only imported here
+
+
+# FUNCTIONS
+def prepare_audio_worker(sample_rates: List[float], hop_length: int, f_min: float, n_bins: int, bins_per_octave: int,
+                         gamma: Optional[float] = None):
+    """
+    Prepares a worker process for processing audio, so that none of this slows down its first job.
+
+    The spectral engines for the common sample rates are created, and the parts of librosa that the beat tracking uses
+    are imported. The package modules do not import those parts of librosa themselves, so that processes which never
+    process audio (like the web server's workers) start quickly.
+
+    Args:
+        sample_rates:
+            Sample rates to create spectral engines for.
+
+        hop_length:
+            Number of samples between successive columns.
+
+        f_min:
+            Minimum frequency.
+
+        n_bins:
+            Number of frequency bins starting from `f_min`.
+
+        bins_per_octave:
+            Number of frequency bins dedicated to each octave.
+
+        gamma:
+            Bandwidth offset of the filters. `None` gives the VQT and 0 gives the CQT.
+    """
+
+    from src.audio.spectral import SpectralEngine  # Imported here, as it imports librosa
+
+    for module_name in SLOW_MODULES:
+        importlib.import_module(module_name)
+
+    SpectralEngine.prepare(sample_rates, hop_length, f_min, n_bins, bins_per_octave, gamma=gamma)
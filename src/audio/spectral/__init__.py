@@ -1,2 +1,15 @@
-from .samples_to_cqt import samples_to_cqt
-from .samples_to_vqt import samples_to_vqt
+from src.misc import export_lazily
+
+# The transforms import librosa, so they are only imported once their names are used
+export_lazily(__name__, {
+    "AMPLITUDE_MIN": ".magnitude_to_db",
+    "TOP_DB": ".magnitude_to_db",
+    "magnitude_to_db": ".magnitude_to_db",
+    "dequantise_spectrogram": ".quantise_spectrogram",
+    "quantise_spectrogram": ".quantise_spectrogram",
+    "samples_to_cqt": ".samples_to_cqt",
+    "samples_to_vqt": ".samples_to_vqt",
+    "samples_to_vqt_blocks": ".samples_to_vqt",
+    "SpectralCache": ".spectral_cache",
+    "SpectralEngine": ".spectral_engine"
+})
@@ -0,0 +1,71 @@
+"""
+magnitude_to_db.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Converts magnitudes into decibels without allocating new matrices.
+"""
+
+# IMPORTS
+import math
+from typing import Optional
+
+import numpy as np
+
+from src.misc import SPECTROGRAM_DTYPE
+
+# CONSTANTS
+AMPLITUDE_MIN = 1e-5  # Minimum amplitude used when converting to decibels; same as `librosa.amplitude_to_db`
+TOP_DB = 80.  # Decibels below the maximum that the spectrogram is clipped to; same as `librosa.amplitude_to_db`
+
+
+# FUNCTIONS
+def magnitude_to_db(magnitude: np.ndarray, ref: Optional[float] = None, amin: float = AMPLITUDE_MIN,
+                    top_db: Optional[float] = TOP_DB) -> np.ndarray:
+    """
+    Converts magnitudes into decibels in place.
+
+    This gives the same result as `librosa.amplitude_to_db`, but without allocating any full-size temporary matrices.
+
+    Args:
+        magnitude:
+            Matrix of magnitudes of type `SPECTROGRAM_DTYPE`. It is overwritten with the decibel values.
+
+        ref:
+            Magnitude that is scaled to 0 dB. Defaults to the maximum magnitude in the matrix.
+
+        amin:
+            Minimum magnitude; smaller magnitudes are raised to this before the conversion.
+
+        top_db:
+            If provided, the decibel values are clipped to be at most this far below the maximum decibel value.
+
+    Returns:
+        np.ndarray:
+            The same matrix, now containing the decibel values.
+
+    Raises:
+        AssertionError:
+            If the magnitudes are not of type `SPECTROGRAM_DTYPE`.
+    """
+
+    assert magnitude.dtype == SPECTROGRAM_DTYPE, f"Magnitudes must be of type {np.dtype(SPECTROGRAM_DTYPE)}, not " \
+                                                 f"{magnitude.dtype}."
+
+    if ref is None:
+        ref = float(np.max(magnitude)) if magnitude.size > 0 else 1.
+
+    # Compute 20 * log10(max(amin, magnitude) / max(amin, ref))
+    np.maximum(magnitude, amin, out=magnitude)
+    np.log10(magnitude, out=magnitude)
+    magnitude *= 20
+    magnitude -= 20 * math.log10(max(amin, ref))
+
+    # Clip to the top decibels
+    if top_db is not None and magnitude.size > 0:
+        np.maximum(magnitude, np.max(magnitude) - top_db, out=magnitude)
+
+    return magnitude
@@ -2,7 +2,7 @@
 samples_to_cqt.py
 
 Created on 2021-12-21
-Updated on 2022-02-02
+Updated on 2026-10-17
 
 Copyright © Ryan Kan
 
@@ -15,6 +15,8 @@ from typing import Tuple
 import librosa
 import numpy as np
 
+from src.audio.spectral.magnitude_to_db import magnitude_to_db
+from src.audio.spectral.spectral_engine import SpectralEngine
 from src.misc import note_number_to_freq
 
 
@@ -45,22 +47,19 @@ def samples_to_cqt(sample_rate: float, samples: np.array, hop_length: int = 1024
 
     Returns:
         Tuple[np.ndarray, np.ndarray, np.ndarray]:
-            Triplet containing the Constant-Q Matrix, the array of sample frequencies, and the array of sample times in
-            this order.
+            Triplet containing the Constant-Q Matrix (in decibels, of type `SPECTROGRAM_DTYPE`), the array of sample
+            frequencies, and the array of sample times in this order.
     """
 
     # Generate the CQT of the audio file
-    cqt = librosa.cqt(samples, sr=sample_rate, hop_length=hop_length, fmin=f_min, n_bins=n_bins,
-                      bins_per_octave=bins_per_octave)
+    engine = SpectralEngine.get(sample_rate, hop_length, f_min, n_bins, bins_per_octave, gamma=0)
+    cqt = engine.magnitude(samples)  # Only the magnitudes are kept
 
-    # Keep only the magnitude of the complex numbers from the CQT
-    cqt = np.abs(cqt)
+    # Convert the amplitude of the sound to decibels, in place
+    cqt = magnitude_to_db(cqt)
 
     # Get the possible frequencies from the CQT
-    frequencies = librosa.cqt_frequencies(n_bins, f_min, bins_per_octave=bins_per_octave)
-
-    # Convert the amplitude of the sound to decibels
-    cqt = librosa.amplitude_to_db(cqt, ref=np.max)
+    frequencies = librosa.cqt_frequencies(n_bins=n_bins, fmin=f_min, bins_per_octave=bins_per_octave)
 
     # Get the time data
     frame_numbers = np.arange(cqt.shape[1])  # Get the time axis size
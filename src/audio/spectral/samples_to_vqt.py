@@ -2,7 +2,7 @@
 samples_to_vqt.py
 
 Created on 2021-12-21
-Updated on 2022-02-02
+Updated on 2026-10-17
 
 Copyright © Ryan Kan
 
@@ -10,17 +10,83 @@ Description: Converts the samples of a WAV file into a variable-Q transform (VQT
 """
 
 # IMPORTS
-from typing import Tuple
+import math
+from typing import Iterator, Optional, Tuple
 
 import librosa
 import numpy as np
 
-from src.misc import note_number_to_freq
+from src.audio.spectral.magnitude_to_db import AMPLITUDE_MIN, TOP_DB, magnitude_to_db
+from src.audio.spectral.spectral_engine import SpectralEngine
+from src.misc import SPECTROGRAM_DTYPE, note_number_to_freq
 
 
 # FUNCTIONS
+def samples_to_vqt_blocks(sample_rate: float, samples: np.array, hop_length: int = 1024, f_min=note_number_to_freq(0),
+                          n_bins: int = 600, bins_per_octave=60,
+                          block_frames: int = 2048) -> Iterator[Tuple[int, np.ndarray]]:
+    """
+    Converts the samples of a WAV file into VQT magnitudes, one block of frames at a time.
+
+    Each block is computed from a slice of the samples that has enough context on both sides for the longest filter,
+    so only one block of the VQT is ever held in memory. All blocks share the filter banks of one cached
+    `SpectralEngine`.
+
+    Args:
+        sample_rate:
+            Sample rate of the WAV file.
+
+        samples:
+            Data read from WAV file.
+
+        hop_length:
+            Number of samples between successive VQT columns.
+
+        f_min:
+            Minimum frequency. Defaults to the frequency of note C0.
+
+        n_bins:
+            Number of frequency bins starting from `f_min`.
+
+        bins_per_octave:
+            Number of frequency bins dedicated to each octave.
+
+        block_frames:
+            Maximum number of VQT frames in each block.
+
+    Yields:
+        Tuple[int, np.ndarray]:
+            Double containing the frame number of the first frame in the block, and the magnitudes of the VQT frames in
+            the block (NOT converted to decibels, and of type `SPECTROGRAM_DTYPE`) in that order.
+    """
+
+    # Get the engine with the filter banks for these parameters
+    engine = SpectralEngine.get(sample_rate, hop_length, f_min, n_bins, bins_per_octave)
+
+    # Get the total number of frames, and the amount of context that each block needs; this is the length of the longest
+    # filter, which is twice what a centred filter actually reaches, rounded up to a whole number of hops
+    num_frames = 1 + len(samples) // hop_length
+    context = math.ceil(engine.max_filter_length / hop_length) * hop_length
+
+    for start_frame in range(0, num_frames, block_frames):
+        end_frame = min(start_frame + block_frames, num_frames)
+
+        # Get the samples needed for the block; the start stays a multiple of the hop length so that frames line up
+        start_sample = max(start_frame * hop_length - context, 0)
+        end_sample = min((end_frame - 1) * hop_length + context, len(samples))
+
+        # Generate the magnitudes of the VQT of the samples
+        vqt = engine.magnitude(samples[start_sample:end_sample])
+
+        # Keep only the needed frames
+        frame_offset = start_sample // hop_length
+        yield start_frame, vqt[:, start_frame - frame_offset:end_frame - frame_offset]
+
+
 def samples_to_vqt(sample_rate: float, samples: np.array, hop_length: int = 1024, f_min=note_number_to_freq(0),
-                   n_bins: int = 600, bins_per_octave=60) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+                   n_bins: int = 600, bins_per_octave=60, block_frames: Optional[int] = None,
+                   out_path: Optional[str] = None,
+                   progress: Optional[list] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     Converts the samples of a WAV file into a VQT matrix.
 
@@ -43,24 +109,75 @@ def samples_to_vqt(sample_rate: float, samples: np.array, hop_length: int = 1024
         bins_per_octave:
             Number of frequency bins dedicated to each octave.
 
+        block_frames:
+            If provided, the VQT is computed in blocks of at most this many frames using `samples_to_vqt_blocks`, and
+            is normalised using the running maximum once all blocks are done. This bounds the memory used by the
+            transform itself to the size of a block. If `None`, the VQT is computed in one go.
+
+        out_path:
+            If provided along with `block_frames`, the VQT is written into a memory-mapped `.npy` file at this path
+            (which is overwritten) instead of an array in memory, and that memory map is returned. Each block is then
+            written out as it is done, so the whole VQT is never held in memory either. The file is not deleted.
+
+        progress:
+            List object to share the VQT generation process with other threads. After each block, its only element is
+            set to the double `(blocks_done, num_blocks)`. When the VQT is computed in one go, it counts as one block.
+
     Returns:
         Tuple[np.ndarray, np.ndarray, np.ndarray]:
-            Triplet containing the Variable-Q Matrix, the array of sample frequencies, and the array of sample times in
-            this order.
+            Triplet containing the Variable-Q Matrix (in decibels, of type `SPECTROGRAM_DTYPE`), the array of sample
+            frequencies, and the array of sample times in this order.
     """
 
-    # Generate the VQT of the audio file
-    vqt = librosa.vqt(samples, sr=sample_rate, hop_length=hop_length, fmin=f_min, n_bins=n_bins,
-                      bins_per_octave=bins_per_octave)
+    if block_frames is None:
+        # Generate the magnitudes of the VQT of the audio file; the complex VQT is never held in memory at once
+        vqt = SpectralEngine.get(sample_rate, hop_length, f_min, n_bins, bins_per_octave).magnitude(samples)
 
-    # Keep only the magnitude of the complex numbers from the VQT
-    vqt = np.abs(vqt)
+        # Convert the amplitude of the sound to decibels, in place
+        vqt = magnitude_to_db(vqt, amin=AMPLITUDE_MIN, top_db=TOP_DB)
 
-    # Get the possible frequencies from the VQT
-    frequencies = librosa.cqt_frequencies(n_bins, f_min, bins_per_octave=bins_per_octave)
+        # Update the progress, if required
+        if progress is not None:
+            progress[0] = (1, 1)
+
+    else:
+        # Convert each block's amplitudes to (unnormalised) decibels, keeping track of the maximum amplitude
+        shape = (n_bins, 1 + len(samples) // hop_length)
+
+        if out_path is None:
+            vqt = np.empty(shape, dtype=SPECTROGRAM_DTYPE)
+        else:
+            vqt = np.lib.format.open_memmap(out_path, mode="w+", dtype=SPECTROGRAM_DTYPE, shape=shape)
+
+        max_amplitude = 0.
+        num_frames = 0
+        num_blocks = math.ceil(vqt.shape[1] / block_frames)
+
+        for start_frame, block in samples_to_vqt_blocks(sample_rate, samples, hop_length=hop_length, f_min=f_min,
+                                                        n_bins=n_bins, bins_per_octave=bins_per_octave,
+                                                        block_frames=block_frames):
+            max_amplitude = max(max_amplitude, float(np.max(block)))
+            num_frames = start_frame + block.shape[1]
+
+            vqt[:, start_frame:num_frames] = magnitude_to_db(block, ref=1., amin=AMPLITUDE_MIN, top_db=None)
 
-    # Convert the amplitude of the sound to decibels
-    vqt = librosa.amplitude_to_db(vqt, ref=np.max)
+            # Update the progress, if required
+            if progress is not None:
+                progress[0] = (start_frame // block_frames + 1, num_blocks)
+
+        # The last block may have fewer frames than expected
+        vqt = vqt[:, :num_frames]
+
+        # Normalise by the maximum amplitude and clip to the top decibels, like `librosa.amplitude_to_db` does; both
+        # are done in place, so a memory-mapped VQT is only read and written through the page cache
+        vqt -= 20 * np.log10(max(AMPLITUDE_MIN, max_amplitude))
+        np.maximum(vqt, np.max(vqt) - TOP_DB, out=vqt)
+
+        if out_path is not None:
+            vqt.flush()
+
+    # Get the possible frequencies from the VQT
+    frequencies = librosa.cqt_frequencies(n_bins=n_bins, fmin=f_min, bins_per_octave=bins_per_octave)
 
     # Get the time data
     frame_numbers = np.arange(vqt.shape[1])  # Get the time axis size
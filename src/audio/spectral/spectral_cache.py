@@ -0,0 +1,298 @@
+"""
+spectral_cache.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Content-addressed disk cache of spectral analysis results.
+"""
+
+# IMPORTS
+import json
+import os
+import shutil
+import tempfile
+from hashlib import sha1
+from typing import Callable, Optional, Tuple
+
+import numpy as np
+
+from src.audio.spectral.quantise_spectrogram import dequantise_spectrogram, quantise_spectrogram
+from src.misc import SPECTROGRAM_DTYPE
+
+# CONSTANTS
+CACHE_ARRAYS = ("spectrogram", "frequencies", "times")  # Names of the arrays saved for each result
+RANGE_ARRAY = "spectrogram_range"  # Name of the array with the range of values of a quantised spectrogram
+
+
+# CLASSES
+class SpectralCache:
+    """
+    Disk cache of the results of spectral transforms like `samples_to_vqt` and `samples_to_cqt`.
+
+    Each result is saved as `.npy` files in a folder whose path is made from the hash of the audio file, the name of the
+    transform and a digest of the transform's parameters, so a result is only reused for exactly the same audio and
+    parameters. Results are loaded with memory mapping. Once the cache goes over its size budget, the least recently
+    used results are deleted.
+
+    Spectrograms can be stored quantised to 8-bit or 16-bit unsigned integers (see `quantise_spectrogram`), which makes
+    the cache hold two or four times as many results. Quantised spectrograms are restored when they are loaded, either
+    into memory or, so that long spectrograms are never held in memory whole, into a memory-mapped file.
+    """
+
+    def __init__(self, folder_path: str, max_size: int, spectrogram_dtype=None):
+        """
+        Initialization method for a `SpectralCache` object.
+
+        Args:
+            folder_path:
+                Path to the folder that contains the cache. It will be created if it does not exist.
+
+            max_size:
+                Maximum size of the cache, in bytes.
+
+            spectrogram_dtype:
+                If provided, the spectrograms are stored quantised to this type, which must be one of
+                `QUANTISED_SPECTROGRAM_DTYPES`. Otherwise they are stored as they are.
+        """
+
+        self.folder_path = folder_path
+        self.max_size = max_size
+        self.spectrogram_dtype = spectrogram_dtype
+
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(folder_path, exist_ok=True)
+
+    # Public methods
+    def get_entry_path(self, file_hash: str, transform: str, **params) -> str:
+        """
+        Gets the path to the folder of a cache entry.
+
+        Args:
+            file_hash:
+                Hash of the audio file, as generated by `generate_hash_from_file`.
+
+            transform:
+                Name of the transform, like "vqt" or "cqt".
+
+            **params:
+                Parameters of the transform.
+
+        Returns:
+            str:
+                Path to the folder of the cache entry.
+        """
+
+        params_digest = sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()
+        return os.path.join(self.folder_path, file_hash, f"{transform}_{params_digest}")
+
+    def contains(self, file_hash: str, transform: str, **params) -> bool:
+        """
+        Checks whether a result is in the cache, without loading it.
+
+        Args:
+            file_hash:
+                Hash of the audio file, as generated by `generate_hash_from_file`.
+
+            transform:
+                Name of the transform, like "vqt" or "cqt".
+
+            **params:
+                Parameters of the transform.
+
+        Returns:
+            bool:
+                Whether the result is in the cache.
+        """
+
+        return os.path.isdir(self.get_entry_path(file_hash, transform, **params))
+
+    def load(self, file_hash: str, transform: str, out_path: Optional[str] = None,
+             **params) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Loads a cached result.
+
+        Args:
+            file_hash:
+                Hash of the audio file, as generated by `generate_hash_from_file`.
+
+            transform:
+                Name of the transform, like "vqt" or "cqt".
+
+            out_path:
+                If provided, a spectrogram that was stored quantised is restored into a `.npy` file at this path, which
+                is memory-mapped, instead of into memory. The file is left for the caller to delete.
+
+            **params:
+                Parameters of the transform.
+
+        Returns:
+            Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+                Triplet containing the spectrogram, frequencies and times in that order, or `None` if the result is not
+                in the cache. The arrays are memory-mapped, except for a spectrogram that was stored quantised and is
+                restored without an `out_path`.
+        """
+
+        entry_path = self.get_entry_path(file_hash, transform, **params)
+
+        try:
+            result = tuple(np.load(os.path.join(entry_path, f"{name}.npy"), mmap_mode="r") for name in CACHE_ARRAYS)
+
+            # Restore a quantised spectrogram; this works whatever `spectrogram_dtype` the entry was saved with
+            if np.issubdtype(result[0].dtype, np.integer):
+                value_range = tuple(np.load(os.path.join(entry_path, f"{RANGE_ARRAY}.npy")))
+                out = None if out_path is None else \
+                    np.lib.format.open_memmap(out_path, mode="w+", dtype=SPECTROGRAM_DTYPE, shape=result[0].shape)
+
+                result = (dequantise_spectrogram(result[0], value_range, out=out),) + result[1:]
+
+                if out is not None:
+                    out.flush()
+        except OSError:  # Not in the cache, or evicted while being loaded
+            self.misses += 1
+            return None
+
+        # Mark the entry as recently used
+        try:
+            os.utime(entry_path)
+        except OSError:
+            pass
+
+        self.hits += 1
+        return result
+
+    def save(self, file_hash: str, transform: str, spectrogram: np.ndarray, frequencies: np.ndarray, times: np.ndarray,
+             **params):
+        """
+        Saves a result into the cache, then evicts old results if the cache is over its size budget.
+
+        Args:
+            file_hash:
+                Hash of the audio file, as generated by `generate_hash_from_file`.
+
+            transform:
+                Name of the transform, like "vqt" or "cqt".
+
+            spectrogram:
+                Spectrogram matrix.
+
+            frequencies:
+                Array of sample frequencies.
+
+            times:
+                Array of sample times.
+
+            **params:
+                Parameters of the transform.
+        """
+
+        entry_path = self.get_entry_path(file_hash, transform, **params)
+        os.makedirs(os.path.dirname(entry_path), exist_ok=True)
+
+        # Write the arrays into a temporary folder first, so that a partially written entry is never loaded
+        temp_path = tempfile.mkdtemp(prefix=".", dir=os.path.dirname(entry_path))
+
+        if self.spectrogram_dtype is not None:
+            spectrogram, value_range = quantise_spectrogram(spectrogram, self.spectrogram_dtype)
+            np.save(os.path.join(temp_path, f"{RANGE_ARRAY}.npy"), np.array(value_range))
+
+        for name, array in zip(CACHE_ARRAYS, (spectrogram, frequencies, times)):
+            np.save(os.path.join(temp_path, f"{name}.npy"), array)
+
+        try:
+            os.rename(temp_path, entry_path)
+        except OSError:  # Another process saved the same entry first
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+        # Keep the cache within its budget
+        self.evict()
+
+    def get_or_compute(self, file_hash: str, transform: str, function: Callable, sample_rate: float,
+                       samples: np.ndarray, out_path: Optional[str] = None,
+                       **params) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Loads a cached result, or computes and caches it if it is not in the cache.
+
+        Args:
+            file_hash:
+                Hash of the audio file, as generated by `generate_hash_from_file`.
+
+            transform:
+                Name of the transform, like "vqt" or "cqt".
+
+            function:
+                Function that computes the result, called as `function(sample_rate, samples, **params)`.
+
+            sample_rate:
+                Sample rate of the audio.
+
+            samples:
+                Audio samples.
+
+            out_path:
+                Path to restore a spectrogram that was stored quantised into; see `load`.
+
+            **params:
+                Parameters of the transform. All parameters that affect the result should be given, even if they are
+                the function's defaults.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray, np.ndarray]:
+                Triplet containing the spectrogram, frequencies and times in that order.
+        """
+
+        result = self.load(file_hash, transform, out_path=out_path, **params)
+
+        if result is None:
+            result = function(sample_rate, samples, **params)
+            self.save(file_hash, transform, *result, **params)
+
+        return result
+
+    def evict(self):
+        """
+        Deletes the least recently used entries until the cache is within its size budget.
+        """
+
+        # Get the size and last use time of every entry
+        entries = []
+        total_size = 0
+
+        for file_hash in os.listdir(self.folder_path):
+            file_hash_path = os.path.join(self.folder_path, file_hash)
+            if not os.path.isdir(file_hash_path):
+                continue
+
+            for entry in os.listdir(file_hash_path):
+                if entry.startswith("."):  # Entry that is still being written
+                    continue
+
+                entry_path = os.path.join(file_hash_path, entry)
+
+                try:
+                    size = sum(file.stat().st_size for file in os.scandir(entry_path))
+                    entries.append((os.stat(entry_path).st_mtime, size, entry_path))
+                except OSError:  # Deleted by another process
+                    continue
+
+                total_size += size
+
+        # Delete entries, oldest first, until the cache is small enough
+        entries.sort()
+
+        for _, size, entry_path in entries:
+            if total_size <= self.max_size:
+                break
+
+            shutil.rmtree(entry_path, ignore_errors=True)
+            total_size -= size
+
+            # Remove the audio file's folder if it is now empty
+            try:
+                os.rmdir(os.path.dirname(entry_path))
+            except OSError:
+                pass
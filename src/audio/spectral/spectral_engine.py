@@ -0,0 +1,286 @@
+"""
+spectral_engine.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Constant-Q and variable-Q transforms with precomputed, reusable filter banks.
+"""
+
+# IMPORTS
+import threading
+from typing import Callable, List, Optional
+
+import librosa
+import numpy as np
+
+from src.misc import SAMPLE_DTYPE, SPECTROGRAM_DTYPE, TRANSFORM_DTYPE
+
+# CONSTANTS
+SPARSITY = 0.01  # Fraction of each filter's energy that may be discarded; same as `librosa.vqt`
+RESAMPLE_TYPE = "soxr_hq"  # Resampling used between octaves; same as `librosa.vqt`
+
+
+# CLASSES
+class SpectralEngine:
+    """
+    Computes the variable-Q transform (VQT) or constant-Q transform (CQT) of audio with one fixed set of parameters.
+
+    This follows the same multi-rate algorithm as `librosa.vqt`, but the sparse, frequency-domain filter bank of every
+    octave is generated once when the engine is created, instead of on every call. Engines are cached by their
+    parameters (see `SpectralEngine.get`), so every job in a process with the same sample rate shares the same filter
+    banks. An engine is read-only once created, so it can be used by several threads at once.
+    """
+
+    _engines = {}  # Maps the parameters of each cached engine to the engine
+    _engines_lock = threading.Lock()
+
+    def __init__(self, sample_rate: float, hop_length: int, f_min: float, n_bins: int, bins_per_octave: int,
+                 gamma: Optional[float] = None):
+        """
+        Initialization method for a `SpectralEngine` object.
+
+        Args:
+            sample_rate:
+                Sample rate of the audio.
+
+            hop_length:
+                Number of samples between successive columns.
+
+            f_min:
+                Minimum frequency.
+
+            n_bins:
+                Number of frequency bins starting from `f_min`.
+
+            bins_per_octave:
+                Number of frequency bins dedicated to each octave.
+
+            gamma:
+                Bandwidth offset of the filters. `None` gives the VQT with bandwidths based on the equivalent
+                rectangular bandwidth, and 0 gives the CQT.
+
+        Raises:
+            AssertionError:
+                If the highest filter would go above the Nyquist frequency.
+        """
+
+        self.sample_rate = sample_rate
+        self.hop_length = hop_length
+        self.f_min = f_min
+        self.n_bins = n_bins
+        self.bins_per_octave = bins_per_octave
+        self.gamma = gamma
+
+        # Get the frequencies and relative bandwidths of the filters; the frequencies are equally spaced on a log scale
+        self.frequencies = librosa.cqt_frequencies(n_bins=n_bins, fmin=f_min, bins_per_octave=bins_per_octave)
+
+        r = 2 ** (1 / bins_per_octave)
+        alpha = np.full(n_bins, (r ** 2 - 1) / (r ** 2 + 1))
+
+        lengths, filter_cutoff = librosa.filters.wavelet_lengths(freqs=self.frequencies, sr=sample_rate, gamma=gamma,
+                                                                 alpha=alpha)
+        assert filter_cutoff <= sample_rate / 2, f"Filters up to {filter_cutoff} Hz would go above the Nyquist " \
+                                                 f"frequency of {sample_rate / 2} Hz."
+
+        self.max_filter_length = float(np.max(lengths))
+
+        # Work out how much the audio can be downsampled before the first (i.e. highest) octave
+        num_octaves = int(np.ceil(n_bins / bins_per_octave))
+        num_filters = min(bins_per_octave, n_bins)
+
+        num_twos = 0
+        while hop_length % (2 ** (num_twos + 1)) == 0:
+            num_twos += 1
+
+        self._downsample_count = min(
+            max(0, int(np.ceil(np.log2(sample_rate / 2 / filter_cutoff)) - 1) - 1),
+            max(0, num_twos - num_octaves + 1)
+        )
+
+        # Get the factors that normalise each bin by its filter's length, at the downsampled sample rate
+        top_sample_rate = sample_rate / 2 ** self._downsample_count
+        self._scales = (1 / np.sqrt(lengths * top_sample_rate / sample_rate))[:, np.newaxis].astype(SPECTROGRAM_DTYPE)
+
+        # Generate the filter bank of each octave, from the highest octave to the lowest
+        octave_sample_rate = top_sample_rate
+        octave_hop_length = hop_length // 2 ** self._downsample_count
+
+        self._octaves = []  # Each octave is `(fft_basis, n_fft, hop_length, downsample_after)`
+
+        for octave in range(num_octaves):
+            # Get the filters of this octave
+            octave_slice = slice(n_bins - num_filters * (octave + 1), n_bins - num_filters * octave)
+            octave_slice = slice(max(octave_slice.start, 0), octave_slice.stop)
+
+            # Generate the filters, and move them into the frequency domain
+            basis, basis_lengths = librosa.filters.wavelet(
+                freqs=self.frequencies[octave_slice], sr=octave_sample_rate, gamma=gamma, alpha=alpha[octave_slice],
+                pad_fft=True
+            )
+            n_fft = basis.shape[1]
+
+            basis *= basis_lengths[:, np.newaxis] / n_fft
+            fft_basis = np.fft.fft(basis, n=n_fft, axis=1)[:, :n_fft // 2 + 1]
+
+            # Make the basis sparse, and compensate for the downsampling of the audio
+            fft_basis = librosa.util.sparsify_rows(fft_basis, quantile=SPARSITY, dtype=TRANSFORM_DTYPE)
+            fft_basis *= np.sqrt(top_sample_rate / octave_sample_rate)
+
+            # Halve the sample rate for the next octave, if the hop length allows it
+            downsample_after = octave_hop_length % 2 == 0
+            self._octaves.append((fft_basis, n_fft, octave_hop_length, downsample_after))
+
+            if downsample_after:
+                octave_hop_length //= 2
+                octave_sample_rate /= 2
+
+    # Public methods
+    @classmethod
+    def get(cls, sample_rate: float, hop_length: int, f_min: float, n_bins: int, bins_per_octave: int,
+            gamma: Optional[float] = None) -> "SpectralEngine":
+        """
+        Gets the cached engine with the given parameters, creating it if it does not exist yet.
+
+        Args:
+            sample_rate:
+                Sample rate of the audio.
+
+            hop_length:
+                Number of samples between successive columns.
+
+            f_min:
+                Minimum frequency.
+
+            n_bins:
+                Number of frequency bins starting from `f_min`.
+
+            bins_per_octave:
+                Number of frequency bins dedicated to each octave.
+
+            gamma:
+                Bandwidth offset of the filters. `None` gives the VQT and 0 gives the CQT.
+
+        Returns:
+            SpectralEngine:
+                The engine.
+        """
+
+        key = (float(sample_rate), hop_length, float(f_min), n_bins, bins_per_octave, gamma)
+
+        with cls._engines_lock:
+            engine = cls._engines.get(key)
+
+            if engine is None:
+                engine = cls(sample_rate, hop_length, f_min, n_bins, bins_per_octave, gamma=gamma)
+                cls._engines[key] = engine
+
+        return engine
+
+    @classmethod
+    def prepare(cls, sample_rates: List[float], hop_length: int, f_min: float, n_bins: int, bins_per_octave: int,
+                gamma: Optional[float] = None):
+        """
+        Creates and caches the engines for several sample rates ahead of time, e.g. when a worker process starts.
+
+        Args:
+            sample_rates:
+                Sample rates to create engines for.
+
+            hop_length:
+                Number of samples between successive columns.
+
+            f_min:
+                Minimum frequency.
+
+            n_bins:
+                Number of frequency bins starting from `f_min`.
+
+            bins_per_octave:
+                Number of frequency bins dedicated to each octave.
+
+            gamma:
+                Bandwidth offset of the filters. `None` gives the VQT and 0 gives the CQT.
+        """
+
+        for sample_rate in sample_rates:
+            cls.get(sample_rate, hop_length, f_min, n_bins, bins_per_octave, gamma=gamma)
+
+    def transform(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Computes the transform of some audio samples.
+
+        Args:
+            samples:
+                Audio samples, at the engine's sample rate.
+
+        Returns:
+            np.ndarray:
+                Complex matrix of type `TRANSFORM_DTYPE` and shape `(n_bins, num_frames)`, where
+                `num_frames = 1 + len(samples) // hop_length`.
+        """
+
+        return self._compute(samples, TRANSFORM_DTYPE, None)
+
+    def magnitude(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Computes the magnitude of the transform of some audio samples.
+
+        This is the same as `np.abs(engine.transform(samples))`, but the magnitude of each octave is computed as soon as
+        that octave is done, so the complex transform of all the octaves is never held in memory at once.
+
+        Args:
+            samples:
+                Audio samples, at the engine's sample rate.
+
+        Returns:
+            np.ndarray:
+                Matrix of type `SPECTROGRAM_DTYPE` and shape `(n_bins, num_frames)`, where
+                `num_frames = 1 + len(samples) // hop_length`.
+        """
+
+        return self._compute(samples, SPECTROGRAM_DTYPE, np.abs)
+
+    # Private methods
+    def _compute(self, samples: np.ndarray, dtype, convert: Optional[Callable]) -> np.ndarray:
+        """
+        Computes the transform of some audio samples, converting each octave's response before it is stored.
+        """
+
+        # Downsample the audio before the first octave, if possible
+        samples = np.asarray(samples, dtype=SAMPLE_DTYPE)
+
+        if self._downsample_count > 0:
+            samples = librosa.resample(samples, orig_sr=2 ** self._downsample_count, target_sr=1,
+                                       res_type=RESAMPLE_TYPE, scale=True)
+
+        # Get the response of each octave's filters, halving the sample rate between octaves, and write it straight into
+        # the rows of the octave's bins
+        result = None
+        end_bin = self.n_bins
+
+        for fft_basis, n_fft, hop_length, downsample_after in self._octaves:
+            stft = librosa.stft(samples, n_fft=n_fft, hop_length=hop_length, window="ones", pad_mode="constant",
+                                dtype=TRANSFORM_DTYPE)
+            response = fft_basis.dot(stft)
+            del stft
+
+            # Lower octaves never have fewer frames than the first (i.e. highest) octave, as the audio is downsampled
+            # by rounding up its length
+            if result is None:
+                result = np.empty((self.n_bins, response.shape[1]), dtype=dtype)
+
+            start_bin = end_bin - response.shape[0]
+            response = response[:, :result.shape[1]]
+            result[start_bin:end_bin] = response if convert is None else convert(response)
+            end_bin = start_bin
+            del response
+
+            if downsample_after:
+                samples = librosa.resample(samples, orig_sr=2, target_sr=1, res_type=RESAMPLE_TYPE, scale=True)
+
+        # Normalise by the lengths of the filters; they are positive, so this can be done after taking magnitudes
+        result *= self._scales
+        return result
@@ -0,0 +1,88 @@
+"""
+track_beats.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Tracks the changing tempo and the beats of an audio piece using its spectrogram.
+"""
+
+# IMPORTS
+from typing import Tuple
+
+import librosa
+import numpy as np
+
+
+# FUNCTIONS
+def track_beats(spectrogram: np.ndarray, times: np.ndarray,
+                curve_interval: float = 1.) -> Tuple[float, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Tracks the tempo and the beats of an audio piece using a spectrogram that was already computed.
+
+    The onset strength is computed from the spectrogram, instead of from a separate transform of the samples, so this
+    only takes a small fraction of the time needed to compute the spectrogram.
+
+    Args:
+        spectrogram:
+            Decibel spectrogram of the audio piece, like the one from `samples_to_vqt`.
+
+        times:
+            Array of evenly spaced times of the spectrogram's frames.
+
+        curve_interval:
+            Time between the points of the tempo curve, in seconds.
+
+    Returns:
+        Tuple[float, np.ndarray, np.ndarray, np.ndarray]:
+            Quadruple containing the estimated tempo of the whole piece in beats per minute (BPM), the times of the
+            points of the tempo curve, the tempo at each of those times in BPM, and the times of the beats, in that
+            order. All times are in seconds.
+
+    Raises:
+        AssertionError:
+            If the spectrogram has fewer than two frames.
+    """
+
+    assert len(times) >= 2, f"At least 2 frames are needed to track beats, but there are only {len(times)}."
+
+    # Treat each frame as a sample, so that the librosa functions work with the frame rate of the spectrogram
+    frame_rate = 1 / (times[1] - times[0])
+
+    # Calculate the onset envelope from the changes between consecutive frames; the frames' windows are centred on their
+    # times, so they reach each onset about a frame early, and the envelope is delayed by a frame to make up for this
+    onset_env = librosa.onset.onset_strength(S=spectrogram, sr=frame_rate, center=False)
+    onset_env = np.concatenate([[0], onset_env[:-1]])
+
+    # Estimate the tempo of the whole piece and the tempo at every frame, sharing the tempogram between them
+    tg = librosa.feature.tempogram(onset_envelope=onset_env, sr=frame_rate, hop_length=1)
+    bpm = librosa.feature.tempo(tg=tg, sr=frame_rate, hop_length=1)[0]
+    frame_bpms = librosa.feature.tempo(tg=tg, sr=frame_rate, hop_length=1, aggregate=None)
+
+    # Track the beats, following the tempo at every frame
+    _, beat_frames = librosa.beat.beat_track(onset_envelope=onset_env, sr=frame_rate, hop_length=1, bpm=frame_bpms)
+
+    # Keep one point of the tempo curve every `curve_interval` seconds
+    curve_frames = np.arange(0, len(frame_bpms), max(round(curve_interval * frame_rate), 1))
+
+    return float(bpm), times[curve_frames], frame_bpms[curve_frames], times[beat_frames]
+
+
+# TESTING CODE
+if __name__ == "__main__":
+    # Imports
+    from src.audio import samples_to_vqt
+    from src.io import wav_to_samples
+
+    # Read the testing WAV file
+    samples_, sample_rate_ = wav_to_samples("../../Testing Files/Fly.wav")
+
+    # Track the beats using the VQT spectrogram
+    spec, _, time = samples_to_vqt(sample_rate_, samples_)
+    bpm_, curve_times_, curve_bpms_, beat_times_ = track_beats(spec, time)
+
+    print(bpm_)
+    print(np.stack([curve_times_, curve_bpms_], axis=1))
+    print(beat_times_)
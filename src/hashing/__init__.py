@@ -1,2 +1,3 @@
-from .file_hash import generate_hash_from_file
+from .file_hash import HASH_BLOCK_SIZE, generate_hash_from_file
+from .hashing_file import HashingFile
 from .random_hash import generate_random_hash
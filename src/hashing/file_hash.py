@@ -2,7 +2,7 @@
 generate_hash_from_file.py
 
 Created on 2022-01-22
-Updated on 2022-02-02
+Updated on 2026-10-17
 
 Copyright © Ryan Kan
 
@@ -12,6 +12,9 @@ Description: Generates a SHA hash based on file contents.
 # IMPORTS
 from hashlib import sha1
 
+# CONSTANTS
+HASH_BLOCK_SIZE = 2 ** 20  # Number of bytes read at a time; 1 MiB
+
 
 # FUNCTIONS
 def generate_hash_from_file(file_path: str) -> str:
@@ -32,8 +35,8 @@ def generate_hash_from_file(file_path: str) -> str:
 
     # Read file bytes
     with open(file_path, "rb") as f:
-        # Read and update hash string value in blocks of 8 KiB
-        for byte_block in iter(lambda: f.read(8192), b""):  # The sentinel value is a null byte
+        # Read and update hash string value in blocks
+        for byte_block in iter(lambda: f.read(HASH_BLOCK_SIZE), b""):  # The sentinel value is a null byte
             sha_hash.update(byte_block)
 
     # Output the hex digest of the file
@@ -0,0 +1,76 @@
+"""
+hashing_file.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: File object that hashes everything written to it.
+"""
+
+# IMPORTS
+import hashlib
+from typing import BinaryIO
+
+
+# CLASSES
+class HashingFile:
+    """
+    Wrapper around a binary file object that updates a hash with every block of data written to it, so that the hash of
+    a file that is written in one pass (like an uploaded file) is known without reading the file again.
+
+    Everything other than writing is passed on to the wrapped file object. The hash is only that of the file's contents
+    if the data is written from the start of the file, in order.
+    """
+
+    def __init__(self, file: BinaryIO, algorithm: str = "sha1"):
+        """
+        Initialization method for a `HashingFile` object.
+
+        Args:
+            file:
+                Binary file object to write to.
+
+            algorithm:
+                Name of the hashing algorithm, as accepted by `hashlib.new`. Defaults to SHA1, which is what
+                `generate_hash_from_file` uses.
+        """
+
+        self.file = file
+        self._hash = hashlib.new(algorithm)
+
+    # Magic methods
+    def __getattr__(self, name: str):
+        return getattr(self.file, name)
+
+    def __iter__(self):
+        return iter(self.file)
+
+    # Public methods
+    def write(self, data: bytes) -> int:
+        """
+        Writes data to the file and adds it to the hash.
+
+        Args:
+            data:
+                Data to write.
+
+        Returns:
+            int:
+                Number of bytes written.
+        """
+
+        self._hash.update(data)
+        return self.file.write(data)
+
+    def hexdigest(self) -> str:
+        """
+        Gets the hash of the data written so far.
+
+        Returns:
+            str:
+                The hex digest of the data written so far.
+        """
+
+        return self._hash.hexdigest()
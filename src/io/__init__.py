@@ -1,4 +1,13 @@
-from .audio_to_audiosegment import SUPPORTED_AUDIO_EXTENSIONS, audio_to_audiosegment
-from .audiosegment_to_mp3 import audiosegment_to_mp3
-from .audiosegment_to_wav import audiosegment_to_wav
-from .wav_to_samples import wav_to_samples
+from src.misc import export_lazily
+
+# These modules import pydub or librosa, so they are only imported once their names are used
+export_lazily(__name__, {
+    "SUPPORTED_AUDIO_EXTENSIONS": ".audio_to_audiosegment",
+    "audio_to_audiosegment": ".audio_to_audiosegment",
+    "audiosegment_to_mp3": ".audiosegment_to_mp3",
+    "audiosegment_to_samples": ".audiosegment_to_samples",
+    "audiosegment_to_wav": ".audiosegment_to_wav",
+    "probe_audio_file": ".probe_audio_file",
+    "probe_mp3_bitrate": ".probe_mp3_bitrate",
+    "wav_to_samples": ".wav_to_samples"
+})
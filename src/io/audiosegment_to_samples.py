@@ -0,0 +1,68 @@
+"""
+audiosegment_to_samples.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Converts an `AudioSegment` object into audio samples, without writing it to disk.
+"""
+
+# IMPORTS
+from typing import Tuple
+
+import numpy as np
+from pydub import AudioSegment
+
+from src.misc import SAMPLE_DTYPE
+
+# CONSTANTS
+SAMPLE_WIDTH_DTYPES = {1: np.int8, 2: np.int16, 4: np.int32}  # NumPy types of the raw samples of each sample width
+
+
+# FUNCTIONS
+def audiosegment_to_samples(audiosegment: AudioSegment) -> Tuple[np.ndarray, int]:
+    """
+    Converts an `AudioSegment` object into its samples and sample rate.
+
+    The samples are read directly from the raw data of the `AudioSegment` object, so there is no need to export it to a
+    WAV file and read that file back in. Like `wav_to_samples`, the channels are averaged into a single channel and the
+    samples are scaled to the interval [-1, 1).
+
+    Args:
+        audiosegment:
+           The `AudioSegment` object.
+
+    Returns:
+        Tuple[np.ndarray, int]:
+            Double containing the audio samples (of type `SAMPLE_DTYPE`) and the sample rate in that order.
+    """
+
+    # Get the raw data and sample properties
+    raw_data = audiosegment.raw_data
+    sample_width = audiosegment.sample_width
+    num_channels = audiosegment.channels
+
+    # View the raw data as integers; this does not copy the data
+    if sample_width == 3:
+        # There is no 24-bit integer type, so place each sample in the upper three bytes of a 32-bit integer
+        raw_bytes = np.frombuffer(raw_data, dtype=np.uint8).reshape(-1, 3)
+        raw_samples = np.zeros((len(raw_bytes), 4), dtype=np.uint8)
+        raw_samples[:, 1:] = raw_bytes
+        raw_samples = raw_samples.view("<i4").ravel()
+        sample_width = 4
+    else:
+        raw_samples = np.frombuffer(raw_data, dtype=SAMPLE_WIDTH_DTYPES[sample_width])
+
+    # Average the channels into a single channel; this is the only full-size allocation
+    if num_channels == 1:
+        samples = raw_samples.astype(SAMPLE_DTYPE)
+    else:
+        samples = raw_samples.reshape(-1, num_channels).mean(axis=1, dtype=SAMPLE_DTYPE)
+
+    # Scale the samples into the interval [-1, 1)
+    samples *= 1 / (1 << (8 * sample_width - 1))
+
+    # Return the samples and sample rate
+    return samples, audiosegment.frame_rate
@@ -0,0 +1,161 @@
+"""
+probe_audio_file.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Checks that an audio file can be decoded, and gets its properties, without decoding the whole file.
+"""
+
+# IMPORTS
+import io
+import os
+import re
+import subprocess
+import wave
+from typing import Tuple
+
+from pydub import AudioSegment
+from pydub.exceptions import CouldntDecodeError
+
+from src.io.audio_to_audiosegment import SUPPORTED_AUDIO_EXTENSIONS
+
+# CONSTANTS
+PROBE_PREFIX_DURATION = 1  # Number of seconds of audio to decode when checking that the audio file can be decoded
+DURATION_PATTERN = re.compile(rb"Duration: (\d+):(\d{2}):(\d{2}(?:\.\d+)?)")  # Duration line printed by FFmpeg
+
+
+# HELPER FUNCTIONS
+def _probe_wav_file(audio_file: str) -> Tuple[float, int, int]:
+    """
+    Gets the properties of a PCM WAV file from its header.
+
+    Args:
+        audio_file:
+            Path to the WAV file.
+
+    Returns:
+        Tuple[float, int, int]:
+            Triplet containing the duration (in seconds), the sample rate and the number of channels in that order.
+
+    Raises:
+        wave.Error:
+            If the file is not a PCM WAV file that the `wave` module can read.
+
+        EOFError:
+            If the file is truncated.
+    """
+
+    with wave.open(audio_file, "rb") as f:
+        num_frames, sample_rate, num_channels = f.getnframes(), f.getframerate(), f.getnchannels()
+
+        # Check that the first few frames can actually be read
+        if num_frames > 0 and len(f.readframes(min(num_frames, sample_rate * PROBE_PREFIX_DURATION))) == 0:
+            raise wave.Error("The WAV file has no audio data.")
+
+    return num_frames / sample_rate, sample_rate, num_channels
+
+
+def _probe_with_ffmpeg(audio_file: str, audio_format: str) -> Tuple[float, int, int]:
+    """
+    Gets the properties of an audio file by decoding only the first few seconds of it with FFmpeg.
+
+    Args:
+        audio_file:
+            Path to the audio file.
+
+        audio_format:
+            Format of the audio file, as understood by FFmpeg.
+
+    Returns:
+        Tuple[float, int, int]:
+            Triplet containing the duration (in seconds), the sample rate and the number of channels in that order.
+
+    Raises:
+        CouldntDecodeError:
+            If FFmpeg could not decode the start of the audio file.
+    """
+
+    # Decode the first few seconds of the audio file into a WAV file
+    process = subprocess.run(
+        [AudioSegment.converter, "-hide_banner", "-f", audio_format, "-i", audio_file, "-t", str(PROBE_PREFIX_DURATION),
+         "-vn", "-f", "wav", "-"],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE
+    )
+
+    if process.returncode != 0 or len(process.stdout) == 0:
+        raise CouldntDecodeError(f"Decoding failed. FFmpeg returned error code: {process.returncode}\n\n"
+                                 f"Output from FFmpeg:\n\n{process.stderr.decode(errors='ignore')}")
+
+    # Get the sample rate and number of channels from the decoded audio
+    try:
+        with wave.open(io.BytesIO(process.stdout), "rb") as f:
+            sample_rate, num_channels = f.getframerate(), f.getnchannels()
+    except (wave.Error, EOFError) as e:
+        raise CouldntDecodeError(f"Decoding failed. FFmpeg did not produce valid audio: {e}")
+
+    # Get the duration from the information that FFmpeg printed about the audio file
+    match = DURATION_PATTERN.search(process.stderr)
+
+    if match is None:  # Duration not in the headers, so the whole file has to be decoded to find it
+        duration = len(AudioSegment.from_file(audio_file, audio_format)) / 1000
+    else:
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    return duration, sample_rate, num_channels
+
+
+# FUNCTIONS
+def probe_audio_file(audio_file: str) -> Tuple[float, int, int]:
+    """
+    Checks that an audio file can be decoded, and gets its properties, without decoding the whole file.
+
+    PCM WAV files are checked by reading their headers. Other files are checked by decoding the first few seconds of
+    audio with FFmpeg, which also reports the duration from the file's headers.
+
+    Args:
+        audio_file:
+            Path to the audio file.
+
+    Returns:
+        Tuple[float, int, int]:
+            Triplet containing the duration (in seconds), the sample rate and the number of channels in that order.
+
+    Raises:
+        AssertionError:
+            If the extension of the audio file is not in the `SUPPORTED_AUDIO_EXTENSIONS` dictionary.
+
+        FileNotFoundError:
+            If the audio file does not exist or is not found.
+
+        CouldntDecodeError:
+            If the audio file could not be decoded.
+    """
+
+    # Check if the audio file exists
+    if not os.path.isfile(audio_file):
+        raise FileNotFoundError(f"An audio file does not exist at the path '{audio_file}'.")
+
+    # Check if the audio file's extension works
+    _, extension = os.path.splitext(audio_file)
+    assert extension in SUPPORTED_AUDIO_EXTENSIONS, f"The extension {extension} is currently unsupported by the " \
+                                                    "program."
+
+    # Read the headers of WAV files directly, falling back to FFmpeg for WAV files that are not plain PCM
+    audio_format = SUPPORTED_AUDIO_EXTENSIONS[extension]
+
+    if audio_format == "wav":
+        try:
+            return _probe_wav_file(audio_file)
+        except (wave.Error, EOFError):
+            pass
+
+    return _probe_with_ffmpeg(audio_file, audio_format)
+
+
+# TESTING CODE
+if __name__ == "__main__":
+    print(probe_audio_file("../../Testing Files/Melancholy.wav"))
@@ -0,0 +1,135 @@
+"""
+probe_mp3_bitrate.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Gets the bitrate of a constant bitrate (CBR) MP3 file by parsing its frame headers.
+"""
+
+# IMPORTS
+from typing import Optional
+
+# CONSTANTS
+MPEG1_LAYER3_BITRATES = [None, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]  # In kbps; by index
+MPEG1_SAMPLE_RATES = [44100, 48000, 32000]  # By index
+TRAILING_TAG_IDS = [b"TAG", b"APETAGEX", b"LYRICS"]  # Starts of the tags that may come after the last frame
+
+
+# HELPER FUNCTIONS
+def _skip_id3v2_tag(data: bytes) -> int:
+    """
+    Gets the position of the first byte after the ID3v2 tag at the start of an MP3 file.
+
+    Args:
+        data:
+            Contents of the MP3 file.
+
+    Returns:
+        int:
+            Position of the first byte after the tag, which is 0 if there is no tag.
+    """
+
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+
+    # The size is stored as a 28-bit "synchsafe" integer, using 7 bits of each byte, and excludes the 10 byte header
+    size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+    has_footer = data[5] & 0x10
+
+    return 10 + size + (10 if has_footer else 0)
+
+
+def _parse_frame_header(header: bytes) -> Optional[tuple]:
+    """
+    Parses the header of an MPEG-1 Layer III frame.
+
+    Args:
+        header:
+            The 4 bytes of the frame header.
+
+    Returns:
+        Optional[tuple]:
+            Triplet containing the bitrate (in kbps), the sample rate and the frame's length (in bytes) in that order, or
+            `None` if the bytes are not the header of an MPEG-1 Layer III frame with a fixed bitrate.
+    """
+
+    # Check the frame sync, the MPEG version (1) and the layer (III)
+    if header[0] != 0xFF or header[1] & 0xFE != 0xFA:
+        return None
+
+    bitrate_index = header[2] >> 4
+    sample_rate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+
+    if bitrate_index >= len(MPEG1_LAYER3_BITRATES) or MPEG1_LAYER3_BITRATES[bitrate_index] is None or \
+            sample_rate_index >= len(MPEG1_SAMPLE_RATES):
+        return None  # Free format or reserved values
+
+    bitrate = MPEG1_LAYER3_BITRATES[bitrate_index]
+    sample_rate = MPEG1_SAMPLE_RATES[sample_rate_index]
+
+    return bitrate, sample_rate, 144000 * bitrate // sample_rate + padding
+
+
+# FUNCTIONS
+def probe_mp3_bitrate(file_path: str) -> Optional[int]:
+    """
+    Gets the bitrate of an MP3 file if every frame has the same bitrate, by parsing the frame headers without decoding
+    any audio.
+
+    Only MPEG-1 Layer III files are checked, as those are the MP3 files that the app creates itself. Files with a Xing
+    or VBRI header, which encoders add to variable bitrate files, and files with data that is not part of a frame or a
+    tag, are treated as not being CBR MP3 files.
+
+    Args:
+        file_path:
+            Path to the MP3 file.
+
+    Returns:
+        Optional[int]:
+            The bitrate of the file, in kbps, or `None` if it is not a CBR MPEG-1 Layer III file.
+    """
+
+    with open(file_path, "rb") as f:
+        data = f.read()
+
+    position = _skip_id3v2_tag(data)
+    file_bitrate, file_sample_rate = None, None
+    num_frames = 0
+
+    while position + 4 <= len(data):
+        frame = _parse_frame_header(data[position:position + 4])
+
+        if frame is None:
+            # Allow tags after the last frame, but nothing else
+            if num_frames > 0 and any(data.startswith(tag_id, position) for tag_id in TRAILING_TAG_IDS):
+                break
+            return None
+
+        bitrate, sample_rate, frame_length = frame
+
+        if num_frames == 0:
+            # The first frame holds the Xing ("Xing" for VBR files, "Info" for CBR files) or VBRI header, if any
+            is_mono = (data[position + 3] >> 6) == 0x03
+            has_crc = not (data[position + 1] & 0x01)
+            side_info_end = position + 4 + (2 if has_crc else 0) + (17 if is_mono else 32)
+
+            if data.startswith(b"Xing", side_info_end) or data.startswith(b"VBRI", position + 36):
+                return None
+
+            file_bitrate, file_sample_rate = bitrate, sample_rate
+        elif bitrate != file_bitrate or sample_rate != file_sample_rate:
+            return None
+
+        num_frames += 1
+        position += frame_length
+
+    return file_bitrate if num_frames > 0 else None
+
+
+# TESTING CODE
+if __name__ == "__main__":
+    print(probe_mp3_bitrate("../../Example Files/A440.mp3"))
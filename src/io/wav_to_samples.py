@@ -15,6 +15,8 @@ from typing import Optional, Tuple
 import librosa
 import numpy as np
 
+from src.misc import SAMPLE_DTYPE
+
 
 # FUNCTIONS
 def wav_to_samples(file_path: str, offset: float = 0., duration: Optional[float] = None) -> Tuple[np.ndarray, int]:
@@ -33,7 +35,7 @@ def wav_to_samples(file_path: str, offset: float = 0., duration: Optional[float]
 
     Returns:
         Tuple[np.ndarray, int]:
-            Double containing the audio samples and the sample rate in that order.
+            Double containing the audio samples (of type `SAMPLE_DTYPE`) and the sample rate in that order.
     """
 
-    return librosa.load(file_path, sr=None, offset=offset, duration=duration)
+    return librosa.load(file_path, sr=None, offset=offset, duration=duration, dtype=SAMPLE_DTYPE)
@@ -0,0 +1,3 @@
+from .metrics_registry import MEMORY_BUCKETS, PROMETHEUS_CONTENT_TYPE, TIME_BUCKETS, MetricsRegistry
+from .resource_usage import get_child_cpu_time, get_peak_rss
+from .sqlite_metrics_registry import SQLiteMetricsRegistry
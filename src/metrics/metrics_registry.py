@@ -0,0 +1,306 @@
+"""
+metrics_registry.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Collects counters, gauges and histograms, and renders them in the Prometheus text format.
+"""
+
+# IMPORTS
+import copy
+import math
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+# CONSTANTS
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+TIME_BUCKETS = [0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600]  # In seconds
+MEMORY_BUCKETS = [2 ** 20 * 4 ** i for i in range(8)]  # From 1 MiB to 16 GiB, in bytes
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+
+# HELPER FUNCTIONS
+def _format_value(value: float) -> str:
+    """
+    Formats a number the way the Prometheus text format expects it.
+    """
+
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    """
+    Formats labels as `{name="value",...}`, escaping the values.
+    """
+
+    if not labels:
+        return ""
+
+    escaped = {name: str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+               for name, value in labels.items()}
+    return "{" + ",".join(f"{name}=\"{value}\"" for name, value in escaped.items()) + "}"
+
+
+# CLASSES
+class MetricsRegistry:
+    """
+    Registry of metrics that can be rendered in the Prometheus text exposition format.
+
+    Three types of metrics are supported:
+    - counters, which only go up (e.g. the number of finished jobs);
+    - gauges, whose value is either read from a function whenever the metrics are rendered (e.g. the length of a queue)
+      or set whenever it changes (e.g. the size of a folder when it was last measured); and
+    - histograms, which count observed values (e.g. durations) into cumulative buckets.
+
+    Counters, histograms and gauges that are set can have labels, and each set of label values is a separate series.
+    The registry can be used by several threads at once. The series are kept in memory; subclasses can keep them
+    elsewhere by overriding `_update_series` and `_read_series`.
+    """
+
+    def __init__(self):
+        """
+        Initialization method for a `MetricsRegistry` object.
+        """
+
+        self._lock = threading.Lock()
+        self._metrics = {}  # Maps each metric's name to its definition and the values of each of its series
+
+    # Public methods
+    def add_counter(self, name: str, description: str):
+        """
+        Adds a counter.
+
+        Args:
+            name:
+                Name of the counter. By convention this ends with `_total`.
+
+            description:
+                Description of the counter.
+        """
+
+        self._add_metric(name, COUNTER, description)
+
+    def add_gauge(self, name: str, description: str, function: Optional[Callable[[], float]] = None):
+        """
+        Adds a gauge.
+
+        Args:
+            name:
+                Name of the gauge.
+
+            description:
+                Description of the gauge.
+
+            function:
+                Function with no arguments that returns the current value of the gauge. If `None`, the gauge's value is
+                set using `set`.
+        """
+
+        self._add_metric(name, GAUGE, description, function=function)
+
+    def add_histogram(self, name: str, description: str, buckets: List[float]):
+        """
+        Adds a histogram.
+
+        Args:
+            name:
+                Name of the histogram.
+
+            description:
+                Description of the histogram.
+
+            buckets:
+                Increasing list of the upper bounds of the buckets. A bucket for all values (`+Inf`) is always added.
+        """
+
+        assert list(buckets) == sorted(buckets), "The buckets of a histogram must be in increasing order."
+        self._add_metric(name, HISTOGRAM, description, buckets=list(buckets))
+
+    def increment(self, name: str, amount: float = 1, **labels):
+        """
+        Increases a counter.
+
+        Args:
+            name:
+                Name of the counter.
+
+            amount:
+                Amount to increase the counter by. Must not be negative.
+
+            **labels:
+                Labels of the series to increase.
+        """
+
+        assert amount >= 0, f"A counter cannot be decreased, but the amount was {amount}."
+
+        def update(series):
+            series[0] += amount
+
+        self._update_series(name, COUNTER, labels, update)
+
+    def set(self, name: str, value: float, **labels):
+        """
+        Sets the value of a gauge that has no function.
+
+        Args:
+            name:
+                Name of the gauge.
+
+            value:
+                New value of the gauge.
+
+            **labels:
+                Labels of the series to set.
+        """
+
+        assert self._metrics[name].get("function") is None, f"The gauge '{name}' is read from a function."
+
+        def update(series):
+            series[0] = value
+
+        self._update_series(name, GAUGE, labels, update)
+
+    def observe(self, name: str, value: float, **labels):
+        """
+        Adds an observed value to a histogram.
+
+        Args:
+            name:
+                Name of the histogram.
+
+            value:
+                Observed value.
+
+            **labels:
+                Labels of the series to add the value to.
+        """
+
+        metric = self._metrics[name]
+
+        # Count the value in the first bucket that it fits in; the counts are made cumulative when rendering
+        bucket_index = len(metric["buckets"])
+        for i, upper_bound in enumerate(metric["buckets"]):
+            if value <= upper_bound:
+                bucket_index = i
+                break
+
+        def update(series):
+            series["counts"][bucket_index] += 1
+            series["sum"] += value
+
+        self._update_series(name, HISTOGRAM, labels, update)
+
+    def get_value(self, name: str, **labels) -> Optional[float]:
+        """
+        Gets the value of a counter or gauge.
+
+        Args:
+            name:
+                Name of the counter or gauge.
+
+            **labels:
+                Labels of the series.
+
+        Returns:
+            Optional[float]:
+                The value, or `None` if the series has not been increased or set yet.
+        """
+
+        metric = self._metrics[name]
+        if metric.get("function") is not None:
+            return metric["function"]()
+
+        series = self._read_series(name).get(tuple(sorted(labels.items())))
+        return None if series is None else series[0]
+
+    def render(self) -> str:
+        """
+        Renders all the metrics in the Prometheus text exposition format.
+
+        Returns:
+            str:
+                The metrics, which should be served with the content type `PROMETHEUS_CONTENT_TYPE`.
+        """
+
+        lines = []
+
+        for name, metric in list(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric['description']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+
+            if metric.get("function") is not None:
+                lines.append(f"{name} {_format_value(metric['function']())}")
+
+            elif metric["type"] in (COUNTER, GAUGE):
+                for labels, series in self._read_series(name).items():
+                    lines.append(f"{name}{_format_labels(dict(labels))} {_format_value(series[0])}")
+
+            else:
+                for labels, series in self._read_series(name).items():
+                    labels = dict(labels)
+                    cumulative_count = 0
+
+                    for upper_bound, count in zip(metric["buckets"] + [math.inf], series["counts"]):
+                        cumulative_count += count
+                        bucket_labels = _format_labels({**labels, "le": _format_value(upper_bound)})
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative_count}")
+
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(series['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {cumulative_count}")
+
+        return "\n".join(lines) + "\n"
+
+    # Private methods
+    def _add_metric(self, name: str, metric_type: str, description: str, **definition):
+        """
+        Adds a metric of any type.
+        """
+
+        with self._lock:
+            assert name not in self._metrics, f"There is already a metric named '{name}'."
+            self._metrics[name] = {"type": metric_type, "description": description, "series": {}, **definition}
+
+    def _update_series(self, name: str, metric_type: str, labels: dict, update: Callable[[Any], None]):
+        """
+        Updates the series of a metric with the given labels in place using `update`, creating the series first if
+        needed.
+        """
+
+        metric = self._metrics[name]
+        assert metric["type"] == metric_type, f"The metric '{name}' is a {metric['type']}, not a {metric_type}."
+
+        with self._lock:
+            key = tuple(sorted(labels.items()))
+            if key not in metric["series"]:
+                metric["series"][key] = self._new_series(metric)
+
+            update(metric["series"][key])
+
+    def _read_series(self, name: str) -> Dict[tuple, Any]:
+        """
+        Gets a copy of every series of a metric, by the sorted tuple of its labels' names and values.
+        """
+
+        with self._lock:
+            return copy.deepcopy(self._metrics[name]["series"])
+
+    @staticmethod
+    def _new_series(metric: dict) -> Any:
+        """
+        Creates an empty series of a metric; a list with the value for counters and gauges, and a dictionary with the
+        bucket `counts` and the `sum` for histograms.
+        """
+
+        if metric["type"] == HISTOGRAM:
+            return {"counts": [0] * (len(metric["buckets"]) + 1), "sum": 0.}
+        return [0]
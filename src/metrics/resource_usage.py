@@ -0,0 +1,51 @@
+"""
+resource_usage.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Reads how much memory and CPU time the current process has used.
+"""
+
+# IMPORTS
+import sys
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+# FUNCTIONS
+def get_peak_rss() -> int:
+    """
+    Gets the peak resident set size (RSS) of the current process so far.
+
+    Returns:
+        int:
+            Peak resident set size, in bytes, or 0 if it cannot be measured on this platform.
+    """
+
+    if resource is None:
+        return 0
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024  # Linux reports kilobytes, macOS reports bytes
+
+
+def get_child_cpu_time() -> float:
+    """
+    Gets the CPU time used by the finished subprocesses of the current process, e.g. FFmpeg.
+
+    Returns:
+        float:
+            User and system CPU time of the subprocesses, in seconds, or 0 if it cannot be measured on this platform.
+    """
+
+    if resource is None:
+        return 0.
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
@@ -0,0 +1,116 @@
+"""
+sqlite_metrics_registry.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Metrics registry that keeps its series in an SQLite database, so that several processes can share them.
+"""
+
+# IMPORTS
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict
+
+from src.metrics.metrics_registry import MetricsRegistry
+
+# CONSTANTS
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS metric_series (
+    name TEXT NOT NULL,
+    labels TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (name, labels)
+);
+"""
+
+
+# CLASSES
+class SQLiteMetricsRegistry(MetricsRegistry):
+    """
+    Metrics registry that keeps the series of its counters, histograms and set gauges in an SQLite database in
+    write-ahead logging (WAL) mode.
+
+    Every process that uses a registry with the same database and the same metrics adds to the same series, so metrics
+    that are recorded in one process (like the measurements of a job, in the worker process that ran it) are rendered
+    by all the others (like the web processes). The values of gauges that are read from functions are not shared, as
+    they are read in the process that renders the metrics.
+
+    Each series is stored as JSON and updated in its own transaction.
+    """
+
+    def __init__(self, database_path: str):
+        """
+        Initialization method for a `SQLiteMetricsRegistry` object.
+
+        Args:
+            database_path:
+                Path to the SQLite database file. It will be created if it does not exist.
+        """
+
+        super().__init__()
+        self.database_path = database_path
+
+        self._local = threading.local()
+
+        # Create the table; the script runs in its own transaction
+        self._connection().executescript(SCHEMA)
+
+    # Private methods
+    def _update_series(self, name: str, metric_type: str, labels: dict, update: Callable[[Any], None]):
+        metric = self._metrics[name]
+        assert metric["type"] == metric_type, f"The metric '{name}' is a {metric['type']}, not a {metric_type}."
+
+        key = json.dumps(sorted(labels.items()))
+
+        with self._transaction() as connection:
+            row = connection.execute("SELECT value FROM metric_series WHERE name = ? AND labels = ?",
+                                     (name, key)).fetchone()
+            series = self._new_series(metric) if row is None else json.loads(row[0])
+
+            update(series)
+            connection.execute("INSERT OR REPLACE INTO metric_series (name, labels, value) VALUES (?, ?, ?)",
+                               (name, key, json.dumps(series)))
+
+    def _read_series(self, name: str) -> Dict[tuple, Any]:
+        rows = self._connection().execute("SELECT labels, value FROM metric_series WHERE name = ?", (name,)).fetchall()
+        return {tuple(tuple(label) for label in json.loads(labels)): json.loads(value) for labels, value in rows}
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Gets the current thread's connection to the database, creating it if needed.
+        """
+
+        # Connections cannot be shared with forked processes, so make a new one if this is a different process
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.database_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return self._local.connection
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Runs the statements in the `with` block in one transaction, which takes the database's write lock at the start
+        so that no other process updates the same series in between.
+        """
+
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
@@ -1,2 +1,4 @@
+from .dtypes import QUANTISED_SPECTROGRAM_DTYPES, SAMPLE_DTYPE, SPECTROGRAM_DTYPE, TRANSFORM_DTYPE
+from .export_lazily import export_lazily
 from .note_number_to_freq import NOTE_NUMBER_RANGE, note_number_to_freq
 from .note_number_to_note import MUSIC_KEYS
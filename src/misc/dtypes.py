@@ -0,0 +1,19 @@
+"""
+dtypes.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: NumPy types used for audio and spectrogram data throughout the analysis pipeline.
+"""
+
+# IMPORTS
+import numpy as np
+
+# CONSTANTS
+SAMPLE_DTYPE = np.float32  # Audio samples
+TRANSFORM_DTYPE = np.complex64  # Complex coefficients of spectral transforms like the VQT
+SPECTROGRAM_DTYPE = np.float32  # Magnitudes and decibel values of spectrograms
+QUANTISED_SPECTROGRAM_DTYPES = (np.uint8, np.uint16)  # Types that spectrograms may be quantised to for storage
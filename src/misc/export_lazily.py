@@ -0,0 +1,69 @@
+"""
+export_lazily.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Lets a package export names from its modules without importing the modules until the names are used.
+"""
+
+# IMPORTS
+import importlib
+import sys
+import types
+from typing import Dict
+
+
+# CLASSES
+class _LazyPackage(types.ModuleType):
+    """
+    Package whose exported names are imported from their modules when they are first used.
+    """
+
+    def __setattr__(self, name: str, value):
+        # Importing a submodule sets it as an attribute of its package, which would hide the exported name if they are
+        # the same (like the function `track_beats` in the module `track_beats`), so the package keeps the name instead
+        if isinstance(value, types.ModuleType) and name in self.__dict__.get("_lazy_exports", {}):
+            return
+
+        super().__setattr__(name, value)
+
+
+# FUNCTIONS
+def export_lazily(package_name: str, exports: Dict[str, str]):
+    """
+    Makes a package export names from its modules, importing each module when one of its names is first used (see
+    PEP 562). This keeps the package quick to import when its modules import slow libraries like librosa.
+
+    `from package import name` and `package.name` give the same object that an eager `from .module import name` in
+    the package's `__init__.py` would, even if the module has the same name as the exported name.
+
+    Args:
+        package_name:
+            Name of the package, i.e. `__name__` in its `__init__.py`.
+
+        exports:
+            Dictionary mapping each exported name to the relative name of the module that defines it, like
+            `{"track_beats": ".track_beats"}`.
+    """
+
+    package = sys.modules[package_name]
+    namespace = vars(package)
+
+    def __getattr__(name: str):
+        if name not in exports:
+            raise AttributeError(f"module {package_name!r} has no attribute {name!r}")
+
+        # Import the name, then keep it in the package so that this is only done once
+        value = getattr(importlib.import_module(exports[name], package_name), name)
+        namespace[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(namespace) | set(exports))
+
+    namespace.update({"_lazy_exports": exports, "__all__": list(exports), "__getattr__": __getattr__,
+                      "__dir__": __dir__})
+    package.__class__ = _LazyPackage
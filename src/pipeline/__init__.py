@@ -0,0 +1,5 @@
+from .job_queue import JOB_FAILED, JOB_FINISHED, JOB_QUEUED, JOB_RUNNING, JobQueue
+from .job_scheduler import JobScheduler
+from .run_job_worker import run_job_worker
+from .run_stage_graph import STAGE_DONE, STAGE_PENDING, STAGE_RUNNING, run_stage_graph
+from .sqlite_job_queue import SQLiteJobQueue
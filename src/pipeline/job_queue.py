@@ -0,0 +1,169 @@
+"""
+job_queue.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Interface of the backends that queue jobs and keep track of their state.
+"""
+
+# IMPORTS
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+# CONSTANTS
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_FINISHED = "finished"
+JOB_FAILED = "failed"
+
+
+# CLASSES
+class JobQueue(ABC):
+    """
+    Interface of the backends that queue jobs, run them and keep track of their state.
+
+    Jobs wait in a first-in-first-out queue until a worker is free. There is at most one job for each job ID, so
+    submitting a job whose ID is already queued or running does nothing. Each job has an estimated cost, and a new job
+    is rejected if it would take the total cost of the queued and running jobs above the cost budget.
+
+    Each job gets a dictionary (its "job data") that the job updates as it runs, and that can be read through the
+    backend to report the job's progress. Once a job finishes or fails, `on_job_done` is called with the job's ID, its
+    state (`JOB_FINISHED` or `JOB_FAILED`) and its job data.
+    """
+
+    on_job_done: Optional[Callable[[str, str, dict], None]] = None
+
+    # Properties
+    @property
+    @abstractmethod
+    def queue_length(self) -> int:
+        """
+        Number of jobs waiting for a free worker.
+        """
+
+    @property
+    @abstractmethod
+    def num_running(self) -> int:
+        """
+        Number of jobs that are running.
+        """
+
+    @property
+    @abstractmethod
+    def total_cost(self) -> float:
+        """
+        Total estimated cost of the queued and running jobs.
+        """
+
+    # Public methods
+    @abstractmethod
+    def submit(self, job_id: str, function: Callable, *args, cost: float = 0., job_data: Optional[dict] = None) -> bool:
+        """
+        Submits a job, which runs `function(*args, job_data)` on a worker.
+
+        Args:
+            job_id:
+                ID of the job. Only one job with each ID can be queued or running at any time.
+
+            function:
+                Function to run. It must be defined at the top level of a module.
+
+            *args:
+                Arguments to the function.
+
+            cost:
+                Estimated cost of the job.
+
+            job_data:
+                Initial contents of the job's data.
+
+        Returns:
+            bool:
+                `True` if the job is queued or running (including if it was already queued or running), and `False` if
+                the job was rejected because the backend is at its cost budget.
+        """
+
+    @abstractmethod
+    def get_job_state(self, job_id: str) -> Optional[str]:
+        """
+        Gets the state of a job.
+
+        Args:
+            job_id:
+                ID of the job.
+
+        Returns:
+            Optional[str]:
+                One of `JOB_QUEUED`, `JOB_RUNNING`, `JOB_FINISHED` or `JOB_FAILED`, or `None` if there is no such job.
+        """
+
+    @abstractmethod
+    def get_job_data(self, job_id: str) -> Optional[dict]:
+        """
+        Gets the data of a job.
+
+        Args:
+            job_id:
+                ID of the job.
+
+        Returns:
+            Optional[dict]:
+                The job's data, or `None` if there is no such job.
+        """
+
+    @abstractmethod
+    def get_job_error(self, job_id: str) -> Optional[str]:
+        """
+        Gets the error that made a job fail.
+
+        Args:
+            job_id:
+                ID of the job.
+
+        Returns:
+            Optional[str]:
+                Description of the error, or `None` if there is no such job or the job did not fail.
+        """
+
+    @abstractmethod
+    def get_queue_position(self, job_id: str) -> Optional[int]:
+        """
+        Gets the position of a job in the queue.
+
+        Args:
+            job_id:
+                ID of the job.
+
+        Returns:
+            Optional[int]:
+                Position of the job in the queue, where 1 means that it is the next job to run. Returns `None` if the
+                job is not queued.
+        """
+
+    @abstractmethod
+    def forget(self, job_id: str):
+        """
+        Removes the record of a job that is no longer queued or running.
+
+        Args:
+            job_id:
+                ID of the job.
+        """
+
+    @abstractmethod
+    def expire(self, max_age: float) -> int:
+        """
+        Removes the records of the jobs that finished or failed more than `max_age` seconds ago, so that the records of
+        jobs that are never looked up again do not build up.
+
+        Args:
+            max_age:
+                Time to keep the records of finished and failed jobs for, in seconds.
+
+        Returns:
+            int:
+                Number of records removed.
+        """
@@ -0,0 +1,325 @@
+"""
+job_scheduler.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Schedules jobs onto a fixed-size process pool, with a FIFO queue, de-duplication and admission control.
+"""
+
+# IMPORTS
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from typing import Callable, Optional
+
+from src.pipeline.job_queue import JOB_FAILED, JOB_FINISHED, JOB_QUEUED, JOB_RUNNING, JobQueue
+
+
+# CLASSES
+class JobScheduler(JobQueue):
+    """
+    Job backend that runs jobs on a fixed-size process pool owned by the current process.
+
+    Jobs wait in a first-in-first-out queue until a process is free. There is at most one job for each job ID, so
+    submitting a job whose ID is already queued or running does nothing. Each job has an estimated cost, and a new job
+    is rejected if it would take the total cost of the queued and running jobs above the cost budget.
+
+    Each job gets a shared dictionary (its "job data") that the job can update from its process, and that can be read
+    from the process that owns the scheduler to report the job's progress. The state of the jobs is only known to that
+    process; use `SQLiteJobQueue` to share it between several processes.
+    """
+
+    def __init__(self, max_workers: int, max_total_cost: float = float("inf"), initializer: Optional[Callable] = None,
+                 initargs: tuple = (), on_job_done: Optional[Callable[[str, str, dict], None]] = None):
+        """
+        Initialization method for a `JobScheduler` object.
+
+        Args:
+            max_workers:
+                Number of processes in the pool, i.e. the maximum number of jobs that run at the same time.
+
+            max_total_cost:
+                Maximum total estimated cost of all the queued and running jobs.
+
+            initializer:
+                Function that is called once in each process of the pool when the process starts, e.g. to prepare
+                anything that all jobs in that process will share. It must be picklable.
+
+            initargs:
+                Arguments to the initializer.
+
+            on_job_done:
+                Function that is called in the process that owns the scheduler whenever a job finishes or fails, with
+                the job's ID, its state (`JOB_FINISHED` or `JOB_FAILED`) and its shared dictionary.
+        """
+
+        self.max_workers = max_workers
+        self.max_total_cost = max_total_cost
+        self.initializer = initializer
+        self.initargs = initargs
+        self.on_job_done = on_job_done
+
+        self._lock = threading.RLock()  # Re-entrant as a finished job's callback may run while the lock is held
+        self._executor = None  # Created on first use
+        self._manager = None  # Created on first use
+
+        self._jobs = {}  # Maps each job ID to its record
+        self._queue = deque()  # IDs of the queued jobs, in the order that they were submitted
+        self._num_running = 0
+
+    # Properties
+    @property
+    def queue_length(self) -> int:
+        """
+        Number of jobs that are waiting for a free process.
+        """
+
+        return len(self._queue)
+
+    @property
+    def num_running(self) -> int:
+        """
+        Number of jobs that are running.
+        """
+
+        return self._num_running
+
+    @property
+    def total_cost(self) -> float:
+        """
+        Total estimated cost of the queued and running jobs.
+        """
+
+        return sum(job["cost"] for job in self._jobs.values() if job["state"] in (JOB_QUEUED, JOB_RUNNING))
+
+    # Public methods
+    def submit(self, job_id: str, function: Callable, *args, cost: float = 0., job_data: Optional[dict] = None) -> bool:
+        """
+        Submits a job to the scheduler.
+
+        The job runs `function(*args, job_data)` in one of the pool's processes, where `job_data` is the job's shared
+        dictionary. Any dictionaries or lists in the initial job data are shared as well, so that changes made to them
+        by the job can be seen by the process that owns the scheduler.
+
+        Args:
+            job_id:
+                ID of the job. Only one job with each ID can be queued or running at any time.
+
+            function:
+                Function to run. It must be picklable, i.e. defined at the top level of a module.
+
+            *args:
+                Arguments to the function. They must be picklable.
+
+            cost:
+                Estimated cost of the job.
+
+            job_data:
+                Initial contents of the job's shared dictionary.
+
+        Returns:
+            bool:
+                `True` if the job is queued or running (including if it was already queued or running), and `False` if
+                the job was rejected because the scheduler is at its cost budget.
+        """
+
+        with self._lock:
+            # Only allow one job with the same ID at a time
+            job = self._jobs.get(job_id)
+            if job is not None and job["state"] in (JOB_QUEUED, JOB_RUNNING):
+                return True
+
+            # Reject the job if it would go over the budget, unless there is nothing else to do
+            active_cost = self.total_cost
+            if active_cost > 0 and active_cost + cost > self.max_total_cost:
+                return False
+
+            # Create the job's record
+            if self._manager is None:
+                self._manager = Manager()
+
+            self._jobs[job_id] = {
+                "state": JOB_QUEUED,
+                "cost": cost,
+                "function": function,
+                "args": args,
+                "data": self._to_shared(job_data or {}),
+                "error": None,
+                "done_time": None
+            }
+            self._queue.append(job_id)
+
+            # Start the job if there is a free process
+            self._dispatch()
+            return True
+
+    def get_job_state(self, job_id: str) -> Optional[str]:
+        """
+        Gets the state of a job.
+
+        Args:
+            job_id:
+                ID of the job.
+
+        Returns:
+            Optional[str]:
+                One of `JOB_QUEUED`, `JOB_RUNNING`, `JOB_FINISHED` or `JOB_FAILED`, or `None` if there is no such job.
+        """
+
+        job = self._jobs.get(job_id)
+        return None if job is None else job["state"]
+
+    def get_job_data(self, job_id: str) -> Optional[dict]:
+        """
+        Gets the shared dictionary of a job.
+
+        Args:
+            job_id:
+                ID of the job.
+
+        Returns:
+            Optional[dict]:
+                The job's shared dictionary, or `None` if there is no such job.
+        """
+
+        job = self._jobs.get(job_id)
+        return None if job is None else job["data"]
+
+    def get_job_error(self, job_id: str) -> Optional[str]:
+        """
+        Gets the error that made a job fail.
+
+        Args:
+            job_id:
+                ID of the job.
+
+        Returns:
+            Optional[str]:
+                Description of the error, or `None` if there is no such job or the job did not fail.
+        """
+
+        job = self._jobs.get(job_id)
+        return None if job is None else job["error"]
+
+    def get_queue_position(self, job_id: str) -> Optional[int]:
+        """
+        Gets the position of a job in the queue.
+
+        Args:
+            job_id:
+                ID of the job.
+
+        Returns:
+            Optional[int]:
+                Position of the job in the queue, where 1 means that it is the next job to run. Returns `None` if the
+                job is not queued.
+        """
+
+        with self._lock:
+            try:
+                return self._queue.index(job_id) + 1
+            except ValueError:
+                return None
+
+    def forget(self, job_id: str):
+        """
+        Removes the record of a job that is no longer queued or running.
+
+        Args:
+            job_id:
+                ID of the job.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job["state"] in (JOB_FINISHED, JOB_FAILED):
+                del self._jobs[job_id]
+
+    def expire(self, max_age: float) -> int:
+        """
+        Removes the records of the jobs that finished or failed more than `max_age` seconds ago, so that the records of
+        jobs that are never looked up again do not build up.
+
+        Args:
+            max_age:
+                Time to keep the records of finished and failed jobs for, in seconds.
+
+        Returns:
+            int:
+                Number of records removed.
+        """
+
+        with self._lock:
+            now = time.monotonic()
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job["state"] in (JOB_FINISHED, JOB_FAILED) and now - job["done_time"] > max_age]
+
+            for job_id in expired:
+                del self._jobs[job_id]
+
+        return len(expired)
+
+    # Private methods
+    def _to_shared(self, value):
+        """
+        Converts a dictionary or list (and those inside it) into ones shared through the manager.
+        """
+
+        if isinstance(value, dict):
+            return self._manager.dict({key: self._to_shared(item) for key, item in value.items()})
+        if isinstance(value, list):
+            return self._manager.list([self._to_shared(item) for item in value])
+        return value
+
+    def _dispatch(self):
+        """
+        Starts queued jobs while there are free processes. Must be called with the lock held.
+        """
+
+        while self._queue and self._num_running < self.max_workers:
+            # Get the next job
+            job_id = self._queue.popleft()
+            job = self._jobs[job_id]
+
+            # Submit it to the process pool
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=self.initializer,
+                                                     initargs=self.initargs)
+
+            job["state"] = JOB_RUNNING
+            self._num_running += 1
+
+            future = self._executor.submit(job["function"], *job["args"], job["data"])
+            future.add_done_callback(lambda f, job_id_=job_id: self._on_job_done(job_id_, f))
+
+            # The function and arguments are no longer needed
+            job["function"] = job["args"] = None
+
+    def _on_job_done(self, job_id: str, future):
+        """
+        Records the outcome of a job and starts the next queued job.
+        """
+
+        with self._lock:
+            job = self._jobs.get(job_id)
+
+            if job is not None:
+                if future.exception() is None:
+                    job["state"] = JOB_FINISHED
+                else:
+                    job["state"] = JOB_FAILED
+                    job["error"] = repr(future.exception())
+
+                job["done_time"] = time.monotonic()
+
+            self._num_running -= 1
+            self._dispatch()
+
+        # Report the outcome outside the lock, so that a slow callback does not hold up the scheduler
+        if job is not None and self.on_job_done is not None:
+            self.on_job_done(job_id, job["state"], job["data"])
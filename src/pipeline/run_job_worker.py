@@ -0,0 +1,127 @@
+"""
+run_job_worker.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Runs the jobs of an `SQLiteJobQueue` one at a time in the current process.
+"""
+
+# IMPORTS
+import copy
+import threading
+from typing import Optional
+
+from src.pipeline.sqlite_job_queue import SQLiteJobQueue
+
+# CONSTANTS
+POLL_INTERVAL = 0.5  # Time between checks for new jobs when the queue is empty, in seconds
+SAVE_INTERVAL = 0.5  # Time between saves of a running job's data, in seconds
+STALE_JOB_TIMEOUT = 60  # Time after the last heartbeat of a running job that its worker is assumed to have stopped
+
+
+# HELPER FUNCTIONS
+def _snapshot(job_data: dict) -> dict:
+    """
+    Copies a job's data while the job may still be changing it.
+
+    Args:
+        job_data:
+            The job's data.
+
+    Returns:
+        dict:
+            A copy of the job's data.
+    """
+
+    # The job's threads may add items while the data is being copied, so try again until a copy succeeds
+    while True:
+        try:
+            return copy.deepcopy(job_data)
+        except RuntimeError:  # Changed size during iteration
+            pass
+
+
+# FUNCTIONS
+def run_job_worker(job_queue: SQLiteJobQueue, stop_event: Optional[threading.Event] = None,
+                   poll_interval: float = POLL_INTERVAL, save_interval: float = SAVE_INTERVAL,
+                   stale_job_timeout: float = STALE_JOB_TIMEOUT):
+    """
+    Runs the jobs of a job queue one at a time, until the stop event is set.
+
+    Each job runs `function(*args, job_data)` in a separate thread, while this thread saves a copy of the job's data
+    to the queue every `save_interval` seconds so that other processes can report the job's progress. Jobs of workers
+    that stopped without finishing them are marked as failed while waiting for new jobs.
+
+    Args:
+        job_queue:
+            Job queue to take the jobs from.
+
+        stop_event:
+            Event that stops the worker once it is set. The job that is running when it is set is finished first. If
+            not provided, the worker runs forever.
+
+        poll_interval:
+            Time between checks for new jobs when the queue is empty, in seconds.
+
+        save_interval:
+            Time between saves of a running job's data, in seconds. Must be less than `stale_job_timeout`.
+
+        stale_job_timeout:
+            Time after the last heartbeat of a running job that its worker is assumed to have stopped, in seconds.
+    """
+
+    stop_event = stop_event or threading.Event()
+
+    while not stop_event.is_set():
+        # Get the next job, marking the jobs of stopped workers as failed if there is none
+        job = job_queue.claim()
+
+        if job is None:
+            job_queue.fail_stale_jobs(stale_job_timeout)
+            stop_event.wait(poll_interval)
+            continue
+
+        job_id, function, args, job_data = job
+        error = []
+
+        def run_job():
+            try:
+                function(*args, job_data)
+            except BaseException as e:
+                error.append(repr(e))
+
+        # Run the job, saving its data every so often
+        job_thread = threading.Thread(target=run_job, daemon=True)
+        job_thread.start()
+
+        while True:
+            job_thread.join(save_interval)
+            if not job_thread.is_alive():
+                break
+
+            job_queue.save_job_data(job_id, _snapshot(job_data))
+
+        job_queue.finish(job_id, job_data, error[0] if error else None)
+
+
+# TESTING CODE
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+
+    def _test_job(duration, job_data):
+        for i in range(duration):
+            job_data["progress"] = [i + 1, duration]
+            time.sleep(1)
+
+    testQueue = SQLiteJobQueue(os.path.join(tempfile.mkdtemp(), "jobs.db"),
+                               on_job_done=lambda *args: print("Done:", *args))
+    testQueue.submit("test", _test_job, 3, job_data={"progress": None})
+
+    testStopEvent = threading.Event()
+    threading.Timer(5, testStopEvent.set).start()
+    run_job_worker(testQueue, testStopEvent)
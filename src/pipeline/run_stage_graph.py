@@ -0,0 +1,168 @@
+"""
+run_stage_graph.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Runs a graph of dependent stages, running independent stages in parallel.
+"""
+
+# IMPORTS
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.metrics import get_child_cpu_time, get_peak_rss
+
+# CONSTANTS
+STAGE_PENDING = "pending"
+STAGE_RUNNING = "running"
+STAGE_DONE = "done"
+
+
+# HELPER FUNCTIONS
+def _run_stage(name: str, function: Callable, arguments: dict, stage_metrics: Optional[dict]) -> Any:
+    """
+    Runs one stage, measuring the resources that it used if needed.
+
+    Args:
+        name:
+            Name of the stage.
+
+        function:
+            Function of the stage.
+
+        arguments:
+            Keyword arguments to the function.
+
+        stage_metrics:
+            Dictionary to record the stage's measurements in, or `None` to not measure the stage.
+
+    Returns:
+        Any:
+            Result of the stage's function.
+    """
+
+    if stage_metrics is None:
+        return function(**arguments)
+
+    # Run the stage
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time() + get_child_cpu_time()
+    initial_peak_rss = get_peak_rss()
+
+    result = function(**arguments)
+
+    # Record how long it took and how much the peak memory usage went up
+    stage_metrics[name] = {
+        "wall_time": time.perf_counter() - wall_start,
+        "cpu_time": time.thread_time() + get_child_cpu_time() - cpu_start,
+        "peak_rss_increase": get_peak_rss() - initial_peak_rss
+    }
+    return result
+
+
+# FUNCTIONS
+def run_stage_graph(stages: Dict[str, Tuple[Callable, List[str]]], max_workers: Optional[int] = None,
+                    stage_status: Optional[dict] = None, stage_metrics: Optional[dict] = None) -> Dict[str, Any]:
+    """
+    Runs a graph of stages on a pool of worker threads.
+
+    A stage is started as soon as all the stages it depends on are done, so stages that do not depend on each other run
+    at the same time. Each stage's function is called with the results of the stages it depends on as keyword arguments,
+    named after those stages.
+
+    Args:
+        stages:
+            Dictionary that maps each stage's name to a double containing the stage's function and the list of names of
+            the stages it depends on, in that order.
+
+        max_workers:
+            Maximum number of stages to run at the same time. Defaults to the `ThreadPoolExecutor` default.
+
+        stage_status:
+            Dictionary to share the status of each stage with other threads. Each stage's name is mapped to one of
+            `STAGE_PENDING`, `STAGE_RUNNING` or `STAGE_DONE`, in the order that the stages were given.
+
+        stage_metrics:
+            Dictionary to record the resources used by each stage in. When each stage is done, its name is mapped to a
+            dictionary containing its `wall_time` and `cpu_time` (in seconds) and its `peak_rss_increase` (in bytes).
+            The CPU time is that of the thread that ran the stage and of any subprocesses that finished while it ran,
+            and the peak RSS increase is how much the peak memory usage of the whole process went up while the stage
+            ran. Stages that run at the same time may therefore share some of each other's measurements.
+
+    Returns:
+        Dict[str, Any]:
+            Results of the stages that no other stage depends on, keyed by the stages' names. The results of the other
+            stages are released as soon as every stage that depends on them is done.
+
+    Raises:
+        AssertionError:
+            If a stage depends on a stage that does not exist, or if the stages' dependencies form a cycle.
+    """
+
+    # Check that all the dependencies exist
+    for name, (_, dependencies) in stages.items():
+        for dependency in dependencies:
+            assert dependency in stages, f"The stage '{name}' depends on '{dependency}', which does not exist."
+
+    # Count the number of stages that need each stage's result
+    num_dependents = {name: 0 for name in stages}
+    for _, dependencies in stages.values():
+        for dependency in dependencies:
+            num_dependents[dependency] += 1
+
+    # Mark all stages as pending
+    if stage_status is None:
+        stage_status = {}
+
+    for name in stages:
+        stage_status[name] = STAGE_PENDING
+
+    # Run the stages
+    results = {}
+    running = {}  # Maps each running stage's future to its name
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            # Start every pending stage whose dependencies are all done
+            for name, (function, dependencies) in stages.items():
+                if stage_status[name] == STAGE_PENDING and \
+                        all(stage_status[dependency] == STAGE_DONE for dependency in dependencies):
+                    stage_status[name] = STAGE_RUNNING
+                    arguments = {dependency: results[dependency] for dependency in dependencies}
+                    running[executor.submit(_run_stage, name, function, arguments, stage_metrics)] = name
+
+            # Stop once nothing is running
+            if not running:
+                break
+
+            # Wait for at least one stage to finish
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+
+            for future in finished:
+                name = running.pop(future)
+
+                # Stop the other stages from starting if this stage failed
+                if future.exception() is not None:
+                    for other_future in running:
+                        other_future.cancel()
+                    raise future.exception()
+
+                results[name] = future.result()
+                stage_status[name] = STAGE_DONE
+
+                # Release the results that are no longer needed
+                for dependency in stages[name][1]:
+                    num_dependents[dependency] -= 1
+                    if num_dependents[dependency] == 0:
+                        del results[dependency]
+
+    # Any stage that has not been run must be part of a cycle
+    not_run = [name for name in stages if stage_status[name] != STAGE_DONE]
+    assert not not_run, f"The stages {not_run} could not be run as their dependencies form a cycle."
+
+    # Return the results of the final stages
+    return results
@@ -0,0 +1,284 @@
+"""
+sqlite_job_queue.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Job backend that keeps the queue and the state of the jobs in an SQLite database, so that several web and
+             worker processes can share them.
+"""
+
+# IMPORTS
+import importlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional, Tuple
+
+from src.pipeline.job_queue import JOB_FAILED, JOB_FINISHED, JOB_QUEUED, JOB_RUNNING, JobQueue
+
+# CONSTANTS
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    cost REAL NOT NULL,
+    function TEXT NOT NULL,
+    args TEXT NOT NULL,
+    data TEXT NOT NULL,
+    error TEXT,
+    submitted REAL NOT NULL,
+    heartbeat REAL,
+    done REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state, submitted);
+"""
+
+
+# CLASSES
+class SQLiteJobQueue(JobQueue):
+    """
+    Job backend that keeps the queue and the state of the jobs in an SQLite database in write-ahead logging (WAL) mode.
+
+    Any number of processes can submit jobs and read their state, and any number of worker processes can run them (see
+    `run_job_worker`), so the web server and the workers can be scaled separately. Jobs are stored by the name of their
+    function and their arguments, so the function must be importable by name and the arguments must be JSON
+    serializable. The job data is a copy that the worker running the job saves to the database every so often.
+
+    Each running job has a heartbeat that its worker updates whenever it saves the job data. Jobs whose worker stopped
+    without finishing them are marked as failed by `fail_stale_jobs`.
+    """
+
+    def __init__(self, database_path: str, max_total_cost: float = float("inf"),
+                 on_job_done: Optional[Callable[[str, str, dict], None]] = None):
+        """
+        Initialization method for a `SQLiteJobQueue` object.
+
+        Args:
+            database_path:
+                Path to the SQLite database file. It will be created if it does not exist.
+
+            max_total_cost:
+                Maximum total estimated cost of all the queued and running jobs.
+
+            on_job_done:
+                Function that is called in the worker process whenever a job finishes or fails, with the job's ID, its
+                state (`JOB_FINISHED` or `JOB_FAILED`) and its job data.
+        """
+
+        self.database_path = database_path
+        self.max_total_cost = max_total_cost
+        self.on_job_done = on_job_done
+
+        self._local = threading.local()
+
+        # Create the table; the script runs in its own transaction
+        self._connection().executescript(SCHEMA)
+
+    # Properties
+    @property
+    def queue_length(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM jobs WHERE state = ?", (JOB_QUEUED,)).fetchone()[0]
+
+    @property
+    def num_running(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM jobs WHERE state = ?", (JOB_RUNNING,)).fetchone()[0]
+
+    @property
+    def total_cost(self) -> float:
+        return self._get_active_cost(self._connection())
+
+    # Public methods
+    def submit(self, job_id: str, function: Callable, *args, cost: float = 0., job_data: Optional[dict] = None) -> bool:
+        with self._transaction() as connection:
+            # Only allow one job with the same ID at a time
+            row = connection.execute("SELECT state FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+            if row is not None and row[0] in (JOB_QUEUED, JOB_RUNNING):
+                return True
+
+            # Reject the job if it would go over the budget, unless there is nothing else to do
+            active_cost = self._get_active_cost(connection)
+            if active_cost > 0 and active_cost + cost > self.max_total_cost:
+                return False
+
+            # Create the job's record, replacing the record of any earlier job with the same ID
+            connection.execute(
+                "INSERT OR REPLACE INTO jobs (job_id, state, cost, function, args, data, submitted) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, cost, f"{function.__module__}:{function.__qualname__}", json.dumps(args),
+                 json.dumps(job_data or {}), time.time())
+            )
+            return True
+
+    def get_job_state(self, job_id: str) -> Optional[str]:
+        row = self._connection().execute("SELECT state FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def get_job_data(self, job_id: str) -> Optional[dict]:
+        row = self._connection().execute("SELECT data FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def get_job_error(self, job_id: str) -> Optional[str]:
+        row = self._connection().execute("SELECT error FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def get_queue_position(self, job_id: str) -> Optional[int]:
+        connection = self._connection()
+        row = connection.execute("SELECT state, submitted FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None or row[0] != JOB_QUEUED:
+            return None
+
+        return connection.execute("SELECT COUNT(*) FROM jobs WHERE state = ? AND submitted <= ?",
+                                  (JOB_QUEUED, row[1])).fetchone()[0]
+
+    def forget(self, job_id: str):
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM jobs WHERE job_id = ? AND state IN (?, ?)",
+                               (job_id, JOB_FINISHED, JOB_FAILED))
+
+    def expire(self, max_age: float) -> int:
+        with self._transaction() as connection:
+            return connection.execute("DELETE FROM jobs WHERE state IN (?, ?) AND done < ?",
+                                      (JOB_FINISHED, JOB_FAILED, time.time() - max_age)).rowcount
+
+    def claim(self) -> Optional[Tuple[str, Callable, list, dict]]:
+        """
+        Takes the next job off the queue and marks it as running, so that no other worker runs it.
+
+        Returns:
+            Optional[Tuple[str, Callable, list, dict]]:
+                Quadruple containing the job's ID, its function, its arguments and its job data in that order, or
+                `None` if no job is queued.
+        """
+
+        with self._transaction() as connection:
+            row = connection.execute(
+                "SELECT job_id, function, args, data FROM jobs WHERE state = ? ORDER BY submitted LIMIT 1",
+                (JOB_QUEUED,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            connection.execute("UPDATE jobs SET state = ?, heartbeat = ? WHERE job_id = ?",
+                               (JOB_RUNNING, time.time(), row[0]))
+
+        # Import the job's function
+        job_id, function_name, args, data = row
+        module_name, qualified_name = function_name.split(":")
+
+        function = importlib.import_module(module_name)
+        for name in qualified_name.split("."):
+            function = getattr(function, name)
+
+        return job_id, function, json.loads(args), json.loads(data)
+
+    def save_job_data(self, job_id: str, job_data: dict):
+        """
+        Saves the job data of a running job, which also updates the job's heartbeat.
+
+        Args:
+            job_id:
+                ID of the job.
+
+            job_data:
+                The job's data. It must be JSON serializable.
+        """
+
+        with self._transaction() as connection:
+            connection.execute("UPDATE jobs SET data = ?, heartbeat = ? WHERE job_id = ? AND state = ?",
+                               (json.dumps(job_data), time.time(), job_id, JOB_RUNNING))
+
+    def finish(self, job_id: str, job_data: dict, error: Optional[str] = None):
+        """
+        Marks a running job as finished, or as failed if there was an error, and saves its final job data.
+
+        Args:
+            job_id:
+                ID of the job.
+
+            job_data:
+                The job's data. It must be JSON serializable.
+
+            error:
+                Description of the error that made the job fail, if it failed.
+        """
+
+        state = JOB_FINISHED if error is None else JOB_FAILED
+
+        with self._transaction() as connection:
+            connection.execute("UPDATE jobs SET state = ?, data = ?, error = ?, done = ? WHERE job_id = ?",
+                               (state, json.dumps(job_data), error, time.time(), job_id))
+
+        if self.on_job_done is not None:
+            self.on_job_done(job_id, state, job_data)
+
+    def fail_stale_jobs(self, timeout: float) -> int:
+        """
+        Marks the running jobs whose heartbeat stopped more than `timeout` seconds ago as failed, as their workers must
+        have stopped. They are not run again, as they may have been stopped halfway through changing files.
+
+        Args:
+            timeout:
+                Time after the last heartbeat of a job that its worker is assumed to have stopped, in seconds.
+
+        Returns:
+            int:
+                Number of jobs marked as failed.
+        """
+
+        now = time.time()
+
+        with self._transaction() as connection:
+            return connection.execute(
+                "UPDATE jobs SET state = ?, error = ?, done = ? WHERE state = ? AND heartbeat < ?",
+                (JOB_FAILED, "The worker running the job stopped.", now, JOB_RUNNING, now - timeout)
+            ).rowcount
+
+    # Private methods
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Gets the current thread's connection to the database, creating it if needed.
+        """
+
+        # Connections cannot be shared with forked processes, so make a new one if this is a different process
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.database_path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return self._local.connection
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Runs the statements in the `with` block in one transaction, which takes the database's write lock at the start
+        so that the statements see the latest state of the jobs.
+        """
+
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
+
+    @staticmethod
+    def _get_active_cost(connection: sqlite3.Connection) -> float:
+        """
+        Gets the total estimated cost of the queued and running jobs.
+        """
+
+        return connection.execute("SELECT COALESCE(SUM(cost), 0) FROM jobs WHERE state IN (?, ?)",
+                                  (JOB_QUEUED, JOB_RUNNING)).fetchone()[0]
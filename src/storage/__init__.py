@@ -0,0 +1,2 @@
+from .project_store import STATUS_FILE_NAME, ProjectStore
+from .retention_manager import RetentionManager
@@ -0,0 +1,364 @@
+"""
+project_store.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: SQLite-backed store of the state of every project.
+"""
+
+# IMPORTS
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+import yaml
+
+# CONSTANTS
+STATUS_FILE_NAME = "status.yaml"  # Name of the status file that projects used before the project store
+LOCK_TIMEOUT = 30  # Default time to wait for a project's lock, in seconds
+LOCK_MAX_AGE = 5 * 60  # Locks held for longer than this are assumed to be left by a process that died, in seconds
+LOCK_POLL_INTERVAL = 0.05  # Time between attempts to take a project's lock, in seconds
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    uuid TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS projects_state ON projects (state);
+CREATE TABLE IF NOT EXISTS project_values (
+    uuid TEXT NOT NULL REFERENCES projects (uuid) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (uuid, key)
+);
+CREATE TABLE IF NOT EXISTS project_uses (
+    uuid TEXT PRIMARY KEY REFERENCES projects (uuid) ON DELETE CASCADE,
+    last_used REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS project_locks (
+    uuid TEXT PRIMARY KEY,
+    token TEXT NOT NULL,
+    acquired REAL NOT NULL
+);
+"""
+
+
+# CLASSES
+class ProjectStore:
+    """
+    Store of the state of every project, backed by an SQLite database in write-ahead logging (WAL) mode.
+
+    Each project has a UUID, a state (like "uploaded" or "processing") and any number of key-value pairs, whose values
+    are saved as JSON. Every key is its own row, so updates to different keys of the same project never overwrite each
+    other, and every update is done in a single transaction. Projects can be looked up by UUID and by state.
+
+    The store also records when each project was last used (see `touch`), and has a lock for each project (see `lock`),
+    which processes take while they check whether a project's files are in use and then start or stop using them.
+
+    The store can be used from several threads and processes at once; each thread of each process has its own
+    connection to the database.
+    """
+
+    def __init__(self, database_path: str):
+        """
+        Initialization method for a `ProjectStore` object.
+
+        Args:
+            database_path:
+                Path to the SQLite database file. It will be created if it does not exist.
+        """
+
+        self.database_path = database_path
+        self._local = threading.local()
+
+        # Create the tables
+        with self._connection() as connection:
+            connection.executescript(SCHEMA)
+
+    # Public methods
+    def create(self, uuid: str, state: str, /, **values) -> bool:
+        """
+        Creates a project.
+
+        Args:
+            uuid:
+                UUID of the project.
+
+            state:
+                Initial state of the project.
+
+            **values:
+                Initial values of the project.
+
+        Returns:
+            bool:
+                `True` if the project was created, and `False` if a project with that UUID already exists.
+        """
+
+        now = time.time()
+
+        with self._connection() as connection:
+            cursor = connection.execute(
+                "INSERT OR IGNORE INTO projects (uuid, state, created, updated) VALUES (?, ?, ?, ?)",
+                (uuid, state, now, now)
+            )
+            if cursor.rowcount == 0:
+                return False
+
+            connection.execute("INSERT OR REPLACE INTO project_uses (uuid, last_used) VALUES (?, ?)", (uuid, now))
+            self._set_values(connection, uuid, values)
+            return True
+
+    def get(self, uuid: str) -> Optional[dict]:
+        """
+        Gets the values of a project.
+
+        Args:
+            uuid:
+                UUID of the project.
+
+        Returns:
+            Optional[dict]:
+                Dictionary of the project's values, or `None` if the project does not exist.
+        """
+
+        connection = self._connection()
+
+        if connection.execute("SELECT 1 FROM projects WHERE uuid = ?", (uuid,)).fetchone() is None:
+            return None
+
+        rows = connection.execute("SELECT key, value FROM project_values WHERE uuid = ?", (uuid,))
+        return {key: json.loads(value) for key, value in rows}
+
+    def get_state(self, uuid: str) -> Optional[str]:
+        """
+        Gets the state of a project.
+
+        Args:
+            uuid:
+                UUID of the project.
+
+        Returns:
+            Optional[str]:
+                State of the project, or `None` if the project does not exist.
+        """
+
+        row = self._connection().execute("SELECT state FROM projects WHERE uuid = ?", (uuid,)).fetchone()
+        return None if row is None else row[0]
+
+    def update(self, uuid: str, state: Optional[str] = None, /, **values) -> bool:
+        """
+        Updates some values, and optionally the state, of a project in a single transaction.
+
+        Args:
+            uuid:
+                UUID of the project.
+
+            state:
+                New state of the project. If `None`, the state is not changed.
+
+            **values:
+                Values to set. Values that are not given are not changed.
+
+        Returns:
+            bool:
+                `True` if the project was updated, and `False` if the project does not exist.
+        """
+
+        with self._connection() as connection:
+            if state is None:
+                cursor = connection.execute("UPDATE projects SET updated = ? WHERE uuid = ?", (time.time(), uuid))
+            else:
+                cursor = connection.execute(
+                    "UPDATE projects SET state = ?, updated = ? WHERE uuid = ?", (state, time.time(), uuid)
+                )
+
+            if cursor.rowcount == 0:
+                return False
+
+            self._set_values(connection, uuid, values)
+            return True
+
+    def touch(self, uuid: str):
+        """
+        Records that a project was used just now.
+
+        Args:
+            uuid:
+                UUID of the project.
+        """
+
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO project_uses (uuid, last_used) SELECT uuid, ? FROM projects WHERE uuid = ?",
+                (time.time(), uuid)
+            )
+
+    def get_last_used(self, uuid: str) -> Optional[float]:
+        """
+        Gets when a project was last used, as recorded by `touch` or when the project was created.
+
+        Args:
+            uuid:
+                UUID of the project.
+
+        Returns:
+            Optional[float]:
+                Time that the project was last used, as seconds since the epoch, or `None` if the project does not
+                exist or was created before its uses were recorded.
+        """
+
+        row = self._connection().execute("SELECT last_used FROM project_uses WHERE uuid = ?", (uuid,)).fetchone()
+        return None if row is None else row[0]
+
+    @contextmanager
+    def lock(self, uuid: str, timeout: float = LOCK_TIMEOUT) -> Iterator[bool]:
+        """
+        Takes a project's lock for the `with` block. The lock is shared by every process that uses the database, and
+        does not need the project to exist.
+
+        Args:
+            uuid:
+                UUID of the project.
+
+            timeout:
+                Maximum time to wait for the lock, in seconds. If 0, the lock is only tried once.
+
+        Returns:
+            Iterator[bool]:
+                Context manager that gives whether the lock was taken. The block is run either way.
+        """
+
+        token = os.urandom(8).hex()
+        deadline = time.monotonic() + timeout
+
+        while True:
+            now = time.time()
+
+            with self._connection() as connection:
+                connection.execute("DELETE FROM project_locks WHERE uuid = ? AND acquired < ?",
+                                   (uuid, now - LOCK_MAX_AGE))
+                locked = connection.execute(
+                    "INSERT OR IGNORE INTO project_locks (uuid, token, acquired) VALUES (?, ?, ?)", (uuid, token, now)
+                ).rowcount == 1
+
+            if locked or time.monotonic() >= deadline:
+                break
+
+            time.sleep(LOCK_POLL_INTERVAL)
+
+        try:
+            yield locked
+        finally:
+            if locked:
+                with self._connection() as connection:
+                    connection.execute("DELETE FROM project_locks WHERE uuid = ? AND token = ?", (uuid, token))
+
+    def delete(self, uuid: str):
+        """
+        Deletes a project and all its values.
+
+        Args:
+            uuid:
+                UUID of the project.
+        """
+
+        with self._connection() as connection:
+            connection.execute("DELETE FROM project_values WHERE uuid = ?", (uuid,))
+            connection.execute("DELETE FROM project_uses WHERE uuid = ?", (uuid,))
+            connection.execute("DELETE FROM projects WHERE uuid = ?", (uuid,))
+
+    def list_uuids(self, state: Optional[str] = None) -> List[str]:
+        """
+        Lists the UUIDs of the projects, from the least to the most recently updated.
+
+        Args:
+            state:
+                If given, only list the projects in this state.
+
+        Returns:
+            List[str]:
+                List of UUIDs.
+        """
+
+        if state is None:
+            rows = self._connection().execute("SELECT uuid FROM projects ORDER BY updated")
+        else:
+            rows = self._connection().execute("SELECT uuid FROM projects WHERE state = ? ORDER BY updated", (state,))
+
+        return [uuid for uuid, in rows]
+
+    def migrate_status_files(self, folder_path: str, get_state) -> int:
+        """
+        Imports the `status.yaml` files of projects that are not yet in the store.
+
+        Args:
+            folder_path:
+                Path to the folder that contains the projects' folders.
+
+            get_state:
+                Function that gets the state of a project from its status dictionary.
+
+        Returns:
+            int:
+                Number of projects imported.
+        """
+
+        num_imported = 0
+
+        for uuid in os.listdir(folder_path):
+            status_file = os.path.join(folder_path, uuid, STATUS_FILE_NAME)
+            if not os.path.isfile(status_file) or self.get_state(uuid) is not None:
+                continue
+
+            # Read the status file
+            with open(status_file, "r") as f:
+                status = yaml.load(f, yaml.SafeLoader)
+
+            # Import it; it was last used when its folder was last changed
+            if self.create(uuid, get_state(status), **status):
+                with self._connection() as connection:
+                    connection.execute("UPDATE project_uses SET last_used = ? WHERE uuid = ?",
+                                       (os.path.getmtime(os.path.join(folder_path, uuid)), uuid))
+
+                num_imported += 1
+
+        return num_imported
+
+    # Private methods
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Gets the current thread's connection to the database, creating it if needed.
+        """
+
+        # Connections cannot be shared with forked processes, so make a new one if this is a different process
+        if getattr(self._local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.database_path, timeout=30)
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute("PRAGMA synchronous = NORMAL")
+            connection.execute("PRAGMA foreign_keys = ON")
+
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+
+        return self._local.connection
+
+    @staticmethod
+    def _set_values(connection: sqlite3.Connection, uuid: str, values: dict):
+        """
+        Sets the values of a project, as part of an ongoing transaction.
+        """
+
+        connection.executemany(
+            "INSERT INTO project_values (uuid, key, value) VALUES (?, ?, ?) "
+            "ON CONFLICT (uuid, key) DO UPDATE SET value = excluded.value",
+            [(uuid, key, json.dumps(value)) for key, value in values.items()]
+        )
@@ -0,0 +1,225 @@
+"""
+retention_manager.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Keeps a folder of project folders within a disk budget and an age limit.
+"""
+
+# IMPORTS
+import os
+import shutil
+import time
+from contextlib import nullcontext
+from fnmatch import fnmatch
+from typing import Callable, ContextManager, List, Optional
+
+
+# CLASSES
+class RetentionManager:
+    """
+    Keeps a folder of project folders within a disk budget and an age limit.
+
+    Each project is a subfolder of the folder. Projects are ranked by when they were last used, as given by
+    `get_last_used`. Projects that were not used for longer than the age limit are deleted. Then, while the folder is
+    over its budget, derived artifacts (files and folders in the projects that can be generated again) are deleted, one
+    kind at a time in the given order and from the least recently used project onwards. Whole projects are only deleted
+    if that is not enough.
+
+    Projects that are in use are never touched. Each project is claimed (see `claim`) before it is checked and for as
+    long as its files are deleted, so that no other process can start using it in between.
+    """
+
+    def __init__(self, folder_path: str, max_size: int, max_age: Optional[float] = None,
+                 derived_artifacts: Optional[List[str]] = None, is_in_use: Optional[Callable[[str], bool]] = None,
+                 on_evict: Optional[Callable[[str, Optional[str]], None]] = None,
+                 get_last_used: Optional[Callable[[str], Optional[float]]] = None,
+                 claim: Optional[Callable[[str], ContextManager[bool]]] = None):
+        """
+        Initialization method for a `RetentionManager` object.
+
+        Args:
+            folder_path:
+                Path to the folder that contains the projects' folders.
+
+            max_size:
+                Maximum total size of the projects' folders, in bytes.
+
+            max_age:
+                Time after which unused projects are deleted, in seconds. If not provided, projects are only deleted to
+                keep within the size budget.
+
+            derived_artifacts:
+                Glob patterns of the names of the files and folders in each project's folder that can be generated
+                again, in the order that they should be deleted.
+
+            is_in_use:
+                Function that is called with a project's name and returns whether the project is in use.
+
+            on_evict:
+                Function that is called after a derived artifact or a whole project is deleted, with the project's name
+                and the artifact's name (`None` if the whole project was deleted).
+
+            get_last_used:
+                Function that is called with a project's name and returns when the project was last used, in seconds
+                since the epoch. If it returns `None`, or is not provided, the modification time of the project's folder
+                is used instead.
+
+            claim:
+                Function that is called with a project's name and returns a context manager that claims the project
+                for the `with` block, giving whether it could be claimed. Projects that could not be claimed are
+                skipped. Whatever starts using a project should claim it too.
+        """
+
+        self.folder_path = folder_path
+        self.max_size = max_size
+        self.max_age = max_age
+        self.derived_artifacts = derived_artifacts or []
+        self.is_in_use = is_in_use or (lambda name: False)
+        self.on_evict = on_evict
+        self.get_last_used = get_last_used or (lambda name: None)
+        self.claim = claim or (lambda name: nullcontext(True))
+
+    # Public methods
+    def enforce(self) -> dict:
+        """
+        Deletes expired projects, then derived artifacts and then whole projects until the folder is within its budget.
+
+        Returns:
+            dict:
+                Report of what was deleted, with the number of expired projects (`expired_projects`), of evicted
+                artifacts (`evicted_artifacts`) and of evicted projects (`evicted_projects`), the number of bytes
+                reclaimed (`reclaimed_bytes`) and the size of the folder afterwards (`size`).
+        """
+
+        report = {"expired_projects": 0, "evicted_artifacts": 0, "evicted_projects": 0, "reclaimed_bytes": 0}
+
+        # Get the last use time and the size of every project, least recently used first
+        projects = []
+        total_size = 0
+
+        for entry in os.scandir(self.folder_path):
+            if not entry.is_dir(follow_symlinks=False):
+                continue
+
+            try:
+                size = self._get_size(entry.path)
+                last_used = self.get_last_used(entry.name)
+                projects.append((entry.stat().st_mtime if last_used is None else last_used, entry.name))
+            except OSError:  # Deleted while being measured
+                continue
+
+            total_size += size
+
+        projects.sort()
+
+        # Delete the projects that expired
+        now = time.time()
+        remaining = []
+
+        for last_used, name in projects:
+            size = self._delete_unused(name) if self.max_age is not None and now - last_used > self.max_age else None
+
+            if size is not None:
+                total_size -= size
+                report["reclaimed_bytes"] += size
+                report["expired_projects"] += 1
+            else:
+                remaining.append((last_used, name))
+
+        # Delete derived artifacts, one kind at a time, while the folder is over its budget
+        for pattern in self.derived_artifacts:
+            for _, name in remaining:
+                if total_size <= self.max_size:
+                    break
+
+                try:
+                    artifacts = [artifact for artifact in os.listdir(os.path.join(self.folder_path, name))
+                                 if fnmatch(artifact, pattern)]
+                except OSError:
+                    continue
+
+                for artifact in artifacts:
+                    size = self._delete_unused(name, artifact)
+                    if size is None:  # In use
+                        break
+
+                    total_size -= size
+                    report["reclaimed_bytes"] += size
+                    report["evicted_artifacts"] += 1
+
+        # Delete whole projects if that was not enough
+        for _, name in remaining:
+            if total_size <= self.max_size:
+                break
+
+            size = self._delete_unused(name)
+
+            if size is not None:
+                total_size -= size
+                report["reclaimed_bytes"] += size
+                report["evicted_projects"] += 1
+
+        report["size"] = total_size
+        return report
+
+    # Private methods
+    @staticmethod
+    def _get_size(path: str) -> int:
+        """
+        Gets the total size of the files at a path, in bytes.
+        """
+
+        if not os.path.isdir(path):
+            return os.lstat(path).st_size
+
+        total_size = 0
+        for folder, _, files in os.walk(path):
+            for file in files:
+                try:
+                    total_size += os.lstat(os.path.join(folder, file)).st_size
+                except OSError:  # Deleted while being measured
+                    pass
+
+        return total_size
+
+    def _delete_unused(self, name: str, artifact: Optional[str] = None) -> Optional[int]:
+        """
+        Deletes a project or one of its artifacts if the project can be claimed and is not in use, returning the number
+        of bytes reclaimed, or `None` if the project is in use.
+        """
+
+        with self.claim(name) as claimed:
+            if not claimed or self.is_in_use(name):
+                return None
+
+            return self._delete(name, artifact)
+
+    def _delete(self, name: str, artifact: Optional[str] = None) -> int:
+        """
+        Deletes a project or one of its artifacts, returning the number of bytes reclaimed.
+        """
+
+        path = os.path.join(self.folder_path, name) if artifact is None else \
+            os.path.join(self.folder_path, name, artifact)
+
+        try:
+            size = self._get_size(path)
+        except OSError:  # Already deleted
+            return 0
+
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        else:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        if self.on_evict is not None:
+            self.on_evict(name, artifact)
+
+        return size
@@ -1 +1,2 @@
-from .generate_spectrogram_img import generate_spectrogram_img
+from .generate_colour_lut import VIRIDIS_COLOURSCALE, generate_colour_lut
+from .generate_spectrogram_chunks import CHUNK_FILE_EXTENSION, CHUNKS_MANIFEST_FILE_NAME, generate_spectrogram_chunks
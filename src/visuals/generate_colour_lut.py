@@ -0,0 +1,60 @@
+"""
+generate_colour_lut.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Generates a colour lookup table (LUT) from a colour scale.
+"""
+
+# IMPORTS
+from typing import List, Tuple
+
+import numpy as np
+
+# CONSTANTS
+# Same stops as Plotly's named "Viridis" colour scale, so that the generated images match the old Plotly output
+VIRIDIS_COLOURSCALE = [
+    (0.0, "#440154"), (0.06274509803921569, "#48186a"), (0.12549019607843137, "#472d7b"),
+    (0.18823529411764706, "#424086"), (0.25098039215686274, "#3b528b"), (0.3137254901960784, "#33638d"),
+    (0.3764705882352941, "#2c728e"), (0.4392156862745098, "#26828e"), (0.5019607843137255, "#21918c"),
+    (0.5647058823529412, "#1fa088"), (0.6274509803921569, "#28ae80"), (0.6901960784313725, "#3fbc73"),
+    (0.7529411764705882, "#5ec962"), (0.8156862745098039, "#84d44b"), (0.8784313725490196, "#addc30"),
+    (0.9411764705882353, "#d8e219"), (1.0, "#fde725")
+]
+
+
+# FUNCTIONS
+def generate_colour_lut(colourscale: List[Tuple[float, str]] = None, num_colours: int = 256) -> np.ndarray:
+    """
+    Generates a colour lookup table by linearly interpolating between the stops of a colour scale.
+
+    Args:
+        colourscale:
+            List of `(position, hex_colour)` pairs, where the positions are in the interval [0, 1] and are increasing.
+            Defaults to the Viridis colour scale.
+
+        num_colours:
+            Number of colours in the lookup table.
+
+    Returns:
+        np.ndarray:
+            Array of shape `(num_colours, 3)` and type `uint8`, where row `i` is the RGB colour of level `i`.
+    """
+
+    # Use the default colour scale if none was provided
+    if colourscale is None:
+        colourscale = VIRIDIS_COLOURSCALE
+
+    # Separate the positions and the RGB values of the stops
+    positions = np.array([position for position, _ in colourscale])
+    colours = np.array([[int(colour[i:i + 2], 16) for i in (1, 3, 5)] for _, colour in colourscale], dtype=float)
+
+    # Interpolate each of the RGB channels at the levels of the lookup table
+    levels = np.linspace(0, 1, num_colours)
+    lut = np.stack([np.interp(levels, positions, colours[:, channel]) for channel in range(3)], axis=1)
+
+    # Round to the nearest integer colour value and return
+    return np.rint(lut).astype(np.uint8)
@@ -0,0 +1,114 @@
+"""
+generate_spectrogram_chunks.py
+
+Created on 2026-10-17
+Updated on 2026-10-17
+
+Copyright © Ryan Kan
+
+Description: Splits a spectrogram into compressed chunks of quantised data that clients can colour themselves.
+"""
+
+# IMPORTS
+import gzip
+import json
+import math
+import os
+from hashlib import sha1
+from typing import Optional
+
+import numpy as np
+
+from src.audio import quantise_spectrogram
+
+# CONSTANTS
+CHUNKS_MANIFEST_FILE_NAME = "manifest.json"
+CHUNK_FILE_EXTENSION = ".bin.gz"
+
+
+# FUNCTIONS
+def generate_spectrogram_chunks(spectrogram: np.ndarray, frequencies: np.ndarray, times: np.ndarray,
+                                folder_path: str, chunk_frames: int = 512, dtype=np.uint8, compression_level: int = 6,
+                                progress: Optional[list] = None) -> dict:
+    """
+    Quantises a spectrogram and splits it into gzip-compressed chunks of consecutive frames.
+
+    Chunk `i` contains the frames `i * chunk_frames` to `(i + 1) * chunk_frames - 1` (the last chunk may have fewer),
+    saved as `folder_path/i.bin.gz`. Each chunk is the row-major `(num_bins, num_chunk_frames)` matrix of quantised
+    values, where row 0 is the lowest frequency. A manifest describing the chunks, including the value range needed to
+    turn the quantised values back into decibels, is saved as `folder_path/manifest.json`. The manifest also has the
+    SHA1 hash of every compressed chunk, so that clients can cache each chunk for as long as it stays the same.
+
+    Args:
+        spectrogram:
+            Spectrogram matrix, in decibels.
+
+        frequencies:
+            Array of frequencies of the spectrogram's rows.
+
+        times:
+            Array of evenly spaced times of the spectrogram's frames.
+
+        folder_path:
+            Path to the folder to save the chunks and the manifest in. It will be created if it does not exist.
+
+        chunk_frames:
+            Number of frames in each chunk.
+
+        dtype:
+            Type to quantise the spectrogram to. One of `QUANTISED_SPECTROGRAM_DTYPES`.
+
+        compression_level:
+            Level of the gzip compression, from 1 (fastest) to 9 (smallest).
+
+        progress:
+            List object to share the chunk generation process with other threads. After each chunk is saved, its only
+            element is set to the double `(chunks_done, num_chunks)`.
+
+    Returns:
+        dict:
+            The manifest of the chunks.
+    """
+
+    # Quantise the whole spectrogram, so that every chunk uses the same value range
+    quantised, value_range = quantise_spectrogram(spectrogram, dtype=dtype)
+    num_bins, num_frames = quantised.shape
+    num_chunks = math.ceil(num_frames / chunk_frames)
+
+    # Compress and save every chunk
+    os.makedirs(folder_path, exist_ok=True)
+    chunk_hashes = []
+
+    for chunk_no in range(num_chunks):
+        chunk = np.ascontiguousarray(quantised[:, chunk_no * chunk_frames:(chunk_no + 1) * chunk_frames])
+        compressed_chunk = gzip.compress(chunk.tobytes(), compresslevel=compression_level, mtime=0)
+
+        with open(os.path.join(folder_path, f"{chunk_no}{CHUNK_FILE_EXTENSION}"), "wb") as f:
+            f.write(compressed_chunk)
+
+        chunk_hashes.append(sha1(compressed_chunk).hexdigest())
+
+        # Update the progress, if required
+        if progress is not None:
+            progress[0] = (chunk_no + 1, num_chunks)
+
+    # Generate the manifest; the times are stored as an offset and a step, as there is one for every frame
+    manifest = {
+        "num_bins": num_bins,
+        "num_frames": num_frames,
+        "chunk_frames": chunk_frames,
+        "num_chunks": num_chunks,
+        "dtype": np.dtype(dtype).name,
+        "value_range": list(value_range),
+        "frequencies": [float(frequency) for frequency in frequencies],
+        "time_offset": float(times[0]) if num_frames > 0 else 0.,
+        "time_step": float(times[1] - times[0]) if num_frames > 1 else 0.,
+        "chunk_hashes": chunk_hashes
+    }
+
+    # Save the manifest
+    with open(os.path.join(folder_path, CHUNKS_MANIFEST_FILE_NAME), "w") as f:
+        json.dump(manifest, f)
+
+    # Return the manifest
+    return manifest